@@ -0,0 +1,76 @@
+# benchmarks/bench_busca_textual.py
+#
+# Latência da busca das telas de cadastro (índices FTS5) num cadastro grande:
+#     python -m benchmarks.bench_busca_textual [pessoas]
+# Para comparação, cada termo também roda com o filtro antigo (ilike '%termo%').
+
+import sys
+import statistics
+import time
+
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import Session
+
+from benchmarks.comum import banco_temporario, popular
+from src.Models.models import Entidade, Item
+from src.Models.busca_textual import filtro_textual
+
+PAGINA = 100
+REPETICOES = 20
+
+# (rótulo, modelo, tabela FTS, colunas do filtro antigo, texto digitado)
+BUSCAS = [
+    ("pessoa, termo comum", Entidade, "entidade_fts", ("razao_social", "nome_fantasia"), "silva"),
+    ("pessoa, sem acento", Entidade, "entidade_fts", ("razao_social", "nome_fantasia"), "conceicao"),
+    ("pessoa, dois termos", Entidade, "entidade_fts", ("razao_social", "nome_fantasia"), "padaria sou"),
+    ("pessoa, raro", Entidade, "entidade_fts", ("razao_social", "nome_fantasia"), "123457"),
+    ("pessoa, documento", Entidade, "entidade_fts", ("cpf_cnpj",), "00000000012345"),
+    ("produto, termo comum", Item, "itens_fts", ("nome", "codigo_item"), "farmacia"),
+    ("produto, código", Item, "itens_fts", ("nome", "codigo_item"), "P00012"),
+]
+
+
+def mediana_ms(funcao):
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def medir(sessao, modelo, condicao):
+    """(ms da primeira página, ms da contagem, total encontrado), como na tela"""
+    pagina = select(modelo).where(condicao).order_by(modelo.id.desc()).limit(PAGINA)
+    contagem = select(func.count()).select_from(modelo).where(condicao)
+
+    def ler_pagina():
+        sessao.execute(pagina).scalars().all()
+        sessao.expunge_all()
+
+    total = sessao.execute(contagem).scalar()
+    return mediana_ms(ler_pagina), mediana_ms(lambda: sessao.execute(contagem).scalar()), total
+
+
+def main():
+    pessoas = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    with banco_temporario() as engine:
+        inicio = time.perf_counter()
+        popular(engine, pessoas=pessoas, itens=pessoas // 5)
+        print(f"{pessoas} pessoas e {pessoas // 5} produtos gerados em {time.perf_counter() - inicio:.1f} s\n")
+
+        print(f"{'busca':<22} {'texto':<16} {'achados':>8} {'FTS pág.':>9} {'FTS cont.':>10} "
+              f"{'ilike pág.':>11} {'ilike cont.':>12}")
+        with Session(engine) as sessao:
+            for rotulo, modelo, nome_fts, colunas, texto in BUSCAS:
+                fts_pagina, fts_contagem, achados = medir(
+                    sessao, modelo, filtro_textual(modelo.id, nome_fts, texto)
+                )
+                antigo = or_(*(getattr(modelo, c).ilike(f"%{texto}%") for c in colunas))
+                ilike_pagina, ilike_contagem, _ = medir(sessao, modelo, antigo)
+                print(f"{rotulo:<22} {texto:<16} {achados:>8} {fts_pagina:>7.1f}ms {fts_contagem:>8.1f}ms "
+                      f"{ilike_pagina:>9.1f}ms {ilike_contagem:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
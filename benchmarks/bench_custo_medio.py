@@ -0,0 +1,59 @@
+# benchmarks/bench_custo_medio.py
+#
+# Vazão do custo médio ponderado (src/Models/custo_medio.py):
+#     python -m benchmarks.bench_custo_medio [movimentos] [itens]
+# - registrar_entradas: entradas por segundo, em notas de 50 itens (um UPDATE
+#   executemany por nota, como PedidosCompra);
+# - recalcular_custos_medios / recalcular_custos_movimentos: movimentos por
+#   segundo no recálculo completo a partir do razão.
+
+import sys
+import random
+import time
+from decimal import Decimal
+
+from sqlalchemy import select, func
+
+from benchmarks.comum import banco_temporario, popular
+from src.Models.custo_medio import registrar_entradas, recalcular_custos_medios, recalcular_custos_movimentos
+from src.Models.migracoes import transacao_exclusiva
+from src.Models.models import MovimentoEstoque
+
+NOTAS = 2000
+ITENS_POR_NOTA = 50
+
+
+def main():
+    movimentos = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    itens = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    aleatorio = random.Random(11)
+
+    with banco_temporario() as engine:
+        popular(engine, itens=itens, movimentos=movimentos)
+
+        inicio = time.perf_counter()
+        for _ in range(NOTAS):
+            with engine.begin() as conexao:
+                registrar_entradas(conexao, {
+                    item_id: (aleatorio.randint(1, 20), Decimal(aleatorio.randint(100, 2000)) / 100)
+                    for item_id in aleatorio.sample(range(1, itens + 1), ITENS_POR_NOTA)
+                })
+        entradas = NOTAS * ITENS_POR_NOTA / (time.perf_counter() - inicio)
+
+        with engine.connect() as conexao:
+            total = conexao.scalar(select(func.count(MovimentoEstoque.id)))
+        resultados = []
+        for recalcular in (recalcular_custos_medios, recalcular_custos_movimentos):
+            inicio = time.perf_counter()
+            with transacao_exclusiva(engine) as conexao:
+                recalcular(conexao)
+            resultados.append((recalcular.__name__, total / (time.perf_counter() - inicio)))
+
+    print(f"{itens} itens, {total} movimentos no razão")
+    print(f"  registrar_entradas:           {entradas:10,.0f} entradas/s")
+    for nome, vazao in resultados:
+        print(f"  {nome + ':':<30}{vazao:10,.0f} movimentos/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/bench_historico_vendas.py
+#
+# Abertura do histórico de vendas com um histórico grande:
+#     python -m benchmarks.bench_historico_vendas [pedidos]
+# O número de comandos SQL deve ser o mesmo para qualquer tamanho de histórico.
+
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from benchmarks.comum import banco_temporario, cronometrar, aplicacao_qt
+from src.Models.models import PedidoVenda, PedidoVendaItem
+from src.Utils.contador_consultas import ContadorConsultas
+
+
+def popular(sessao, pedidos, itens_por_pedido=3):
+    inicio = date(2020, 1, 1)
+    for primeiro in range(1, pedidos + 1, 10000):
+        ids = range(primeiro, min(primeiro + 10000, pedidos + 1))
+        sessao.execute(insert(PedidoVenda), [
+            {"id": i, "preco_total": 30, "data_emissao": inicio + timedelta(days=i % 1500), "status": "FINALIZADA"}
+            for i in ids
+        ])
+        sessao.execute(insert(PedidoVendaItem), [
+            {"pedido_id": i, "produto": f"Produto {j}", "quantidade": 1, "preco_unitario": 10, "preco_total": 10}
+            for i in ids for j in range(itens_por_pedido)
+        ])
+    sessao.commit()
+
+
+def main():
+    pedidos = int(sys.argv[1]) if len(sys.argv) > 1 else 80000
+    app = aplicacao_qt()
+    from src.Views.historico_vendas_view import HistoricoVendasWidget
+
+    for quantidade in (100, pedidos):
+        with banco_temporario() as engine, Session(engine) as sessao:
+            popular(sessao, quantidade)
+            with ContadorConsultas(engine) as contador:
+                segundos = cronometrar(lambda: HistoricoVendasWidget(sessao))
+            print(f"{quantidade:>8} pedidos: tela aberta em {segundos * 1000:.0f} ms, "
+                  f"{contador.total} comandos SQL")
+
+
+if __name__ == "__main__":
+    main()
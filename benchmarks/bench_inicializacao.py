@@ -0,0 +1,76 @@
+# benchmarks/bench_inicializacao.py
+#
+# Tempo do login até a janela principal pronta, com as telas construídas
+# no primeiro uso (atual) e com todas construídas na abertura (como antes):
+#     python -m benchmarks.bench_inicializacao [escala]
+# `escala` multiplica a massa de dados (1 = 20k pessoas, 50k itens, 100k vendas).
+
+import os
+import sys
+import tempfile
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    with tempfile.TemporaryDirectory() as pasta:
+        # O engine do app aponta para "erp.db" no diretório atual, resolvido
+        # quando src.Models.models é importado: nada do app antes do chdir
+        diretorio_original = os.getcwd()
+        os.chdir(pasta)
+        try:
+            medir(escala)
+        finally:
+            os.chdir(diretorio_original)
+
+
+def medir(escala):
+    from benchmarks.comum import popular, cronometrar, aplicacao_qt
+    from src.Models.models import engine
+    from src.Models.migracoes import executar_migracoes
+
+    executar_migracoes(engine)
+    popular(engine, pessoas=int(20000 * escala), itens=int(50000 * escala), vendas=int(100000 * escala),
+            movimentos=int(200000 * escala), lancamentos=int(50000 * escala))
+
+    app = aplicacao_qt()
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+    from main_app import MainAppUnificado
+    from src.Models.models import Usuario
+
+    # Usuário administrador criado pelas migrações, como no login
+    sessao_login = Session(engine)
+    usuario = sessao_login.scalars(select(Usuario).limit(1)).one()
+    janelas = []
+
+    def abrir():
+        janela = MainAppUnificado(usuario_logado=usuario)
+        app.processEvents()
+        janelas.append(janela)
+
+    def abrir_todas():
+        # Comportamento anterior: todas as telas construídas no login
+        abrir()
+        for chave in janelas[-1].registro_telas:
+            janelas[-1].obter_tela(chave)
+        app.processEvents()
+
+    sob_demanda = cronometrar(abrir, repeticoes=3)
+    todas = cronometrar(abrir_todas, repeticoes=3)
+    print(f"Janela com telas sob demanda: {sob_demanda * 1000:8.0f} ms")
+    print(f"Janela com todas as telas:    {todas * 1000:8.0f} ms")
+
+    # Custo de cada tela no primeiro clique
+    janela = MainAppUnificado(usuario_logado=usuario)
+    for chave in janela.registro_telas:
+        if chave in janela.telas:
+            continue
+        segundos = cronometrar(lambda: janela.obter_tela(chave))
+        print(f"  {chave:<22} {segundos * 1000:8.0f} ms")
+    for janela in janelas:
+        janela.sessao.close()
+    sessao_login.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_lancamentos.py
+#
+# Linhas por segundo na gravação de vendas e compras (PedidosVenda /
+# PedidosCompra, os mesmos serviços usados por TelaVenda e TelaCompra):
+#     python -m benchmarks.bench_lancamentos [documentos] [linhas_por_documento]
+
+import sys
+import random
+import time
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from benchmarks.comum import banco_temporario, popular
+from src.Components.Comercial.comercial import PedidosVenda, PedidosCompra
+from src.Models.models import MovimentoEstoque
+
+ITENS = 20000
+
+
+def linhas_por_segundo(gravar, documentos, linhas, aleatorio):
+    inicio = time.perf_counter()
+    for numero in range(documentos):
+        gravar(numero, aleatorio.sample(range(1, ITENS + 1), linhas))
+    return documentos * linhas / (time.perf_counter() - inicio)
+
+
+def main():
+    documentos = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    linhas = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    aleatorio = random.Random(5)
+
+    with banco_temporario() as engine, Session(engine) as sessao:
+        popular(engine, pessoas=2000, itens=ITENS, movimentos=100000)
+        vendas, compras = PedidosVenda(sessao), PedidosCompra(sessao)
+        antes = sessao.scalar(select(func.count(MovimentoEstoque.id)))
+
+        venda = linhas_por_segundo(
+            lambda numero, ids: vendas.registrar_venda(1, [
+                {"id": item_id, "nome": f"Produto {item_id}", "quantidade": 1, "preco": 10, "subtotal": 10}
+                for item_id in ids
+            ]),
+            documentos, linhas, aleatorio
+        )
+        compra = linhas_por_segundo(
+            lambda numero, ids: compras.registrar_compra(10, [
+                {"id": item_id, "nome": f"Produto {item_id}", "quantidade": 2, "preco_unitario": 6, "subtotal": 12}
+                for item_id in ids
+            ], numero_nf=f"NF-{numero}"),
+            documentos, linhas, aleatorio
+        )
+        gravados = sessao.scalar(select(func.count(MovimentoEstoque.id))) - antes
+        assert gravados == 2 * documentos * linhas, gravados
+
+    print(f"{documentos} documentos de {linhas} linhas cada")
+    print(f"  vendas:  {venda:8.0f} linhas/s")
+    print(f"  compras: {compra:8.0f} linhas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_perfis_sqlite.py
+#
+# Compara os perfis de PRAGMA (src/Models/perfil_sqlite.py): vendas
+# finalizadas por segundo e latência das leituras dos dashboards.
+#     python -m benchmarks.bench_perfis_sqlite [vendas]
+# O banco fica no diretório temporário do sistema (TMPDIR): rode no mesmo
+# disco do erp.db de produção, pois o custo do fsync decide a diferença.
+
+import sys
+import random
+import statistics
+import time
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from benchmarks.comum import banco_temporario, popular
+from src.Components.Comercial.comercial import PedidosVenda
+from src.Models.perfil_sqlite import PERFIS
+from src.Utils.indicadores import (
+    indicadores_produtos, indicadores_vendas, indicadores_financeiro, movimentos_desde
+)
+
+ITENS = 20000
+LINHAS_POR_VENDA = 5
+
+
+def vendas_por_segundo(engine, vendas):
+    aleatorio = random.Random(7)
+    with Session(engine) as sessao:
+        pedidos = PedidosVenda(sessao)
+        inicio = time.perf_counter()
+        for _ in range(vendas):
+            itens = [
+                {"id": item_id, "nome": f"Produto {item_id}", "quantidade": 1, "preco": 10, "subtotal": 10}
+                for item_id in aleatorio.sample(range(1, ITENS + 1), LINHAS_POR_VENDA)
+            ]
+            pedidos.registrar_venda(None, itens)
+        return vendas / (time.perf_counter() - inicio)
+
+
+def latencia_dashboards(engine, repeticoes=50):
+    """Mediana (ms) da leitura dos indicadores dos quatro dashboards"""
+    hoje = date(2024, 6, 30)
+    tempos = []
+    with Session(engine) as sessao:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            indicadores_produtos(sessao)
+            indicadores_vendas(sessao, date(2024, 1, 1), hoje)
+            indicadores_financeiro(sessao, hoje)
+            movimentos_desde(sessao, date(2024, 1, 1))
+            tempos.append(time.perf_counter() - inicio)
+            sessao.rollback()
+    return statistics.median(tempos) * 1000
+
+
+def main():
+    vendas = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    resultados = []
+    for perfil in PERFIS:
+        with banco_temporario(perfil) as engine:
+            popular(engine, pessoas=5000, itens=ITENS, vendas=50000, movimentos=100000, lancamentos=20000)
+            resultados.append((perfil, vendas_por_segundo(engine, vendas), latencia_dashboards(engine)))
+
+    print(f"\n{'perfil':<12} {'vendas/s':>10} {'dashboards (ms)':>16}")
+    for perfil, por_segundo, latencia in resultados:
+        print(f"{perfil:<12} {por_segundo:>10.0f} {latencia:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_validacao_venda.py
+#
+# Latência de ValidadorComercial.validar_venda_completa num carrinho grande:
+#     python -m benchmarks.bench_validacao_venda [linhas]
+
+import sys
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from benchmarks.comum import banco_temporario, popular, aplicacao_qt
+from src.Utils.contador_consultas import ContadorConsultas
+from src.Utils.validacoes_comercial import ValidadorComercial
+
+ITENS = 50000
+REPETICOES = 50
+
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    aplicacao_qt()
+    aleatorio = random.Random(3)
+    with banco_temporario() as engine:
+        popular(engine, pessoas=5000, itens=ITENS, lancamentos=50000)
+        venda = {
+            "cliente_id": 1,
+            "cliente_nome": "Cliente 1",
+            "vendedor_id": 1,  # administrador criado pelas migrações
+            "vendedor_nome": "Administrador",
+            "valor_total": Decimal("10.00") * linhas,
+            "itens": [
+                {"produto_id": produto_id, "produto_nome": f"Produto {produto_id}", "quantidade": 1,
+                 "preco_unitario": Decimal("10.00")}
+                for produto_id in aleatorio.sample(range(1, ITENS + 1), linhas)
+            ],
+        }
+
+        with Session(engine) as sessao:
+            validador = ValidadorComercial(sessao)
+            # Sem a caixa de mensagem: um erro aqui invalida a medição
+            validador.mostrar_erros = lambda parent=None: not validador.erros
+
+            tempos = []
+            for _ in range(REPETICOES):
+                sessao.expire_all()
+                with ContadorConsultas(engine) as contador:
+                    inicio = time.perf_counter()
+                    valida = validador.validar_venda_completa(venda)
+                    tempos.append(time.perf_counter() - inicio)
+                assert valida, validador.erros
+
+    print(f"Carrinho de {linhas} linhas: mediana {statistics.median(tempos) * 1000:.1f} ms, "
+          f"p95 {sorted(tempos)[int(len(tempos) * 0.95)] * 1000:.1f} ms, {contador.total} comandos SQL")
+
+
+if __name__ == "__main__":
+    main()
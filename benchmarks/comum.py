@@ -0,0 +1,136 @@
+# benchmarks/comum.py
+
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from sqlalchemy import create_engine, insert
+
+from src.Models.models import (
+    Entidade, Item, PedidoVenda, PedidoVendaItem, MovimentoEstoque, Financeiro,
+    TipoPessoaEnum, EnumStatus
+)
+from src.Models.perfil_sqlite import aplicar_perfil, PERFIS, PERFIL_PADRAO
+from src.Models.migracoes import executar_migracoes
+from src.Models.resumos import reconstruir_resumos
+
+LOTE_INSERCAO = 10000
+NOMES = ["Silva", "Souza", "Oliveira", "Conceição", "Araújo", "Gonçalves", "Mercado", "Distribuidora",
+         "Comércio", "Açougue", "Padaria", "Farmácia", "Ferragens", "Papelaria", "Calçados"]
+
+
+@contextmanager
+def banco_temporario(perfil=PERFIL_PADRAO):
+    """Engine para um erp.db novo e migrado num diretório temporário, apagado no fim"""
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = create_engine(f"sqlite:///{os.path.join(pasta, 'erp.db')}")
+        aplicar_perfil(engine, PERFIS[perfil])
+        executar_migracoes(engine)
+        try:
+            yield engine
+        finally:
+            engine.dispose()
+
+
+def _inserir(conexao, modelo, linhas):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) == LOTE_INSERCAO:
+            conexao.execute(insert(modelo), lote)
+            lote = []
+    if lote:
+        conexao.execute(insert(modelo), lote)
+
+
+def popular(engine, pessoas=0, itens=0, vendas=0, movimentos=0, lancamentos=0, semente=1):
+    """
+    Massa de dados sintética (ids a partir de 1) e resumos dos dashboards
+    reconstruídos. Movimentos entram em ordem de data, como no uso real.
+    """
+    aleatorio = random.Random(semente)
+    inicio = date(2022, 1, 1)
+    with engine.begin() as conexao:
+        _inserir(conexao, Entidade, (
+            {
+                "tipo_pessoa": TipoPessoaEnum.JURIDICA,
+                "razao_social": f"{aleatorio.choice(NOMES)} {aleatorio.choice(NOMES)} {i} Ltda",
+                "nome_fantasia": f"{aleatorio.choice(NOMES)} {i}",
+                "cpf_cnpj": f"{i:014d}",
+                "tipo_entidade": "FORNECEDOR" if i % 10 == 0 else "CLIENTE",
+                "esta_bloqueado": False,
+            }
+            for i in range(1, pessoas + 1)
+        ))
+        _inserir(conexao, Item, (
+            {
+                "codigo_item": f"P{i:07d}",
+                "tipo_item": "PRODUTO",
+                "nome": f"Produto {aleatorio.choice(NOMES)} {i}",
+                "estoque": 100,
+                "estoque_minimo": 10,
+                "custo_unitario": 5,
+                "preco_venda": 10,
+                "fornecedor_id": (i % pessoas) + 1 if pessoas else None,
+            }
+            for i in range(1, itens + 1)
+        ))
+        _inserir(conexao, PedidoVenda, (
+            {
+                "id": i,
+                "cliente_id": aleatorio.randint(1, pessoas) if pessoas else None,
+                "preco_total": 30,
+                "data_emissao": inicio + timedelta(days=i % 1000),
+                "status": "FINALIZADA",
+            }
+            for i in range(1, vendas + 1)
+        ))
+        _inserir(conexao, PedidoVendaItem, (
+            {"pedido_id": i, "produto": f"Produto {j}", "quantidade": 1, "preco_unitario": 10, "preco_total": 10}
+            for i in range(1, vendas + 1) for j in range(3)
+        ))
+        if itens:
+            _inserir(conexao, MovimentoEstoque, (
+                {
+                    "item_id": aleatorio.randint(1, itens),
+                    "quantidade": aleatorio.randint(1, 5),
+                    "preco_compra": 5,
+                    "preco_venda": 10,
+                    "data_ultima_mov": inicio + timedelta(days=i * 1000 // max(movimentos, 1)),
+                    "tipo_movimento": "entrada" if i % 3 else "saida",
+                }
+                for i in range(movimentos)
+            ))
+        _inserir(conexao, Financeiro, (
+            {
+                "tipo_lancamento": "R" if i % 2 else "P",
+                "origem": "V" if i % 2 else "C",
+                "cliente_id": aleatorio.randint(1, pessoas) if pessoas and i % 2 else None,
+                "descricao": f"Lançamento {i}",
+                "valor_nota": 100,
+                "vencimento": inicio + timedelta(days=i % 1000),
+                "status": EnumStatus.ABERTA if i % 4 else EnumStatus.PAGA,
+            }
+            for i in range(1, lancamentos + 1)
+        ))
+        reconstruir_resumos(conexao)
+
+
+def cronometrar(funcao, repeticoes=1):
+    """Menor tempo (segundos) de `repeticoes` execuções de funcao()"""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def aplicacao_qt():
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
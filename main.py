@@ -1,9 +1,11 @@
+import logging
 import sys
 from PyQt6.QtWidgets import QApplication, QDialog
 from sqlalchemy.orm import Session
 
 # Importa as configurações do Banco de Dados
 from src.Models.models import engine 
+from src.Models.migracoes import executar_migracoes, fechar_periodos_pendentes
 
 # Importa a tela de Login
 from src.Views.login_view import LoginDialog
@@ -12,6 +14,15 @@ from src.Views.login_view import LoginDialog
 from main_app import MainAppUnificado, aplicar_tema_calmo
 
 if __name__ == "__main__":
+    # Mensagens dos módulos (migrações aplicadas, falhas em segundo plano) no console
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    # Cria/atualiza o esquema do banco (não faz nada se já estiver atualizado)
+    executar_migracoes(engine)
+
+    # Fechamentos mensais do razão de estoque que ainda faltam (normalmente nenhum)
+    fechar_periodos_pendentes(engine)
+
     app = QApplication(sys.argv)
     
     # Aplica o tema visual
@@ -25,10 +25,12 @@ try:
     from src.Components.Comercial.tela_venda import TelaVenda
     from src.Components.Comercial.tela_compra import TelaCompra
     from src.Views.historico_vendas_view import HistoricoVendasWidget
+    from src.Views.dashboard_vendas_view import DashboardVendasWidget
 except ImportError:
     class TelaVenda(QWidget): pass
     class TelaCompra(QWidget): pass
     class HistoricoVendasWidget(QWidget): pass
+    class DashboardVendasWidget(QWidget): pass
 
 # GRUPO 3 - FINANCEIRO E ESTOQUE
 from src.Views.cadastro_financeiro_view import CadastroFinanceiroWidget
@@ -126,11 +128,15 @@ class MainAppUnificado(QMainWindow):
         
         self.layout_principal.addWidget(self.widget_conteudo)
 
+        # Indicador de carregamento das consultas em segundo plano
+        self.tela_atual = None
+        self.telas_acompanhadas = set()
+
         # Inicializa Widgets
         self.init_widgets()
 
         # Tela Inicial
-        self.trocar_widget(self.widget_dashboard_produtos, "Dashboard Geral")
+        self.abrir_tela("dashboard_produtos", "Dashboard Geral")
 
     def setup_sidebar(self):
         self.frame_lateral = QFrame()
@@ -246,6 +252,7 @@ class MainAppUnificado(QMainWindow):
         self.btn_venda = self.create_nav_button("Nova Venda", layout_lateral)
         self.btn_compra = self.create_nav_button("Nova Compra", layout_lateral)
         self.btn_hist = self.create_nav_button("Histórico Vendas", layout_lateral)
+        self.btn_dash_vend = self.create_nav_button("Dashboard Vendas", layout_lateral)
 
         layout_lateral.addSpacing(10)
         
@@ -270,31 +277,47 @@ class MainAppUnificado(QMainWindow):
         self.layout_principal.addWidget(self.frame_lateral)
 
     def init_widgets(self):
-        # Grupo 1
-        self.widget_dashboard_produtos = DashboardProdutosWidget(self.sessao)
-        self.widget_cadastro_produtos = CadastroProdutosWidget(self.sessao)
-        self.widget_cadastro_pessoas = CadastroPessoasWidget(self.sessao)
-        # Grupo 2
-        self.widget_venda = TelaVenda(sessao=self.sessao, sistema=self.sistema_comercial)
-        self.widget_compra = TelaCompra(sessao=self.sessao, sistema=self.sistema_comercial)
-        self.widget_historico = HistoricoVendasWidget(self.sessao)
-        # Grupo 3
-        self.widget_dashboard_financeiro = DashboardFinanceiroWidget(self.sessao)
-        self.widget_cadastro_financeiro = CadastroFinanceiroWidget(self.sessao)
-        self.widget_dashboard_estoque = DashboardEstoqueWidget(self.sessao)
-        self.widget_cadastro_estoque = CadastroEstoqueWidget(self.sessao)
+        """
+        Registra as telas sem construí-las. Cada tela é criada no primeiro
+        clique do seu botão e reaproveitada depois (ver obter_tela).
+        """
+        # chave -> (botão, título, fábrica)
+        self.registro_telas = {
+            # Grupo 1
+            "dashboard_produtos": (self.btn_dash_prod, "Dashboard Produtos", lambda: DashboardProdutosWidget(self.sessao)),
+            "cadastro_produtos": (self.btn_cad_prod, "Cadastro Produtos", lambda: CadastroProdutosWidget(self.sessao)),
+            "cadastro_pessoas": (self.btn_cad_pess, "Cadastro Pessoas", lambda: CadastroPessoasWidget(self.sessao)),
+            # Grupo 2
+            "venda": (self.btn_venda, "Vendas", lambda: TelaVenda(sessao=self.sessao, sistema=self.sistema_comercial)),
+            "compra": (self.btn_compra, "Compras", lambda: TelaCompra(sessao=self.sessao, sistema=self.sistema_comercial)),
+            "historico": (self.btn_hist, "Histórico", lambda: HistoricoVendasWidget(self.sessao)),
+            "dashboard_vendas": (self.btn_dash_vend, "Dashboard Vendas", lambda: DashboardVendasWidget(self.sessao)),
+            # Grupo 3
+            "dashboard_financeiro": (self.btn_dash_fin, "Dash Financeiro", lambda: DashboardFinanceiroWidget(self.sessao)),
+            "cadastro_financeiro": (self.btn_cad_fin, "Cad. Financeiro", lambda: CadastroFinanceiroWidget(self.sessao)),
+            "dashboard_estoque": (self.btn_dash_est, "Dash Estoque", lambda: DashboardEstoqueWidget(self.sessao)),
+            "cadastro_estoque": (self.btn_cad_est, "Cad. Estoque", lambda: CadastroEstoqueWidget(self.sessao)),
+        }
+        self.telas = {}
 
         # Conexões
-        self.btn_dash_prod.clicked.connect(lambda: self.trocar_widget(self.widget_dashboard_produtos, "Dashboard Produtos"))
-        self.btn_cad_prod.clicked.connect(lambda: self.trocar_widget(self.widget_cadastro_produtos, "Cadastro Produtos"))
-        self.btn_cad_pess.clicked.connect(lambda: self.trocar_widget(self.widget_cadastro_pessoas, "Cadastro Pessoas"))
-        self.btn_venda.clicked.connect(lambda: self.trocar_widget(self.widget_venda, "Vendas"))
-        self.btn_compra.clicked.connect(lambda: self.trocar_widget(self.widget_compra, "Compras"))
-        self.btn_hist.clicked.connect(lambda: self.trocar_widget(self.widget_historico, "Histórico"))
-        self.btn_dash_fin.clicked.connect(lambda: self.trocar_widget(self.widget_dashboard_financeiro, "Dash Financeiro"))
-        self.btn_cad_fin.clicked.connect(lambda: self.trocar_widget(self.widget_cadastro_financeiro, "Cad. Financeiro"))
-        self.btn_dash_est.clicked.connect(lambda: self.trocar_widget(self.widget_dashboard_estoque, "Dash Estoque"))
-        self.btn_cad_est.clicked.connect(lambda: self.trocar_widget(self.widget_cadastro_estoque, "Cad. Estoque"))
+        for chave, (btn, titulo, _) in self.registro_telas.items():
+            btn.clicked.connect(lambda _checked=False, c=chave, t=titulo: self.abrir_tela(c, t))
+
+    def obter_tela(self, chave):
+        """Devolve a tela da chave, construindo-a na primeira vez"""
+        widget = self.telas.get(chave)
+        if widget is None:
+            _, _, fabrica = self.registro_telas[chave]
+            widget = fabrica()
+            self.telas[chave] = widget
+        return widget
+
+    def abrir_tela(self, chave, titulo):
+        # Tela recém-criada já carregou seus dados no __init__
+        ja_existia = chave in self.telas
+        widget = self.obter_tela(chave)
+        self.trocar_widget(widget, titulo, recarregar=ja_existia)
 
     def create_nav_button(self, text, layout):
         btn = QPushButton(text)
@@ -312,19 +335,41 @@ class MainAppUnificado(QMainWindow):
         lbl.setStyleSheet("color: #9e9e9e; font-size: 11px; font-weight: bold; margin-top: 5px; margin-left: 5px;")
         layout.addWidget(lbl)
 
-    def trocar_widget(self, widget, titulo):
+    def trocar_widget(self, widget, titulo, recarregar=True):
         if self.layout_conteudo.count() > 0:
             item = self.layout_conteudo.itemAt(0)
             if item.widget():
                 item.widget().setParent(None)
         if widget:
             self.layout_conteudo.addWidget(widget)
-            if hasattr(widget, 'load_data'):
+            self.acompanhar_carregamento(widget)
+            if recarregar and hasattr(widget, 'load_data'):
                 try: widget.load_data()
                 except: pass
         self.setWindowTitle(f"Sistema ERP Integrado - {titulo}")
         self.atualizar_estilo_botoes(widget)
 
+    def acompanhar_carregamento(self, widget):
+        """Liga o estado 'carregando' do executor da tela à barra de status"""
+        self.tela_atual = widget
+        executor = getattr(widget, 'executor_consultas', None)
+        if executor is None:
+            self.statusBar().clearMessage()
+            return
+        if widget not in self.telas_acompanhadas:
+            self.telas_acompanhadas.add(widget)
+            executor.carregando.connect(lambda ativo, w=widget: self.exibir_carregamento(w, ativo))
+        # A tela pode ter começado a carregar no próprio __init__
+        self.exibir_carregamento(widget, executor.ocupado())
+
+    def exibir_carregamento(self, widget, ativo):
+        if widget is not self.tela_atual:
+            return
+        if ativo:
+            self.statusBar().showMessage("⏳ Carregando dados...")
+        else:
+            self.statusBar().clearMessage()
+
     def atualizar_estilo_botoes(self, widget_atual):
         estilo_padrao = """
             QPushButton { padding-left: 15px; text-align: left; border: none; border-radius: 4px; 
@@ -335,20 +380,10 @@ class MainAppUnificado(QMainWindow):
             QPushButton { padding-left: 15px; text-align: left; border: none; border-radius: 4px;
             background-color: #cce0ff; font-weight: bold; color: #004085; font-size: 14px; }
         """
-        mapa = [
-            (self.btn_dash_prod, self.widget_dashboard_produtos),
-            (self.btn_cad_prod, self.widget_cadastro_produtos),
-            (self.btn_cad_pess, self.widget_cadastro_pessoas),
-            (self.btn_venda, self.widget_venda),
-            (self.btn_compra, self.widget_compra),
-            (self.btn_hist, self.widget_historico),
-            (self.btn_dash_fin, self.widget_dashboard_financeiro),
-            (self.btn_cad_fin, self.widget_cadastro_financeiro),
-            (self.btn_dash_est, self.widget_dashboard_estoque),
-            (self.btn_cad_est, self.widget_cadastro_estoque),
-        ]
-        for btn, widget_ref in mapa:
-            btn.setStyleSheet(estilo_ativo if widget_ref == widget_atual else estilo_padrao)
+        for chave, (btn, _, _) in self.registro_telas.items():
+            widget_ref = self.telas.get(chave)
+            ativo = widget_ref is not None and widget_ref is widget_atual
+            btn.setStyleSheet(estilo_ativo if ativo else estilo_padrao)
 
     def abrir_configuracoes(self):
         if not self.usuario_atual: return
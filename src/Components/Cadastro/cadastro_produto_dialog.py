@@ -4,10 +4,11 @@ from PyQt6.QtWidgets import (
     QLabel, QPushButton
 )
 from PyQt6.QtGui import QDoubleValidator, QIntValidator
-from sqlalchemy import update
 from datetime import datetime
 
 from src.Models.models import Item 
+from src.Models.razao_estoque import registrar_ajuste
+from src.Models.concorrencia import atualizar_versionado, com_retentativas, ConflitoVersao
 from src.Utils.correcaoDeValores import  Converter_decimal, Converter_inteiro
 
 class FiltroProdutosDialog(QDialog):
@@ -227,6 +228,8 @@ class CadastroProdutosDialog(QDialog):
 
     def preencher_formulario(self):
         if self.item:
+            # Versão exibida no formulário: a gravação só acontece se ainda for a atual
+            self.versao_lida = self.item.versao
             self.codigo_input.setText(self.item.codigo_item or "")
             self.produto_input.setText(self.item.nome or "")
             self.custo_input.setText(f"{self.item.custo_unitario:,.2f}".replace('.', '#').replace(',', '.').replace('#', ','))
@@ -277,13 +280,22 @@ class CadastroProdutosDialog(QDialog):
             if reply == QMessageBox.StandardButton.No:
                 return 
 
-            try:
-                self.session.execute(
-                    update(Item).where(Item.id == self.item.id).values(**data)
-                )
+            def gravar():
+                estoque_anterior = self.item.estoque or 0
+                atualizar_versionado(self.session, Item, self.item.id, self.versao_lida, data)
+                # Estoque digitado no cadastro entra no razão como ajuste
+                if data['estoque'] is not None:
+                    registrar_ajuste(self.session, self.item, data['estoque'] - estoque_anterior,
+                                     "Ajuste no cadastro do produto")
                 self.session.commit()
+
+            try:
+                com_retentativas(self.session, gravar)
                 QMessageBox.information(self, "Sucesso", "Produto atualizado com sucesso!")
                 self.accept()
+            except ConflitoVersao as e:
+                self.session.rollback()
+                QMessageBox.warning(self, "Produto alterado em outro terminal", str(e))
             except Exception as e:
                 self.session.rollback()
                 QMessageBox.critical(self, "Erro no BD", f"Não foi possível atualizar o produto.\nErro: {e}")
@@ -295,6 +307,9 @@ class CadastroProdutosDialog(QDialog):
             )
             try:
                 self.session.add(novo_item)
+                self.session.flush()
+                registrar_ajuste(self.session, novo_item, novo_item.estoque,
+                                 "Estoque inicial no cadastro do produto")
                 self.session.commit()
                 QMessageBox.information(self, "Sucesso", "Produto cadastrado com sucesso!")
                 self.accept() 
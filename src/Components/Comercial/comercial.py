@@ -303,10 +303,148 @@ class CadastroProdutosDialog(QDialog):
                 QMessageBox.critical(self, "Erro no BD", f"Não foi possível salvar o produto.\nErro: {e}")
 # src/Components/Comercial/comercial.py
 
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import select, insert
+
+from src.Models.models import (
+    PedidoVenda, PedidoVendaItem, PedidoCompra, PedidoCompraItem,
+    MovimentoEstoque, Financeiro, EnumStatus
+)
+from src.Models.resumos import somar_venda, somar_financeiro, somar_movimentos
+from src.Models.custo_medio import registrar_entradas, registrar_saidas
+from src.Models.concorrencia import com_retentativas
+
+# Quantidade máxima de ids por cláusula IN (limite de parâmetros do SQLite)
+TAMANHO_LOTE_IN = 500
+
+
+def carregar_por_ids(sessao, colunas, coluna_id, ids):
+    """Busca linhas por id em poucos SELECT ... IN, devolvendo {id: linha}"""
+    ids = list(ids)
+    linhas = {}
+    for inicio in range(0, len(ids), TAMANHO_LOTE_IN):
+        lote = ids[inicio:inicio + TAMANHO_LOTE_IN]
+        for linha in sessao.execute(select(*colunas).where(coluna_id.in_(lote))):
+            linhas[linha.id] = linha
+    return linhas
+
+
+def expirar_itens(sessao, ids, atributos):
+    """Após UPDATE direto no banco, descarta valores antigos de Item já carregados na sessão"""
+    ids = set(ids)
+    for obj in list(sessao.identity_map.values()):
+        if isinstance(obj, Item) and obj.id in ids:
+            sessao.expire(obj, atributos)
+
+
 class PedidosCompra:
     def __init__(self, sessao):
         self.sessao = sessao
 
+    def registrar_compra(self, fornecedor_id, itens, data_emissao=None, numero_nf="",
+                         vencimento=None, status_financeiro=EnumStatus.ABERTA):
+        """Grava a compra (_gravar_compra), repetindo se o banco estiver ocupado por outro terminal"""
+        return com_retentativas(self.sessao, lambda: self._gravar_compra(
+            fornecedor_id, itens, data_emissao, numero_nf, vencimento, status_financeiro
+        ))
+
+    def _gravar_compra(self, fornecedor_id, itens, data_emissao, numero_nf, vencimento, status_financeiro):
+        """
+        Lança uma nota de compra em uma transação: pedido, itens, entrada de
+        estoque, custo médio, movimentos e a conta a pagar. Estoque e custo
+        médio são atualizados no próprio banco (estoque = estoque + :qtd, custo
+        ponderado pelos valores atuais da linha), sem depender do valor lido
+        antes; itens e movimentos vão em executemany. Custa o mesmo número de
+        comandos para 1 ou 1.000 linhas.
+
+        itens: lista de dicts no formato de TelaCompra.itens_compra
+               {"id", "nome", "quantidade", "preco_unitario", "subtotal"}
+        Devolve o id do pedido criado.
+        """
+        if not itens:
+            raise ValueError("A compra deve conter pelo menos um item")
+
+        sessao = self.sessao
+        data_emissao = data_emissao or date.today()
+        observacao = f"Compra NF {numero_nf}"
+
+        # Entrada total por produto: (quantidade, valor) de todas as linhas do produto na nota
+        entradas = {}
+        for item in itens:
+            quantidade, valor = entradas.get(item["id"], (0, Decimal("0")))
+            entradas[item["id"]] = (
+                quantidade + item["quantidade"],
+                valor + item["quantidade"] * Decimal(str(item["preco_unitario"])),
+            )
+
+        total = sum(Decimal(str(item["subtotal"])) for item in itens)
+
+        try:
+            produtos = carregar_por_ids(sessao, [Item.id, Item.preco_venda], Item.id, entradas)
+            faltando = set(entradas) - set(produtos)
+            if faltando:
+                raise ValueError(f"Produtos não encontrados: {sorted(faltando)}")
+
+            pedido = PedidoCompra(preco_total=total, data_emissao=data_emissao)
+            sessao.add(pedido)
+            sessao.flush()
+
+            sessao.execute(insert(PedidoCompraItem), [
+                {
+                    "pedido_id": pedido.id,
+                    "quantidade": item["quantidade"],
+                    "preco_unitario": item["preco_unitario"],
+                    "preco_total": item["subtotal"],
+                }
+                for item in itens
+            ])
+
+            # Estoque e custo médio ponderado no mesmo UPDATE relativo
+            registrar_entradas(sessao.connection(), entradas)
+            expirar_itens(sessao, entradas, ["estoque", "custo_unitario", "versao"])
+
+            movimentos = [
+                {
+                    "item_id": item["id"],
+                    "quantidade": item["quantidade"],
+                    "tipo_movimento": "entrada",
+                    "data_ultima_mov": date.today(),
+                    "observacao": observacao,
+                    "estoque_minimo": 0,
+                    "estoque_maximo": 0,
+                    "preco_venda": produtos[item["id"]].preco_venda or 0,
+                    "preco_compra": item["preco_unitario"],
+                    "fornecedor_id": fornecedor_id,
+                }
+                for item in itens
+            ]
+            sessao.execute(insert(MovimentoEstoque), movimentos)
+
+            sessao.add(Financeiro(
+                descricao=f"{observacao} - Pedido #{pedido.id}",
+                tipo_lancamento="P",
+                origem="C",
+                valor_nota=total,
+                data_emissao=data_emissao,
+                vencimento=vencimento or data_emissao,
+                status=status_financeiro,
+                pedido_compra_id=pedido.id,
+                fornecedor_id=fornecedor_id
+            ))
+
+            # Resumos dos dashboards, na mesma transação
+            somar_financeiro(sessao, "P", status_financeiro, vencimento or data_emissao, total)
+            somar_movimentos(sessao, movimentos)
+
+            sessao.commit()
+            return pedido.id
+
+        except Exception:
+            sessao.rollback()
+            raise
+
     def criar_pedido(self, fornecedor, itens, valor_total, condicao_pagamento):
         print("Pedido de compra criado (básico).")
         # implementar depois
@@ -321,6 +459,112 @@ class PedidosVenda:
     def __init__(self, sessao):
         self.sessao = sessao
 
+    def registrar_venda(self, cliente_id, itens, data_emissao=None, status_financeiro=EnumStatus.PAGA):
+        """Grava a venda (_gravar_venda), repetindo se o banco estiver ocupado por outro terminal"""
+        return com_retentativas(self.sessao, lambda: self._gravar_venda(
+            cliente_id, itens, data_emissao, status_financeiro
+        ))
+
+    def _gravar_venda(self, cliente_id, itens, data_emissao, status_financeiro):
+        """
+        Grava uma venda completa em uma transação: pedido, itens, baixa de
+        estoque, movimentos e o lançamento a receber. Tudo em lote: um SELECT
+        para os produtos, executemany para itens/movimentos e um UPDATE relativo
+        (estoque = estoque - :qtd) por produto, sem ler-modificar-gravar. Se o
+        saldo de algum produto não cobre a venda, nada é gravado
+        (EstoqueInsuficiente).
+
+        itens: lista de dicts no formato de TelaVenda.itens_venda
+               {"id", "nome", "quantidade", "preco", "subtotal"}
+        Devolve o id do pedido criado.
+        """
+        if not itens:
+            raise ValueError("A venda deve conter pelo menos um item")
+
+        sessao = self.sessao
+        data_emissao = data_emissao or date.today()
+
+        # Quantidade total por produto (o mesmo produto pode aparecer em várias linhas)
+        quantidades = {}
+        for item in itens:
+            quantidades[item["id"]] = quantidades.get(item["id"], 0) + item["quantidade"]
+
+        total = sum(Decimal(str(item["subtotal"])) for item in itens)
+
+        try:
+            produtos = carregar_por_ids(
+                sessao,
+                [Item.id, Item.custo_unitario, Item.fornecedor_id],
+                Item.id,
+                quantidades
+            )
+            faltando = set(quantidades) - set(produtos)
+            if faltando:
+                raise ValueError(f"Produtos não encontrados: {sorted(faltando)}")
+
+            pedido = PedidoVenda(
+                cliente_id=cliente_id,
+                preco_total=total,
+                data_emissao=data_emissao,
+                status="FINALIZADO"
+            )
+            sessao.add(pedido)
+            sessao.flush()
+
+            sessao.execute(insert(PedidoVendaItem), [
+                {
+                    "pedido_id": pedido.id,
+                    "produto": item["nome"],
+                    "quantidade": item["quantidade"],
+                    "preco_unitario": item["preco"],
+                    "preco_total": item["subtotal"],
+                }
+                for item in itens
+            ])
+
+            # Baixa atômica e relativa: não depende do valor lido pela sessão
+            registrar_saidas(sessao.connection(), quantidades)
+            expirar_itens(sessao, quantidades, ["estoque", "versao"])
+
+            movimentos = [
+                {
+                    "item_id": item["id"],
+                    "quantidade": item["quantidade"],
+                    "tipo_movimento": "saida",
+                    "data_ultima_mov": date.today(),
+                    "observacao": f"Venda #{pedido.id}",
+                    "preco_venda": item["preco"],
+                    "preco_compra": produtos[item["id"]].custo_unitario or 0,
+                    "fornecedor_id": produtos[item["id"]].fornecedor_id,
+                }
+                for item in itens
+            ]
+            sessao.execute(insert(MovimentoEstoque), movimentos)
+
+            sessao.add(Financeiro(
+                descricao=f"Venda #{pedido.id}",
+                tipo_lancamento="R",
+                origem="V",
+                valor_nota=total,
+                data_emissao=data_emissao,
+                vencimento=data_emissao,
+                status=status_financeiro,
+                pedido_venda_id=pedido.id,
+                cliente_id=cliente_id
+            ))
+
+            # Resumos dos dashboards, na mesma transação
+            somar_venda(sessao, data_emissao, cliente_id, None, total)
+            somar_financeiro(sessao, "R", status_financeiro, data_emissao, total)
+            somar_movimentos(sessao, movimentos)
+
+            sessao.commit()
+            return pedido.id
+
+        except Exception:
+            sessao.rollback()
+            raise
+
     def criar_pedido(self, cliente, itens, valor_total, condicao_pagamento):
         print("Pedido de venda criado (básico).")
         # implementar depois
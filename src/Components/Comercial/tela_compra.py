@@ -8,13 +8,11 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QDate
 from sqlalchemy import select, or_
-from datetime import date, datetime
+from datetime import date
 
 # Agora importamos Entidade em vez de Fornecedor
-from src.Models.models import (
-    Item, PedidoCompra, PedidoCompraItem, Entidade, 
-    MovimentoEstoque, Financeiro, EnumStatus
-)
+from src.Models.models import Item, Entidade
+from src.Components.Comercial.comercial import PedidosCompra
 
 class TelaCompra(QWidget):
     def __init__(self, sessao=None, sistema=None, parent=None):
@@ -230,6 +228,11 @@ class TelaCompra(QWidget):
         self.input_nf.clear()
         self.combo_fornecedor.setCurrentIndex(0)
 
+    def servico_compras(self):
+        if self.sistema is not None:
+            return self.sistema.pedidos_compra
+        return PedidosCompra(self.sessao)
+
     def finalizar_compra(self):
         if not self.itens_compra:
             QMessageBox.warning(self, "Aviso", "Adicione itens à compra.")
@@ -243,66 +246,14 @@ class TelaCompra(QWidget):
         data_hj = self.input_data.date().toPyDate()
 
         try:
-            # 1. PEDIDO DE COMPRA
-            pedido = PedidoCompra(
-                preco_total=self.total_compra_float,
-                data_emissao=data_hj
+            pedido_id = self.servico_compras().registrar_compra(
+                fornecedor_id, self.itens_compra, data_hj, numero_nf=self.input_nf.text()
             )
-            self.sessao.add(pedido)
-            self.sessao.flush()
-
-            # 2. ITENS E ESTOQUE
-            for item in self.itens_compra:
-                item_pedido = PedidoCompraItem(
-                    pedido_id=pedido.id,
-                    quantidade=item['quantidade'],
-                    preco_unitario=item['preco_unitario'],
-                    preco_total=item['subtotal']
-                )
-                self.sessao.add(item_pedido)
-
-                produto_db = self.sessao.get(Item, item['id'])
-                if produto_db:
-                    estoque_antigo = float(produto_db.estoque or 0)
-                    produto_db.estoque = estoque_antigo + item['quantidade']
-                    produto_db.custo_unitario = item['preco_unitario']
-
-                    # AGORA USAMOS A TABELA ENTIDADE COMO FORNECEDOR
-                    mov = MovimentoEstoque(
-                        item_id=produto_db.id,
-                        quantidade=item['quantidade'],
-                        tipo_movimento='entrada',
-                        data_ultima_mov=datetime.now(), 
-                        observacao=f"Compra NF {self.input_nf.text()}",
-                        estoque_minimo=0, 
-                        estoque_maximo=0,
-                        preco_venda=produto_db.preco_venda or 0,
-                        preco_compra=item['preco_unitario'],
-                        fornecedor_id=fornecedor_id # ID da Entidade, agora compatível
-                    )
-                    self.sessao.add(mov)
-
-            # 3. FINANCEIRO (Conta a Pagar)
-            conta_pagar = Financeiro(
-                descricao=f"Compra NF {self.input_nf.text()} - Pedido #{pedido.id}",
-                tipo_lancamento='P', 
-                origem='C', 
-                valor_nota=self.total_compra_float,
-                data_emissao=data_hj,
-                vencimento=data_hj, 
-                status=EnumStatus.ABERTA,
-                pedido_compra_id=pedido.id,
-                fornecedor_id=fornecedor_id # ID da Entidade, compatível com a tabela Financeiro
-            )
-            self.sessao.add(conta_pagar)
-
-            self.sessao.commit()
             
-            QMessageBox.information(self, "Sucesso", f"Compra #{pedido.id} registrada com sucesso!")
+            QMessageBox.information(self, "Sucesso", f"Compra #{pedido_id} registrada com sucesso!")
             self.limpar_compra()
 
         except Exception as e:
-            self.sessao.rollback()
             print(f"Erro detalhado: {e}")
             QMessageBox.critical(self, "Erro", f"Erro ao finalizar compra: {e}")
 
@@ -8,18 +8,10 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QDate
 from sqlalchemy import select
-from datetime import datetime
 
 # MODELS
-from src.Models.models import (
-    Item,
-    PedidoVenda,
-    PedidoVendaItem,
-    Entidade,
-    MovimentoEstoque,
-    Financeiro,
-    EnumStatus
-)
+from src.Models.models import Item, Entidade
+from src.Components.Comercial.comercial import PedidosVenda
 
 
 class TelaVenda(QWidget):
@@ -221,6 +213,11 @@ class TelaVenda(QWidget):
     # ======================================================
     # FINALIZAR
     # ======================================================
+    def servico_vendas(self):
+        if self.sistema is not None:
+            return self.sistema.pedidos_venda
+        return PedidosVenda(self.sessao)
+
     def finalizar_venda(self):
         if not self.itens_venda:
             QMessageBox.warning(self, "Aviso", "Nenhum produto adicionado.")
@@ -232,58 +229,12 @@ class TelaVenda(QWidget):
             return
 
         data = self.data_emissao.date().toPyDate()
-        total = sum(i["subtotal"] for i in self.itens_venda)
 
         try:
-            pedido = PedidoVenda(
-                cliente_id=cliente_id,
-                preco_total=total,
-                data_emissao=data,
-                status="FINALIZADO"
-            )
-            self.sessao.add(pedido)
-            self.sessao.flush()
-
-            for item in self.itens_venda:
-                self.sessao.add(PedidoVendaItem(
-                    pedido_id=pedido.id,
-                    produto=item["nome"],
-                    quantidade=item["quantidade"],
-                    preco_unitario=item["preco"],
-                    preco_total=item["subtotal"]
-                ))
-
-                prod = self.sessao.get(Item, item["id"])
-                prod.estoque -= item["quantidade"]
-
-                self.sessao.add(MovimentoEstoque(
-                    item_id=prod.id,
-                    quantidade=item["quantidade"],
-                    tipo_movimento="saida",
-                    data_ultima_mov=datetime.now(),
-                    observacao=f"Venda #{pedido.id}",
-                    preco_venda=item["preco"],
-                    preco_compra=prod.custo_unitario or 0,
-                    fornecedor_id=prod.fornecedor_id
-                ))
-
-            self.sessao.add(Financeiro(
-                descricao=f"Venda #{pedido.id}",
-                tipo_lancamento="R",
-                origem="V",
-                valor_nota=total,
-                data_emissao=data,
-                vencimento=data,
-                status=EnumStatus.PAGA,
-                pedido_venda_id=pedido.id,
-                cliente_id=cliente_id
-            ))
-
-            self.sessao.commit()
+            self.servico_vendas().registrar_venda(cliente_id, self.itens_venda, data)
             QMessageBox.information(self, "Sucesso", "Venda realizada com sucesso!")
             self.itens_venda.clear()
             self.atualizar_tabela()
 
         except Exception as e:
-            self.sessao.rollback()
             QMessageBox.critical(self, "Erro", f"Erro ao salvar venda:\n{e}")
@@ -6,10 +6,11 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtGui import QDoubleValidator
 from PyQt6.QtCore import QDate
 
-from sqlalchemy import update
 from datetime import datetime
 
 from src.Models.models import Financeiro, EnumStatus
+from src.Models.resumos import somar_financeiro
+from src.Models.concorrencia import atualizar_versionado, com_retentativas, ConflitoVersao
 from src.Utils.correcaoDeValores import Converter_decimal
 
 
@@ -269,6 +270,8 @@ class CadastroFinanceiroDialog(QDialog):
     # ---------------------------------------------------
     def preencher_formulario(self):
         f = self.lancamento
+        # Versão exibida no formulário: a gravação só acontece se ainda for a atual
+        self.versao_lida = f.versao
 
         self.tipo_combo.setCurrentIndex(0 if f.tipo_lancamento == 'P' else 1)
         self.origem_combo.setCurrentIndex(0 if f.origem == 'C' else 1)
@@ -314,13 +317,22 @@ class CadastroFinanceiroDialog(QDialog):
             return
 
         if self.is_editing:
-            try:
-                self.session.execute(
-                    update(Financeiro).where(Financeiro.id == self.lancamento.id).values(**dados)
-                )
+            def gravar():
+                anterior = self.lancamento
+                somar_financeiro(self.session, anterior.tipo_lancamento, anterior.status,
+                                 anterior.vencimento, anterior.valor_nota, sinal=-1)
+                atualizar_versionado(self.session, Financeiro, anterior.id, self.versao_lida, dados)
+                somar_financeiro(self.session, dados["tipo_lancamento"], dados["status"],
+                                 dados["vencimento"], dados["valor_nota"])
                 self.session.commit()
+
+            try:
+                com_retentativas(self.session, gravar)
                 QMessageBox.information(self, "Sucesso", "Lançamento atualizado com sucesso!")
                 self.accept()
+            except ConflitoVersao as e:
+                self.session.rollback()
+                QMessageBox.warning(self, "Lançamento alterado em outro terminal", str(e))
             except Exception as e:
                 self.session.rollback()
                 QMessageBox.critical(self, "Erro", f"Falha ao atualizar.\n{e}")
@@ -329,6 +341,8 @@ class CadastroFinanceiroDialog(QDialog):
 
             try:
                 self.session.add(novo)
+                somar_financeiro(self.session, novo.tipo_lancamento, novo.status,
+                                 novo.vencimento, novo.valor_nota)
                 self.session.commit()
                 QMessageBox.information(self, "Sucesso", "Lançamento criado com sucesso!")
                 self.accept()
@@ -0,0 +1,150 @@
+# src/Models/busca_textual.py
+
+import re
+import unicodedata
+
+from sqlalchemy import select, literal_column, table, column
+
+# ==========================================================
+# BUSCA TEXTUAL (SQLite FTS5)
+# ==========================================================
+# Índices invertidos paralelos a entidade e itens, mantidos por triggers:
+# qualquer INSERT/UPDATE/DELETE (ORM, SQL direto, importação) os atualiza.
+#
+# - unicode61 remove_diacritics 2: ignora maiúsculas e acentos
+#   ("joao" encontra "João", "acucar" encontra "Açúcar");
+# - prefix: índices extras de prefixo, para "sil*" não varrer o vocabulário;
+# - documento: CPF/CNPJ só com dígitos, para achar "12345678900" e "123.456".
+#
+# Os triggers de UPDATE só disparam para as colunas indexadas, então baixas
+# de estoque e alterações de preço não reescrevem o índice.
+
+TOKENIZADOR = "unicode61 remove_diacritics 2"
+PREFIXOS = "2 3 4"
+
+
+def sql_somente_digitos(coluna):
+    """Expressão SQL do documento só com dígitos (mesma regra de somente_digitos)"""
+    expr = f"coalesce({coluna}, '')"
+    for caractere in (".", "-", "/", " "):
+        expr = f"replace({expr}, '{caractere}', '')"
+    return expr
+
+
+# nome da tabela FTS -> (tabela base, {coluna FTS: expressão SQL sobre a linha}, colunas que disparam o UPDATE)
+INDICES = {
+    "entidade_fts": (
+        "entidade",
+        {
+            "razao_social": "{r}.razao_social",
+            "nome_fantasia": "{r}.nome_fantasia",
+            "cpf_cnpj": "{r}.cpf_cnpj",
+            "documento": sql_somente_digitos("{r}.cpf_cnpj"),
+        },
+        ["razao_social", "nome_fantasia", "cpf_cnpj"],
+    ),
+    "itens_fts": (
+        "itens",
+        {
+            "nome": "{r}.nome",
+            "codigo_item": "{r}.codigo_item",
+        },
+        ["nome", "codigo_item"],
+    ),
+}
+
+
+def _ddl_indice(nome_fts, tabela, colunas, colunas_update):
+    nomes = ", ".join(colunas)
+
+    def valores(r):
+        return ", ".join(expr.format(r=r) for expr in colunas.values())
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {nome_fts} USING fts5("
+        f"{nomes}, tokenize='{TOKENIZADOR}', prefix='{PREFIXOS}')",
+
+        f"CREATE TRIGGER IF NOT EXISTS {nome_fts}_ai AFTER INSERT ON {tabela} BEGIN "
+        f"INSERT INTO {nome_fts}(rowid, {nomes}) VALUES (new.id, {valores('new')}); END",
+
+        f"CREATE TRIGGER IF NOT EXISTS {nome_fts}_ad AFTER DELETE ON {tabela} BEGIN "
+        f"DELETE FROM {nome_fts} WHERE rowid = old.id; END",
+
+        f"CREATE TRIGGER IF NOT EXISTS {nome_fts}_au AFTER UPDATE OF {', '.join(colunas_update)} ON {tabela} BEGIN "
+        f"DELETE FROM {nome_fts} WHERE rowid = old.id; "
+        f"INSERT INTO {nome_fts}(rowid, {nomes}) VALUES (new.id, {valores('new')}); END",
+    ]
+
+
+def criar_indices_textuais(conexao):
+    """Cria tabelas FTS e triggers (se faltarem) e reindexa o conteúdo atual"""
+    for nome_fts, (tabela, colunas, colunas_update) in INDICES.items():
+        for ddl in _ddl_indice(nome_fts, tabela, colunas, colunas_update):
+            conexao.exec_driver_sql(ddl)
+        conexao.exec_driver_sql(f"DELETE FROM {nome_fts}")
+        conexao.exec_driver_sql(
+            f"INSERT INTO {nome_fts}(rowid, {', '.join(colunas)}) "
+            f"SELECT r.id, {', '.join(expr.format(r='r') for expr in colunas.values())} FROM {tabela} r"
+        )
+        conexao.exec_driver_sql(f"INSERT INTO {nome_fts}({nome_fts}) VALUES ('optimize')")
+
+
+def expressao_busca(texto):
+    """
+    Converte o texto digitado numa consulta FTS5 segura: cada palavra vira um
+    prefixo entre aspas ("silva"* "jo"*), todas obrigatórias. Devolve None se
+    não sobrar nenhum termo pesquisável.
+    """
+    termos = []
+    for palavra in texto.split():
+        palavra = palavra.replace('"', "")
+        if _tokens(palavra):
+            termos.append(f'"{palavra}"*')
+    return " ".join(termos) or None
+
+
+def filtro_textual(coluna_id, nome_fts, texto):
+    """
+    Condição "id IN (SELECT rowid FROM <fts> WHERE <fts> MATCH :termo)" para
+    usar no WHERE da consulta da tela. None quando o texto não tem termos.
+    """
+    expressao = expressao_busca(texto)
+    if expressao is None:
+        return None
+    fts = table(nome_fts, column("rowid"))
+    return coluna_id.in_(
+        select(fts.c.rowid).where(literal_column(nome_fts).op("MATCH")(expressao))
+    )
+
+
+# ----------------------------------------------------------
+# Mesma regra de busca aplicada em memória (refinamento local)
+# ----------------------------------------------------------
+def _tokens(texto):
+    """Tokens como o unicode61 gera: sem acentos, minúsculos, só letras/dígitos"""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return re.findall(r"[^\W_]+", sem_acentos.casefold())
+
+
+def _frase_em(frase, tokens):
+    # Tokens consecutivos; só o último é prefixo (como em "joao silv"*)
+    n = len(frase)
+    for i in range(len(tokens) - n + 1):
+        if tokens[i:i + n - 1] == frase[:-1] and tokens[i + n - 1].startswith(frase[-1]):
+            return True
+    return False
+
+
+def corresponde(texto, campos):
+    """True se os valores em `campos` seriam encontrados por expressao_busca(texto)"""
+    tokens_campos = [_tokens(campo) for campo in campos]
+    for palavra in texto.split():
+        frase = _tokens(palavra)
+        if frase and not any(_frase_em(frase, tokens) for tokens in tokens_campos):
+            return False
+    return True
+
+
+def somente_digitos(texto):
+    return re.sub(r"[.\-/ ]", "", texto or "")
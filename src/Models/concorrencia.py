@@ -0,0 +1,90 @@
+# src/Models/concorrencia.py
+
+import random
+import sqlite3
+import time
+
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+
+# ==========================================================
+# CONCORRÊNCIA ENTRE TERMINAIS
+# ==========================================================
+# Vários terminais gravam no mesmo erp.db:
+#
+# - estoque e custo mudam por UPDATE relativo no banco
+#   (estoque = estoque - :qtd), nunca com um valor calculado em Python a
+#   partir do que foi lido antes: duas vendas simultâneas somam as duas baixas.
+#   A baixa só acontece se o saldo a cobre (estoque >= :qtd no WHERE); se
+#   outro terminal vendeu antes, a operação inteira falha com EstoqueInsuficiente;
+# - Item e Financeiro têm a coluna versao, incrementada por todo UPDATE
+#   (os UPDATEs diretos fazem versao = versao + 1). Quem grava valores lidos
+#   antes, como a edição de um cadastro aberto na tela, usa
+#   atualizar_versionado, que só grava se a versão ainda é a lida; o ORM faz
+#   a mesma verificação no flush (version_id_col);
+# - com_retentativas repete a operação inteira, com espera crescente e um
+#   limite de tentativas, quando o banco está ocupado (SQLITE_BUSY) ou o ORM
+#   encontra outra versão. A operação precisa reler o que usa a cada tentativa.
+
+TENTATIVAS = 5
+ESPERA_INICIAL = 0.05  # segundos; dobra a cada tentativa, com variação aleatória
+
+_CODIGOS_OCUPADO = (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+class ConflitoVersao(Exception):
+    """O registro foi alterado por outro terminal depois de lido"""
+
+
+class EstoqueInsuficiente(Exception):
+    """A baixa deixaria o estoque de algum item negativo (não é repetida por com_retentativas)"""
+
+
+def atualizar_versionado(sessao, modelo, registro_id, versao_lida, valores):
+    """
+    UPDATE ... SET valores, versao = versao + 1 WHERE id = :id AND
+    versao = :versao_lida. Levanta ConflitoVersao se o registro mudou
+    depois da leitura (não é repetido por com_retentativas: os valores
+    precisam ser revistos). Não faz commit.
+    """
+    resultado = sessao.execute(
+        update(modelo)
+        .where(modelo.id == registro_id, modelo.versao == versao_lida)
+        .values(**valores, versao=modelo.versao + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if resultado.rowcount != 1:
+        raise ConflitoVersao(
+            "O registro foi alterado ou excluído em outro terminal depois de aberto. "
+            "Reabra-o para ver os valores atuais."
+        )
+
+
+def erro_transitorio(erro):
+    """True para banco ocupado/bloqueado (SQLITE_BUSY/LOCKED) e versão alterada no flush"""
+    if isinstance(erro, StaleDataError):
+        return True
+    if isinstance(erro, OperationalError):
+        codigo = getattr(erro.orig, "sqlite_errorcode", None)
+        if codigo is not None:
+            return codigo & 0xFF in _CODIGOS_OCUPADO
+        mensagem = str(erro.orig).lower()
+        return "locked" in mensagem or "busy" in mensagem
+    return False
+
+
+def com_retentativas(sessao, operacao, tentativas=TENTATIVAS, espera=ESPERA_INICIAL):
+    """
+    Executa operacao() (que faz o próprio commit) e devolve o resultado. Em
+    erro transitório, desfaz a transação, espera e repete, até `tentativas`
+    vezes; depois disso, ou em qualquer outro erro, levanta o erro original.
+    """
+    for tentativa in range(1, tentativas + 1):
+        try:
+            return operacao()
+        except (OperationalError, StaleDataError) as e:
+            sessao.rollback()
+            if tentativa == tentativas or not erro_transitorio(e):
+                raise
+            time.sleep(espera * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5))
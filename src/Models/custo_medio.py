@@ -0,0 +1,253 @@
+# src/Models/custo_medio.py
+
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import groupby, islice, tee
+from operator import itemgetter
+
+from sqlalchemy import select, update, bindparam, func, case, tuple_, Integer
+
+from src.Models.models import Item, MovimentoEstoque
+from src.Models.concorrencia import EstoqueInsuficiente
+
+# ==========================================================
+# CUSTO MÉDIO PONDERADO
+# ==========================================================
+# Item.custo_unitario é o custo médio ponderado do estoque. Cada entrada
+# recalcula o custo no mesmo UPDATE que soma o estoque, a partir dos valores
+# atuais da linha (O(1) por movimento, sem reler o histórico):
+#
+#     custo = (estoque * custo + quantidade * preço) / (estoque + quantidade)
+#
+# Com o estoque zerado ou negativo antes da entrada, o custo passa a ser o
+# preço da entrada. Saídas e ajustes negativos não mudam o custo; ajustes
+# positivos entram pelo preço do movimento (registrar_ajuste grava o custo
+# corrente, então não o alteram).
+#
+# recalcular_custos_medios refaz o custo de todos os itens a partir dos
+# movimentos, com a mesma regra:
+#     python -m src.Models.custo_medio
+#
+# O razão de estoque guarda em movimento_estoque.custo_medio o custo após
+# cada movimento, pela mesma regra (trigger em src/Models/razao_estoque.py;
+# recalcular_custos_movimentos refaz a coluna inteira).
+
+_ITENS = Item.__table__
+_MOVIMENTOS = MovimentoEstoque.__table__
+
+
+def custo_apos_entrada(quantidade, valor):
+    """
+    Expressão SQL do custo médio após a entrada de `quantidade` unidades que
+    somam `valor` (quantidade * preço). No UPDATE, estoque e custo_unitario
+    são os valores de antes da alteração, mesmo que o estoque também seja
+    atualizado no mesmo comando.
+    """
+    estoque = func.coalesce(_ITENS.c.estoque, 0)
+    custo = func.coalesce(_ITENS.c.custo_unitario, 0)
+    return case(
+        (estoque <= 0, func.round(valor * 1.0 / quantidade, 2)),
+        else_=func.round((estoque * custo + valor) / (estoque + quantidade), 2)
+    )
+
+
+def registrar_entradas(conexao, entradas):
+    """
+    Soma o estoque e recalcula o custo médio dos itens num único UPDATE
+    (executemany), sem ler o item antes. Não faz commit.
+
+    entradas: {item_id: (quantidade, valor)}, já agregadas por item. O valor
+    vai para o banco em centavos inteiros, sem passar por float no Python.
+    """
+    if not entradas:
+        return
+    conexao.execute(
+        update(_ITENS)
+        .where(_ITENS.c.id == bindparam("b_id"))
+        .values(
+            estoque=func.coalesce(_ITENS.c.estoque, 0) + bindparam("b_qtd"),
+            custo_unitario=custo_apos_entrada(
+                bindparam("b_qtd"), bindparam("b_centavos", type_=Integer) / 100.0
+            ),
+            versao=_ITENS.c.versao + 1
+        ),
+        [
+            {"b_id": item_id, "b_qtd": quantidade, "b_centavos": _centavos(valor)}
+            for item_id, (quantidade, valor) in entradas.items()
+        ]
+    )
+
+
+def registrar_saidas(conexao, saidas):
+    """
+    Baixa o estoque dos itens num único UPDATE (executemany), só onde o saldo
+    cobre a quantidade. Não faz commit. Levanta EstoqueInsuficiente se algum
+    item ficaria negativo (por exemplo, vendido ao mesmo tempo em outro
+    terminal); quem chama desfaz a transação. O custo médio não muda.
+
+    saidas: {item_id: quantidade}, já agregadas por item.
+    """
+    if not saidas:
+        return
+    estoque = func.coalesce(_ITENS.c.estoque, 0)
+    resultado = conexao.execute(
+        update(_ITENS)
+        .where(_ITENS.c.id == bindparam("b_id"), estoque >= bindparam("b_qtd"))
+        .values(estoque=estoque - bindparam("b_qtd"), versao=_ITENS.c.versao + 1),
+        [{"b_id": item_id, "b_qtd": quantidade} for item_id, quantidade in saidas.items()]
+    )
+    if resultado.rowcount != len(saidas):
+        raise EstoqueInsuficiente(
+            "Estoque insuficiente: o saldo de um ou mais itens não cobre a quantidade "
+            "(pode ter sido baixado em outro terminal). Confira o estoque e refaça a operação."
+        )
+
+
+def _centavos(valor):
+    return int((Decimal(str(valor)) * 100).to_integral_value(ROUND_HALF_UP))
+
+
+# ----------------------------------------------------------
+# RECÁLCULO EM LOTE
+# ----------------------------------------------------------
+# As contas ficam em float, como as do SQLite (colunas REAL); só o
+# arredondamento passa por Decimal, para dar o mesmo centavo do round() do
+# trigger e de custo_apos_entrada.
+_CENTAVO = Decimal("0.01")
+_FOLGA_SQLITE = Decimal(3e-16)
+
+
+def _arredondar(valor):
+    """
+    round(valor, 2) do SQLite: ROUND_HALF_UP sobre o valor exato do float
+    acrescido da folga relativa de 3e-16 que o printf do SQLite soma. Assim
+    2.675 (2.67499... em binário) vai a 2.68 como lá, e não a 2.67 como no
+    round() do Python.
+    """
+    exato = abs(Decimal(valor))
+    centavos = float((exato + exato * _FOLGA_SQLITE).quantize(_CENTAVO, ROUND_HALF_UP))
+    return centavos if valor >= 0 else -centavos
+
+
+def custos_apos_movimentos(movimentos):
+    """Custo médio após cada movimento da sequência (tipo, quantidade, preco_compra) de um item"""
+    estoque = custo = 0.0
+    for tipo, quantidade, preco in movimentos:
+        quantidade = float(quantidade or 0)
+        if tipo == "saida":
+            estoque -= quantidade
+        elif quantidade <= 0:
+            # Ajuste negativo (ou nulo): só baixa o estoque
+            estoque += quantidade
+        else:
+            preco = custo if preco is None else float(preco)
+            if estoque <= 0:
+                custo = _arredondar(preco)
+            else:
+                custo = _arredondar((estoque * custo + quantidade * preco) / (estoque + quantidade))
+            estoque += quantidade
+        yield custo
+
+
+def _custo_dos_movimentos(movimentos):
+    """Custo médio ao fim da sequência (tipo, quantidade, preco_compra) de um item"""
+    custo = 0.0
+    for custo in custos_apos_movimentos(movimentos):
+        pass
+    return custo
+
+
+def _movimentos_em_ordem(conexao, tamanho_lote):
+    """
+    Movimentos (item_id, id, tipo, quantidade, preco_compra) de todos os itens
+    em ordem (item, data, id), lidos em páginas de `tamanho_lote` linhas por
+    keyset no índice (item_id, data_ultima_mov). Cada página é lida inteira
+    antes dos UPDATEs que rodam na mesma conexão, e a memória não depende do
+    número de movimentos de um item nem do razão.
+    """
+    chave = (MovimentoEstoque.item_id, MovimentoEstoque.data_ultima_mov, MovimentoEstoque.id)
+    pagina = (
+        select(
+            MovimentoEstoque.item_id, MovimentoEstoque.id, MovimentoEstoque.tipo_movimento,
+            MovimentoEstoque.quantidade, MovimentoEstoque.preco_compra, MovimentoEstoque.data_ultima_mov
+        )
+        .order_by(*chave)
+        .limit(tamanho_lote)
+    )
+    stmt = pagina
+    while True:
+        linhas = conexao.execute(stmt).all()
+        for linha in linhas:
+            yield linha[:5]
+        if len(linhas) < tamanho_lote:
+            return
+        ultima = linhas[-1]
+        stmt = pagina.where(tuple_(*chave) > tuple_(ultima.item_id, ultima.data_ultima_mov, ultima.id))
+
+
+def _gravar_em_lotes(conexao, stmt, parametros, tamanho_lote):
+    """executemany de `stmt` com `tamanho_lote` parâmetros por vez; devolve o total gravado"""
+    total = 0
+    while True:
+        bloco = list(islice(parametros, tamanho_lote))
+        if not bloco:
+            return total
+        conexao.execute(stmt, bloco)
+        total += len(bloco)
+
+
+def recalcular_custos_medios(conexao, tamanho_lote=5000):
+    """
+    Refaz Item.custo_unitario de todos os itens que têm movimentos: os
+    movimentos são lidos em ordem (item, data, id), em páginas de
+    `tamanho_lote` linhas, o custo de cada item sai de uma passada por eles e
+    vai para um UPDATE executemany a cada `tamanho_lote` itens. A memória fica
+    limitada ao lote. Não faz commit. Devolve (itens, movimentos) processados.
+    """
+    custos = (
+        {"b_id": item_id, "b_custo": _custo_dos_movimentos(linha[2:] for linha in grupo)}
+        for item_id, grupo in groupby(_movimentos_em_ordem(conexao, tamanho_lote), key=itemgetter(0))
+    )
+    itens = _gravar_em_lotes(
+        conexao,
+        update(_ITENS)
+        .where(_ITENS.c.id == bindparam("b_id"))
+        .values(custo_unitario=bindparam("b_custo"), versao=_ITENS.c.versao + 1),
+        custos, tamanho_lote
+    )
+    return itens, conexao.scalar(select(func.count(MovimentoEstoque.id)))
+
+
+def _custos_por_movimento(movimentos):
+    for _, grupo in groupby(movimentos, key=itemgetter(0)):
+        linhas, dados = tee(grupo)
+        for linha, custo in zip(linhas, custos_apos_movimentos(linha[2:] for linha in dados)):
+            yield {"b_id": linha[1], "b_custo": custo}
+
+
+def recalcular_custos_movimentos(conexao, tamanho_lote=5000):
+    """
+    Refaz movimento_estoque.custo_medio (custo do item após cada movimento)
+    de todos os movimentos, em lotes como recalcular_custos_medios. Não
+    altera Item.custo_unitario nem faz commit. Devolve os movimentos gravados.
+    """
+    return _gravar_em_lotes(
+        conexao,
+        update(_MOVIMENTOS)
+        .where(_MOVIMENTOS.c.id == bindparam("b_id"))
+        .values(custo_medio=bindparam("b_custo")),
+        _custos_por_movimento(_movimentos_em_ordem(conexao, tamanho_lote)), tamanho_lote
+    )
+
+
+if __name__ == "__main__":
+    import time
+    from src.Models.models import engine
+    from src.Models.migracoes import executar_migracoes, transacao_exclusiva
+
+    executar_migracoes(engine)
+    inicio = time.perf_counter()
+    with transacao_exclusiva(engine) as conexao:
+        itens, movimentos = recalcular_custos_medios(conexao)
+    segundos = time.perf_counter() - inicio
+    print(f"✅ Custo médio de {itens} item(ns) recalculado a partir de {movimentos} movimento(s) "
+          f"em {segundos:.1f}s ({movimentos / max(segundos, 1e-9):,.0f} movimentos/s)")
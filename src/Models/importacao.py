@@ -0,0 +1,473 @@
+# src/Models/importacao.py
+
+import csv
+import re
+import unicodedata
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import select, insert, update, bindparam, func, literal_column
+
+from src.Models.models import Item, Entidade, Contato, TipoPessoaEnum
+from src.Models.busca_textual import sql_somente_digitos, somente_digitos
+from src.Models.razao_estoque import registrar_ajustes
+from src.Models.tabela_preco import sincronizar_tabela_preco
+from src.Models.concorrencia import com_retentativas
+from src.Utils.correcaoDeValores import Converter_decimal
+
+# ==========================================================
+# IMPORTAÇÃO DE PRODUTOS E PESSOAS (CSV)
+# ==========================================================
+# O arquivo é lido como gerador, em lotes de TAMANHO_LOTE linhas: a memória
+# usada depende do lote, não do tamanho do arquivo. Para cada lote:
+#
+# - cada linha é validada e convertida (números com Converter_decimal);
+#   linhas inválidas são rejeitadas com o número da linha e o motivo;
+# - linhas repetidas no lote (mesmo codigo_item, ou mesmo CPF/CNPJ só com
+#   dígitos) ficam só com a última;
+# - um SELECT ... IN separa o que já existe do que é novo, e a gravação é um
+#   executemany de INSERT e outro de UPDATE, numa transação por lote (com
+#   com_retentativas). Repetições entre lotes caem no UPDATE do lote seguinte.
+#
+# Colunas ausentes no arquivo, ou vazias na linha, não alteram o cadastro
+# existente. Estoque importado entra no razão como ajuste. Não depende da
+# interface:
+#     python -m src.Models.importacao produtos arquivo.csv
+#     python -m src.Models.importacao pessoas arquivo.csv --encoding latin-1
+
+TAMANHO_LOTE = 500     # também o tamanho das listas IN (limite de parâmetros do SQLite)
+MAXIMO_ERROS = 100     # mensagens guardadas; as demais rejeições só são contadas
+
+# Campo -> nomes aceitos no cabeçalho (comparados sem acentos, maiúsculas e espaços)
+COLUNAS_PRODUTO = {
+    "codigo_item": ("codigo_item", "codigo", "cod", "sku"),
+    "nome": ("nome", "produto"),
+    "descricao": ("descricao",),
+    "estoque": ("estoque", "quantidade", "qtd"),
+    "estoque_minimo": ("estoque_minimo", "minimo"),
+    "custo_unitario": ("custo_unitario", "custo", "preco_custo"),
+    "preco_venda": ("preco_venda", "preco", "venda"),
+    "fornecedor": ("fornecedor_cpf_cnpj", "cnpj_fornecedor", "fornecedor"),
+}
+
+COLUNAS_PESSOA = {
+    "cpf_cnpj": ("cpf_cnpj", "cpf", "cnpj", "documento"),
+    "razao_social": ("razao_social", "nome"),
+    "nome_fantasia": ("nome_fantasia", "fantasia"),
+    "inscricao_estadual": ("inscricao_estadual", "ie"),
+    "tipo_entidade": ("tipo_entidade", "tipo"),
+    "obs": ("obs", "observacao"),
+    "telefone_primario": ("telefone_primario", "telefone", "fone"),
+    "telefone_secundario": ("telefone_secundario", "celular"),
+    "email": ("email", "e_mail"),
+    "logradouro": ("logradouro", "endereco"),
+    "numero": ("numero",),
+    "complemento": ("complemento",),
+    "bairro": ("bairro",),
+    "cidade": ("cidade", "municipio"),
+    "cep": ("cep",),
+    "uf": ("uf", "estado"),
+}
+
+_CAMPOS_ENTIDADE = ("razao_social", "nome_fantasia", "inscricao_estadual", "tipo_entidade", "obs")
+_CAMPOS_CONTATO = ("telefone_primario", "telefone_secundario", "email", "logradouro", "numero",
+                   "complemento", "bairro", "cidade", "cep", "uf")
+
+_DOCUMENTO = literal_column(sql_somente_digitos("entidade.cpf_cnpj"))
+
+
+def criar_indice_documento(conexao):
+    """Migração: índice do CPF/CNPJ só com dígitos, usado para achar pessoas já cadastradas"""
+    conexao.exec_driver_sql(
+        f"CREATE INDEX IF NOT EXISTS ix_entidade_documento ON entidade ({sql_somente_digitos('cpf_cnpj')})"
+    )
+
+
+class ResultadoImportacao:
+    """Contadores da importação; também é o que o callback de progresso recebe a cada lote"""
+
+    def __init__(self):
+        self.lidas = 0
+        self.inseridas = 0
+        self.atualizadas = 0
+        self.duplicadas = 0
+        self.rejeitadas = 0
+        self.erros = []  # (linha, motivo), até MAXIMO_ERROS
+
+    @property
+    def gravadas(self):
+        return self.inseridas + self.atualizadas
+
+    def rejeitar(self, linha, motivo):
+        self.rejeitadas += 1
+        if len(self.erros) < MAXIMO_ERROS:
+            self.erros.append((linha, motivo))
+
+    def resumo(self):
+        return (f"{self.lidas} linha(s) lida(s): {self.inseridas} incluída(s), "
+                f"{self.atualizadas} atualizada(s), {self.duplicadas} repetida(s), "
+                f"{self.rejeitadas} rejeitada(s)")
+
+
+# ----------------------------------------------------------
+# LEITURA
+# ----------------------------------------------------------
+def _normalizar_nome(nome):
+    decomposto = unicodedata.normalize("NFKD", nome or "")
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return "_".join(re.split(r"[^a-z0-9]+", sem_acentos.lower())).strip("_")
+
+
+def ler_csv(caminho, colunas, obrigatoria, encoding="utf-8-sig"):
+    """
+    Gera (número da linha, {campo: texto}) para cada linha não vazia, sem
+    carregar o arquivo. O separador (; , ou tab) é o mais frequente no
+    cabeçalho; colunas que não estão em `colunas` são ignoradas.
+    """
+    aliases = {alias: campo for campo, nomes in colunas.items() for alias in nomes}
+    with open(caminho, newline="", encoding=encoding) as arquivo:
+        primeira = arquivo.readline()
+        separador = max(";,\t", key=primeira.count)
+        arquivo.seek(0)
+
+        leitor = csv.reader(arquivo, delimiter=separador)
+        cabecalho = [aliases.get(_normalizar_nome(nome)) for nome in next(leitor, [])]
+        if obrigatoria not in cabecalho:
+            raise ValueError(f"Coluna obrigatória '{obrigatoria}' não encontrada no cabeçalho.")
+        posicoes = [(i, campo) for i, campo in enumerate(cabecalho) if campo]
+
+        for numero, valores in enumerate(leitor, start=2):
+            if not any(v.strip() for v in valores):
+                continue
+            yield numero, {
+                campo: (valores[i].strip() if i < len(valores) else "")
+                for i, campo in posicoes
+            }
+
+
+# ----------------------------------------------------------
+# VALIDAÇÃO DAS LINHAS
+# ----------------------------------------------------------
+def _texto(valores, campo, tamanho):
+    texto = valores.get(campo) or None
+    if texto and len(texto) > tamanho:
+        raise ValueError(f"{campo} com mais de {tamanho} caracteres")
+    return texto
+
+
+def _numero(valores, campo):
+    texto = valores.get(campo)
+    if not texto:
+        return None
+    numero = Converter_decimal(texto)
+    if numero is None:
+        raise ValueError(f"{campo} inválido: '{texto}'")
+    return numero
+
+
+def _documento(texto, campo="cpf_cnpj"):
+    digitos = somente_digitos(texto)
+    if not digitos.isdigit() or len(digitos) not in (11, 14):
+        raise ValueError(f"{campo} inválido: '{texto}' (esperado CPF com 11 ou CNPJ com 14 dígitos)")
+    return digitos
+
+
+def preparar_produto(valores):
+    """(codigo_item, campos) de uma linha do CSV de produtos; ValueError se inválida"""
+    codigo = _texto(valores, "codigo_item", 50)
+    if not codigo:
+        raise ValueError("codigo_item vazio")
+    dados = {}
+    for campo, tamanho in (("nome", 100), ("descricao", 10000)):
+        if campo in valores:
+            dados[campo] = _texto(valores, campo, tamanho)
+    for campo in ("estoque", "estoque_minimo", "custo_unitario", "preco_venda"):
+        if campo in valores:
+            dados[campo] = _numero(valores, campo)
+    if "fornecedor" in valores:
+        texto = valores["fornecedor"]
+        dados["fornecedor"] = _documento(texto, "fornecedor") if texto else None
+    return codigo, dados
+
+
+def preparar_pessoa(valores):
+    """(CPF/CNPJ só com dígitos, campos) de uma linha do CSV de pessoas; ValueError se inválida"""
+    documento = _documento(valores.get("cpf_cnpj", ""))
+    dados = {
+        "cpf_cnpj": valores["cpf_cnpj"][:20],
+        "tipo_pessoa": TipoPessoaEnum.FISICA if len(documento) == 11 else TipoPessoaEnum.JURIDICA,
+    }
+    tamanhos = {"razao_social": 100, "nome_fantasia": 100, "inscricao_estadual": 16,
+                "tipo_entidade": 50, "obs": 10000, "telefone_primario": 20,
+                "telefone_secundario": 20, "email": 100, "logradouro": 100, "numero": 20,
+                "complemento": 100, "bairro": 100, "cidade": 100, "cep": 10, "uf": 2}
+    for campo, tamanho in tamanhos.items():
+        if campo in valores:
+            dados[campo] = _texto(valores, campo, tamanho)
+    for campo in ("tipo_entidade", "uf"):
+        if dados.get(campo):
+            dados[campo] = dados[campo].upper()
+    return documento, dados
+
+
+# ----------------------------------------------------------
+# GRAVAÇÃO DOS LOTES
+# ----------------------------------------------------------
+def _ids_por_documento(sessao, documentos):
+    """{documento: menor id de entidade com esse CPF/CNPJ}"""
+    if not documentos:
+        return {}
+    return dict(sessao.execute(
+        select(_DOCUMENTO, func.min(Entidade.id))
+        .where(_DOCUMENTO.in_(list(documentos)))
+        .group_by(_DOCUMENTO)
+    ).all())
+
+
+def _update_preservando(tabela, campos):
+    """UPDATE ... SET campo = coalesce(:campo, campo) WHERE id = :b_id (vazio mantém o valor atual)"""
+    valores = {
+        campo: func.coalesce(bindparam(f"b_{campo}", type_=tabela.c[campo].type), tabela.c[campo])
+        for campo in campos
+    }
+    if "versao" in tabela.c:
+        valores["versao"] = tabela.c.versao + 1
+    return update(tabela).where(tabela.c.id == bindparam("b_id")).values(**valores)
+
+
+def gravar_lote_produtos(sessao, lote):
+    """
+    Grava um lote {codigo_item: (linha, campos)} e faz o commit.
+    Devolve (inseridas, atualizadas, rejeições).
+    """
+    itens = Item.__table__
+    existentes = {
+        linha.codigo_item: linha
+        for linha in sessao.execute(
+            select(Item.id, Item.codigo_item, Item.estoque, Item.preco_venda, Item.custo_unitario)
+            .where(Item.codigo_item.in_(list(lote)))
+        )
+    }
+    fornecedores = _ids_por_documento(
+        sessao, {dados["fornecedor"] for _, dados in lote.values() if dados.get("fornecedor")}
+    )
+
+    novos, alterados, rejeicoes = [], [], []
+    for codigo, (numero, dados) in lote.items():
+        campos = {campo: valor for campo, valor in dados.items() if campo != "fornecedor"}
+        if "fornecedor" in dados:
+            campos["fornecedor_id"] = fornecedores.get(dados["fornecedor"])
+            if dados["fornecedor"] and campos["fornecedor_id"] is None:
+                rejeicoes.append((numero, f"fornecedor {dados['fornecedor']} não cadastrado"))
+                continue
+        if codigo in existentes:
+            alterados.append((existentes[codigo], campos))
+        elif not campos.get("nome"):
+            rejeicoes.append((numero, "nome obrigatório para produto novo"))
+        else:
+            novos.append(dict(campos, codigo_item=codigo))
+
+    ajustes = []
+    if alterados:
+        colunas = list(alterados[0][1])
+        sessao.connection().execute(
+            _update_preservando(itens, colunas),
+            [dict({f"b_{c}": campos[c] for c in colunas}, b_id=atual.id) for atual, campos in alterados]
+        )
+        for atual, campos in alterados:
+            if campos.get("estoque") is not None:
+                ajustes.append((
+                    atual.id, campos["estoque"] - (atual.estoque or 0),
+                    campos.get("preco_venda") or atual.preco_venda,
+                    campos.get("custo_unitario") or atual.custo_unitario,
+                ))
+
+    if novos:
+        agora = datetime.utcnow()
+        sessao.connection().execute(insert(itens), [
+            {
+                "tipo_item": "PRODUTO",
+                "data_cadastro": agora,
+                "codigo_item": campos["codigo_item"],
+                "nome": campos["nome"],
+                "descricao": campos.get("descricao"),
+                "estoque": campos.get("estoque") or 0,
+                "estoque_minimo": campos.get("estoque_minimo") or 0,
+                "custo_unitario": campos.get("custo_unitario") or 0,
+                "preco_venda": campos.get("preco_venda") or 0,
+                "fornecedor_id": campos.get("fornecedor_id"),
+            }
+            for campos in novos
+        ])
+        com_estoque = {campos["codigo_item"]: campos for campos in novos if campos.get("estoque")}
+        if com_estoque:
+            for item_id, codigo in sessao.execute(
+                select(Item.id, Item.codigo_item).where(Item.codigo_item.in_(list(com_estoque)))
+            ):
+                campos = com_estoque[codigo]
+                ajustes.append((item_id, campos["estoque"], campos.get("preco_venda"), campos.get("custo_unitario")))
+
+    registrar_ajustes(sessao, ajustes, "Importação de produtos")
+    sessao.commit()
+    return len(novos), len(alterados), rejeicoes
+
+
+def gravar_lote_pessoas(sessao, lote):
+    """
+    Grava um lote {documento: (linha, campos)} em entidade e contato (o
+    primeiro contato da pessoa) e faz o commit. Devolve (inseridas, atualizadas, rejeições).
+    """
+    entidades = Entidade.__table__
+    contatos = Contato.__table__
+    existentes = _ids_por_documento(sessao, lote)
+
+    novos, alterados, rejeicoes = [], [], []
+    for documento, (numero, dados) in lote.items():
+        if documento in existentes:
+            alterados.append((existentes[documento], dados))
+        elif not dados.get("razao_social"):
+            rejeicoes.append((numero, "razao_social obrigatória para pessoa nova"))
+        else:
+            novos.append((documento, dados))
+
+    if alterados:
+        colunas = [c for c in ("cpf_cnpj", "tipo_pessoa", *_CAMPOS_ENTIDADE) if c in alterados[0][1]]
+        sessao.connection().execute(
+            _update_preservando(entidades, colunas),
+            [dict({f"b_{c}": dados[c] for c in colunas}, b_id=entidade_id) for entidade_id, dados in alterados]
+        )
+    if novos:
+        sessao.connection().execute(insert(entidades), [
+            {
+                "cpf_cnpj": dados["cpf_cnpj"],
+                "tipo_pessoa": dados["tipo_pessoa"],
+                "razao_social": dados["razao_social"],
+                "nome_fantasia": dados.get("nome_fantasia"),
+                "inscricao_estadual": dados.get("inscricao_estadual"),
+                "tipo_entidade": dados.get("tipo_entidade") or "CLIENTE",
+                "obs": dados.get("obs"),
+                "esta_bloqueado": False,
+            }
+            for _, dados in novos
+        ])
+
+    # Contato: só se o arquivo tem colunas de contato
+    campos_contato = [c for c in _CAMPOS_CONTATO if c in next(iter(lote.values()))[1]]
+    if campos_contato:
+        ids = dict(existentes)
+        if novos:
+            ids.update(_ids_por_documento(sessao, [documento for documento, _ in novos]))
+        por_entidade = {ids[documento]: dados for documento, (_, dados) in lote.items() if documento in ids}
+        primeiro_contato = dict(sessao.execute(
+            select(Contato.entidade_id, func.min(Contato.id))
+            .where(Contato.entidade_id.in_(list(por_entidade)))
+            .group_by(Contato.entidade_id)
+        ).all())
+
+        atualizar = [
+            dict({f"b_{c}": dados[c] for c in campos_contato}, b_id=primeiro_contato[entidade_id])
+            for entidade_id, dados in por_entidade.items() if entidade_id in primeiro_contato
+        ]
+        incluir = [
+            dict({c: dados[c] for c in campos_contato}, entidade_id=entidade_id)
+            for entidade_id, dados in por_entidade.items()
+            if entidade_id not in primeiro_contato and any(dados[c] for c in campos_contato)
+        ]
+        if atualizar:
+            sessao.connection().execute(_update_preservando(contatos, campos_contato), atualizar)
+        if incluir:
+            sessao.connection().execute(insert(contatos), incluir)
+
+    sessao.commit()
+    return len(novos), len(alterados), rejeicoes
+
+
+# ----------------------------------------------------------
+# IMPORTAÇÃO
+# ----------------------------------------------------------
+def importar(sessao, linhas, preparar, gravar_lote, progresso=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Consome `linhas` ((número, {campo: texto}), ex.: ler_csv) em lotes.
+    Cada lote é gravado numa transação própria; progresso(resultado) é
+    chamado após cada lote. Devolve o ResultadoImportacao.
+    """
+    resultado = ResultadoImportacao()
+    linhas = iter(linhas)
+    while True:
+        bloco = list(islice(linhas, tamanho_lote))
+        if not bloco:
+            break
+
+        lote = {}
+        for numero, valores in bloco:
+            resultado.lidas += 1
+            try:
+                chave, dados = preparar(valores)
+            except ValueError as e:
+                resultado.rejeitar(numero, str(e))
+                continue
+            if chave in lote:
+                # Repetida no lote: valores informados na última prevalecem
+                resultado.duplicadas += 1
+                anteriores = lote[chave][1]
+                dados = dict(anteriores, **{c: v for c, v in dados.items() if v is not None})
+            lote[chave] = (numero, dados)
+
+        if lote:
+            inseridas, atualizadas, rejeicoes = com_retentativas(sessao, lambda: gravar_lote(sessao, lote))
+            resultado.inseridas += inseridas
+            resultado.atualizadas += atualizadas
+            for numero, motivo in rejeicoes:
+                resultado.rejeitar(numero, motivo)
+
+        if progresso:
+            progresso(resultado)
+    return resultado
+
+
+def importar_produtos(sessao, caminho, encoding="utf-8-sig", progresso=None, tamanho_lote=TAMANHO_LOTE):
+    linhas = ler_csv(caminho, COLUNAS_PRODUTO, "codigo_item", encoding)
+    resultado = importar(sessao, linhas, preparar_produto, gravar_lote_produtos, progresso, tamanho_lote)
+    # Linhas de preço dos produtos novos, uma vez no fim
+    com_retentativas(sessao, lambda: (sincronizar_tabela_preco(sessao.connection()), sessao.commit()))
+    return resultado
+
+
+def importar_pessoas(sessao, caminho, encoding="utf-8-sig", progresso=None, tamanho_lote=TAMANHO_LOTE):
+    linhas = ler_csv(caminho, COLUNAS_PESSOA, "cpf_cnpj", encoding)
+    return importar(sessao, linhas, preparar_pessoa, gravar_lote_pessoas, progresso, tamanho_lote)
+
+
+IMPORTADORES = {
+    "produtos": importar_produtos,
+    "pessoas": importar_pessoas,
+}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from src.Models.models import engine, SessionLocal
+    from src.Models.migracoes import executar_migracoes
+
+    parser = argparse.ArgumentParser(description="Importa produtos ou pessoas de um arquivo CSV")
+    parser.add_argument("tipo", choices=IMPORTADORES)
+    parser.add_argument("arquivo")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE)
+    args = parser.parse_args()
+
+    executar_migracoes(engine)
+    inicio = time.perf_counter()
+
+    def mostrar(resultado):
+        print(f"\r{resultado.lidas} linhas lidas, {resultado.gravadas} gravadas, "
+              f"{resultado.rejeitadas} rejeitadas", end="", flush=True)
+
+    with SessionLocal() as sessao:
+        resultado = IMPORTADORES[args.tipo](sessao, args.arquivo, args.encoding, mostrar, args.lote)
+    print(f"\n✅ {resultado.resumo()} em {time.perf_counter() - inicio:.1f}s")
+    for numero, motivo in resultado.erros:
+        print(f"   linha {numero}: {motivo}")
+    if resultado.rejeitadas > len(resultado.erros):
+        print(f"   ... e mais {resultado.rejeitadas - len(resultado.erros)} rejeição(ões)")
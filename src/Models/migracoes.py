@@ -0,0 +1,198 @@
+# src/Models/migracoes.py
+
+import logging
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, SAWarning
+from sqlalchemy.orm import Session
+
+from src.Models.models import (
+    Base, criar_admin_padrao, ResumoVendasDia, ResumoFinanceiro, ResumoMovimentosDia,
+    ReajustePreco, HistoricoPreco, FechamentoEstoque
+)
+from src.Models.resumos import reconstruir_resumos
+from src.Models.busca_textual import criar_indices_textuais
+from src.Models.tabela_preco import criar_tabela_preco
+from src.Models.razao_estoque import (
+    implantar_razao_estoque, implantar_custo_do_razao, periodo_pendente, fechar_periodos
+)
+from src.Models.importacao import criar_indice_documento
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# MIGRAÇÕES VERSIONADAS DO ESQUEMA
+# ==========================================================
+# Cada migração roda uma única vez, em transação própria, e grava sua versão
+# na tabela schema_version. Com o banco já atualizado, a inicialização custa
+# apenas a leitura da versão atual.
+#
+# Regras para novas migrações:
+#   - acrescentar sempre no fim da lista, com a próxima versão;
+#   - ser idempotente (checkfirst / verificar se a coluna já existe), pois
+#     num banco novo a migração 1 já cria as tabelas no formato atual dos models.
+
+
+def _criar_esquema_inicial(conexao):
+    Base.metadata.create_all(conexao)
+
+
+def criar_indices_faltantes(conexao):
+    """
+    create_all não cria índices novos em tabelas que já existem.
+    Cria os índices declarados nos models que ainda faltam no banco.
+    """
+    inspetor = inspect(conexao)
+    criados = []
+    for tabela in Base.metadata.sorted_tables:
+        if not inspetor.has_table(tabela.name):
+            continue
+        with warnings.catch_warnings():
+            # Índices de expressão (ex.: ix_entidade_documento) não são declarados nos models
+            warnings.filterwarnings("ignore", "Skipped unsupported reflection of expression-based index", SAWarning)
+            existentes = {ix["name"] for ix in inspetor.get_indexes(tabela.name)}
+        for indice in tabela.indexes:
+            if indice.name not in existentes:
+                indice.create(conexao)
+                criados.append(indice.name)
+    if criados:
+        # Atualiza as estatísticas usadas pelo planejador de consultas
+        conexao.exec_driver_sql("ANALYZE")
+    return criados
+
+
+def _criar_admin_padrao(conexao):
+    with Session(bind=conexao) as sessao:
+        criar_admin_padrao(sessao)
+
+
+def adicionar_coluna(conexao, tabela, coluna, ddl):
+    """ALTER TABLE ... ADD COLUMN apenas se a coluna ainda não existir"""
+    colunas = {c["name"] for c in inspect(conexao).get_columns(tabela)}
+    if coluna not in colunas:
+        conexao.exec_driver_sql(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {ddl}")
+
+
+def _criar_resumos(conexao):
+    for modelo in (ResumoVendasDia, ResumoFinanceiro, ResumoMovimentosDia):
+        modelo.__table__.create(conexao, checkfirst=True)
+    criar_indices_faltantes(conexao)
+    reconstruir_resumos(conexao)
+
+
+def _criar_historico_precos(conexao):
+    for modelo in (ReajustePreco, HistoricoPreco):
+        modelo.__table__.create(conexao, checkfirst=True)
+    criar_indices_faltantes(conexao)
+
+
+def _criar_razao_estoque(conexao):
+    adicionar_coluna(conexao, "movimento_estoque", "saldo", "NUMERIC(12, 2)")
+    # O trigger do razão também mantém o custo médio (migração 12)
+    adicionar_coluna(conexao, "movimento_estoque", "custo_medio", "NUMERIC(10, 2)")
+    FechamentoEstoque.__table__.create(conexao, checkfirst=True)
+    criar_indices_faltantes(conexao)
+    implantar_razao_estoque(conexao)
+
+
+def _criar_versoes(conexao):
+    for tabela in ("itens", "financeiro"):
+        adicionar_coluna(conexao, tabela, "versao", "INTEGER NOT NULL DEFAULT 1")
+
+
+def _criar_custo_do_razao(conexao):
+    adicionar_coluna(conexao, "movimento_estoque", "custo_medio", "NUMERIC(10, 2)")
+    implantar_custo_do_razao(conexao)
+
+
+# (versão, descrição, função)
+MIGRACOES = [
+    (1, "Esquema inicial", _criar_esquema_inicial),
+    (2, "Índices das colunas de filtro e junção", criar_indices_faltantes),
+    (3, "Perfis e usuário administrador padrão", _criar_admin_padrao),
+    (4, "Resumos diários dos dashboards", _criar_resumos),
+    (5, "Busca textual (FTS5) de pessoas e produtos", criar_indices_textuais),
+    (6, "Tabela de preços ligada ao item por id", criar_tabela_preco),
+    (7, "Histórico de reajustes de preço", _criar_historico_precos),
+    (8, "Razão de estoque com saldos e fechamentos", _criar_razao_estoque),
+    (9, "Versão de itens e lançamentos (concorrência otimista)", _criar_versoes),
+    (10, "Índice do CPF/CNPJ só com dígitos (importação)", criar_indice_documento),
+    (11, "Índice dos resumos financeiros por status", criar_indices_faltantes),
+    (12, "Custo médio após cada movimento no razão de estoque", _criar_custo_do_razao),
+]
+
+
+def _garantir_tabela_versao(conexao):
+    conexao.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        " versao INTEGER PRIMARY KEY,"
+        " descricao VARCHAR(255) NOT NULL,"
+        " aplicada_em DATETIME NOT NULL)"
+    )
+
+
+def versao_atual(conexao):
+    return conexao.execute(text("SELECT MAX(versao) FROM schema_version")).scalar() or 0
+
+
+@contextmanager
+def transacao_exclusiva(engine):
+    """
+    engine.begin() com BEGIN IMMEDIATE: o driver sqlite3 só abre transação
+    antes de DML, o que deixaria o DDL das migrações fora dela. O IMMEDIATE
+    também impede dois terminais de migrarem o mesmo banco ao mesmo tempo.
+    """
+    with engine.begin() as conexao:
+        conexao.exec_driver_sql("BEGIN IMMEDIATE")
+        yield conexao
+
+
+def executar_migracoes(engine):
+    """Aplica as migrações pendentes e devolve a lista de versões aplicadas"""
+    with engine.begin() as conexao:
+        _garantir_tabela_versao(conexao)
+        atual = versao_atual(conexao)
+
+    ultima = MIGRACOES[-1][0]
+    if atual >= ultima:
+        return []
+
+    aplicadas = []
+    for versao, descricao, migrar in MIGRACOES:
+        if versao <= atual:
+            continue
+        with transacao_exclusiva(engine) as conexao:
+            # Outro terminal pode ter aplicado esta versão enquanto esperávamos
+            if versao_atual(conexao) >= versao:
+                continue
+            migrar(conexao)
+            conexao.execute(
+                text("INSERT INTO schema_version (versao, descricao, aplicada_em) "
+                     "VALUES (:versao, :descricao, :aplicada_em)"),
+                {"versao": versao, "descricao": descricao, "aplicada_em": datetime.now()}
+            )
+        logger.info("Migração %s aplicada: %s", versao, descricao)
+        aplicadas.append(versao)
+    return aplicadas
+
+
+def fechar_periodos_pendentes(engine):
+    """
+    Fechamentos do razão de estoque que faltam, na abertura do sistema. A
+    checagem só lê, então o BEGIN IMMEDIATE fica para o dia em que há um mês
+    a fechar; com o banco ocupado por outro terminal o fechamento fica para a
+    próxima abertura, sem impedir esta. Devolve as datas geradas.
+    """
+    with engine.connect() as conexao:
+        if not periodo_pendente(conexao):
+            return []
+    try:
+        with transacao_exclusiva(engine) as conexao:
+            # Refeito dentro da transação: outro terminal pode ter fechado antes
+            return fechar_periodos(conexao)
+    except OperationalError as e:
+        logger.warning("Fechamento do estoque adiado, banco ocupado: %s", e)
+        return []
@@ -1,8 +1,13 @@
 from sqlalchemy import (create_engine, Column, Integer, String, Date, Boolean, Numeric,
-                        ForeignKey, Enum, Text, DateTime, CheckConstraint, func, DECIMAL)
+                        ForeignKey, Enum, Text, DateTime, CheckConstraint, func, DECIMAL, Index)
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 import enum
+import logging
+
+from src.Models.perfil_sqlite import carregar_perfil, aplicar_perfil
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
@@ -59,7 +64,7 @@ class Entidade(Base):
 class Contato(Base):
     __tablename__ = "contato"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    entidade_id = Column(Integer, ForeignKey("entidade.id"), nullable=False)
+    entidade_id = Column(Integer, ForeignKey("entidade.id"), nullable=False, index=True)
     telefone_primario = Column(String(20))
     telefone_secundario = Column(String(20))
     email = Column(String(100))
@@ -90,7 +95,7 @@ class Item(Base):
     codigo_item = Column(String(50), unique=True, nullable=False)
     tipo_item = Column(String(10), default="PRODUTO", nullable=False)
 
-    nome = Column(String(100), nullable=False)
+    nome = Column(String(100), nullable=False, index=True)
     descricao = Column(Text)
 
     estoque = Column(Numeric(10, 2), default=0)
@@ -99,7 +104,7 @@ class Item(Base):
     custo_unitario = Column(Numeric(10, 2), nullable=False, default=0)
     preco_venda = Column(Numeric(10, 2), nullable=False, default=0)
 
-    ativo = Column(Boolean, default=True)
+    ativo = Column(Boolean, default=True, index=True)
 
   
     data_cadastro = Column(
@@ -115,11 +120,16 @@ class Item(Base):
     )
     
     # CORREÇÃO: Aponta para Entidade agora
-    fornecedor_id = Column(Integer, ForeignKey("entidade.id")) 
+    fornecedor_id = Column(Integer, ForeignKey("entidade.id"), index=True)
     fornecedor = relationship("Entidade", back_populates="itens_fornecidos")
     
     movimentos_estoque = relationship("MovimentoEstoque", back_populates="item")
 
+    # Controle de concorrência otimista: todo UPDATE incrementa a versão
+    # (ver src/Models/concorrencia.py); o ORM confere a versão lida no flush
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": versao}
+
 class MovimentoEstoque(Base):
     __tablename__ = "movimento_estoque"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -139,23 +149,48 @@ class MovimentoEstoque(Base):
     tipo_movimento = Column(String(10), nullable=False)
     observacao = Column(Text)
 
+    # Saldo do item após este movimento, na ordem (data, id); mantido por
+    # trigger do razão de estoque (src/Models/razao_estoque.py)
+    saldo = Column(Numeric(12, 2), nullable=True)
+    # Custo médio ponderado do item após este movimento (mesma regra de
+    # Item.custo_unitario, src/Models/custo_medio.py); mantido pelo mesmo trigger
+    custo_medio = Column(Numeric(10, 2), nullable=True)
+
     item = relationship("Item", back_populates="movimentos_estoque")
     fornecedor = relationship("Entidade")
 
+    __table_args__ = (
+        # Histórico por item em ordem de data (kardex, saldo por item)
+        Index("ix_movimento_estoque_item_data", "item_id", "data_ultima_mov"),
+        # Dashboard de estoque: movimentos recentes
+        Index("ix_movimento_estoque_data", "data_ultima_mov"),
+    )
+
+class FechamentoEstoque(Base):
+    """Saldo de cada item no fim de uma data de fechamento (itens com saldo zero não têm linha)"""
+    __tablename__ = "fechamento_estoque"
+    item_id = Column(Integer, primary_key=True)
+    data = Column(Date, primary_key=True)
+    saldo = Column(Numeric(12, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_fechamento_estoque_data", "data"),
+    )
+
 class PedidoVenda(Base):
     __tablename__ = "pedido_vendas"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    cliente_id = Column(Integer, nullable=True)
+    cliente_id = Column(Integer, nullable=True, index=True)
     vendedor_id = Column(Integer, nullable=True)
     preco_total = Column(Numeric(10, 2)) # Unificado nome
-    data_emissao = Column(Date)
-    status = Column(String(20))
+    data_emissao = Column(Date, index=True)
+    status = Column(String(20), index=True)
     itens = relationship("PedidoVendaItem", back_populates="pedido")
 
 class PedidoVendaItem(Base):
     __tablename__ = "pedido_vendas_itens"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    pedido_id = Column(Integer, ForeignKey("pedido_vendas.id"))
+    pedido_id = Column(Integer, ForeignKey("pedido_vendas.id"), index=True)
     produto = Column(String(100))
     quantidade = Column(Integer)
     preco_unitario = Column(Numeric(10, 2))
@@ -173,7 +208,7 @@ class PedidoCompra(Base):
 class PedidoCompraItem(Base):
     __tablename__ = "pedido_compras_itens"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    pedido_id = Column(Integer, ForeignKey("pedido_compras.id"))
+    pedido_id = Column(Integer, ForeignKey("pedido_compras.id"), index=True)
     quantidade = Column(Integer)
     preco_unitario = Column(Numeric(10, 2))
     preco_total = Column(Numeric(10, 2))
@@ -198,6 +233,95 @@ class Financeiro(Base):
     status = Column(Enum(EnumStatus), nullable=False, default=EnumStatus.ABERTA)
     data_emissao = Column(Date, nullable=False, server_default=func.current_date())
 
+    # Controle de concorrência otimista (ver Item.versao)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": versao}
+
+    __table_args__ = (
+        # Dashboard e listagens: lançamentos abertos por vencimento
+        Index("ix_financeiro_status_vencimento", "status", "vencimento"),
+        # Limite de crédito: títulos em aberto do cliente
+        Index("ix_financeiro_cliente_status", "cliente_id", "status", "tipo_lancamento"),
+        Index("ix_financeiro_fornecedor", "fornecedor_id"),
+    )
+
+class TabelaPreco(Base):
+    """Preço de venda de tabela por produto (uma linha por item, ligada pelo id)"""
+    __tablename__ = "tabela_preco"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    item_id = Column(Integer, ForeignKey("itens.id", ondelete="CASCADE"), nullable=False, unique=True)
+    preco_unitario = Column(Numeric(10, 2), nullable=False, default=0)
+    vencimento = Column(Date, nullable=True)
+
+    item = relationship("Item")
+
+class ReajustePreco(Base):
+    """Lote de alteração de preços (reajuste em massa ou edição manual)"""
+    __tablename__ = "reajuste_preco"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    data = Column(DateTime, nullable=False, default=datetime.now)
+    descricao = Column(String(255), nullable=False)
+    quantidade_itens = Column(Integer, nullable=False, default=0)
+    desfeito_em = Column(DateTime, nullable=True)
+
+    historico = relationship("HistoricoPreco", back_populates="reajuste")
+
+class HistoricoPreco(Base):
+    """Preço antes/depois de cada item alterado num reajuste (auditoria e desfazer)"""
+    __tablename__ = "historico_preco"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    reajuste_id = Column(Integer, ForeignKey("reajuste_preco.id"), nullable=False)
+    item_id = Column(Integer, ForeignKey("itens.id"), nullable=False)
+    preco_anterior = Column(Numeric(10, 2), nullable=False)
+    preco_novo = Column(Numeric(10, 2), nullable=False)
+
+    reajuste = relationship("ReajustePreco", back_populates="historico")
+
+    __table_args__ = (
+        Index("ix_historico_preco_reajuste_item", "reajuste_id", "item_id", unique=True),
+        Index("ix_historico_preco_item", "item_id"),
+    )
+
+# ==========================================================
+# RESUMOS DIÁRIOS (INDICADORES DOS DASHBOARDS)
+# ==========================================================
+# Atualizados na mesma transação dos lançamentos e reconstruídos a partir
+# das tabelas base por src/Models/resumos.py. Chaves sem valor gravam 0
+# (e não NULL) para o UPSERT encontrar a linha existente.
+
+class ResumoVendasDia(Base):
+    __tablename__ = "resumo_vendas_dia"
+    data = Column(Date, primary_key=True)
+    cliente_id = Column(Integer, primary_key=True, default=0)
+    vendedor_id = Column(Integer, primary_key=True, default=0)
+    quantidade_pedidos = Column(Integer, nullable=False, default=0)
+    total_vendas = Column(Numeric(14, 2), nullable=False, default=0)
+
+class ResumoFinanceiro(Base):
+    __tablename__ = "resumo_financeiro"
+    tipo_lancamento = Column(String(1), primary_key=True)
+    status = Column(Enum(EnumStatus), primary_key=True)
+    vencimento = Column(Date, primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0)
+    valor_total = Column(Numeric(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        # Dashboard financeiro: totais em aberto (a chave primária começa pelo tipo)
+        Index("ix_resumo_financeiro_status_vencimento", "status", "vencimento"),
+    )
+
+class ResumoMovimentosDia(Base):
+    __tablename__ = "resumo_movimentos_dia"
+    item_id = Column(Integer, primary_key=True)
+    data = Column(Date, primary_key=True)
+    tipo_movimento = Column(String(10), primary_key=True)
+    quantidade_movimentos = Column(Integer, nullable=False, default=0)
+    quantidade_total = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_resumo_movimentos_data", "data"),
+    )
+
 
 # ==========================================================
 # CONEXÃO COM O BANCO (SQLite LOCAL)
@@ -209,14 +333,23 @@ engine = create_engine(
     future=True
 )
 
-Base.metadata.create_all(engine)
+# PRAGMAs (WAL, cache, mmap...) aplicados em cada conexão; ver perfil_sqlite.py
+PERFIL_SQLITE, PRAGMAS_SQLITE = carregar_perfil()
+aplicar_perfil(engine, PRAGMAS_SQLITE)
+
+# O esquema (tabelas, índices, dados iniciais) é criado/atualizado pelas
+# migrações em src/Models/migracoes.py, executadas pelo main.py. Importar
+# este módulo não toca no banco.
 
 from sqlalchemy.orm import sessionmaker
 
 SessionLocal = sessionmaker(bind=engine)
 
-def criar_admin_padrao():
-    session = SessionLocal()
+def criar_admin_padrao(session=None):
+    # Sem sessão informada, abre e fecha a própria
+    session_propria = session is None
+    if session_propria:
+        session = SessionLocal()
 
     # Criar TODOS os perfis, se não existirem
     perfis_existentes = {
@@ -232,7 +365,8 @@ def criar_admin_padrao():
     # Criar usuário admin se não existir
     admin_existente = session.query(Usuario).filter_by(login="ADMIN").first()
     if admin_existente:
-        session.close()
+        if session_propria:
+            session.close()
         return
 
     perfil_admin = session.query(Perfil).filter_by(
@@ -248,9 +382,7 @@ def criar_admin_padrao():
 
     session.add(usuario_admin)
     session.commit()
-    session.close()
-
-    print("✅ Perfis criados e usuário admin disponível")
-
+    if session_propria:
+        session.close()
 
-criar_admin_padrao()
+    logger.info("Perfis criados e usuário admin disponível")
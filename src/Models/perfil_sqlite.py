@@ -0,0 +1,98 @@
+# src/Models/perfil_sqlite.py
+
+import json
+import logging
+import os
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# PERFIS DE CONEXÃO DO SQLITE
+# ==========================================================
+# Cada perfil é um conjunto de PRAGMAs aplicados em toda conexão nova.
+# "desempenho" é o padrão: WAL deixa leituras e escrita rodarem juntas e
+# synchronous=NORMAL só sincroniza o disco nos checkpoints do WAL.
+PERFIS = {
+    "padrao": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+    },
+    "desempenho": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,        # ~64 MB (valor negativo = KiB)
+        "mmap_size": 268435456,      # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "foreign_keys": "ON",
+    },
+    "seguro": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+        "foreign_keys": "ON",
+    },
+}
+
+PERFIL_PADRAO = "desempenho"
+
+# journal_mode precisa vir primeiro: os demais dependem do modo do journal
+ORDEM_PRAGMAS = ["journal_mode", "synchronous", "cache_size", "mmap_size",
+                 "temp_store", "busy_timeout", "foreign_keys"]
+
+ARQUIVO_CONFIG_PADRAO = "erp_config.json"
+
+
+def carregar_perfil(caminho_config=None):
+    """
+    Resolve os PRAGMAs a aplicar. Ordem de prioridade:
+      1. variável de ambiente ERP_SQLITE_PERFIL (nome do perfil)
+      2. arquivo de configuração (ERP_CONFIG ou erp_config.json), chave "sqlite":
+         {"sqlite": {"perfil": "seguro", "pragmas": {"cache_size": -20000}}}
+      3. PERFIL_PADRAO
+    Os "pragmas" do arquivo sobrescrevem valores individuais do perfil escolhido.
+    """
+    caminho_config = caminho_config or os.environ.get("ERP_CONFIG", ARQUIVO_CONFIG_PADRAO)
+
+    config = {}
+    if os.path.exists(caminho_config):
+        try:
+            with open(caminho_config, encoding="utf-8") as arquivo:
+                config = json.load(arquivo).get("sqlite", {}) or {}
+        except (OSError, ValueError) as e:
+            logger.warning("Configuração do SQLite ignorada (%s): %s", caminho_config, e)
+
+    nome = os.environ.get("ERP_SQLITE_PERFIL") or config.get("perfil") or PERFIL_PADRAO
+    if nome not in PERFIS:
+        logger.warning("Perfil SQLite '%s' desconhecido, usando '%s'", nome, PERFIL_PADRAO)
+        nome = PERFIL_PADRAO
+
+    pragmas = dict(PERFIS[nome])
+    pragmas.update(config.get("pragmas", {}) or {})
+    return nome, pragmas
+
+
+def aplicar_perfil(engine, pragmas):
+    """Registra os PRAGMAs para rodarem em cada conexão aberta pelo engine"""
+    ordenados = sorted(
+        pragmas.items(),
+        key=lambda par: ORDEM_PRAGMAS.index(par[0]) if par[0] in ORDEM_PRAGMAS else len(ORDEM_PRAGMAS)
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configurar_conexao(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in ordenados:
+                cursor.execute(f"PRAGMA {nome}={valor}")
+        finally:
+            cursor.close()
+
+    return engine
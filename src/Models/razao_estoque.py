@@ -0,0 +1,380 @@
+# src/Models/razao_estoque.py
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import (
+    select, insert, update, delete, func, case, literal, union_all, false, tuple_, Date
+)
+
+from src.Models.models import Item, MovimentoEstoque, FechamentoEstoque
+from src.Models.resumos import somar_movimentos, reconstruir_resumos
+from src.Models.custo_medio import recalcular_custos_movimentos
+
+# ==========================================================
+# RAZÃO DE ESTOQUE
+# ==========================================================
+# O razão é a sequência de movimentos de cada item na ordem (data, id):
+#
+# - movimento_estoque.saldo guarda o saldo do item após cada movimento.
+#   Um trigger calcula o saldo da linha nova a partir do movimento anterior
+#   (uma busca no índice item_id + data) e, se o movimento for retroativo,
+#   soma a quantidade nos movimentos e fechamentos posteriores;
+# - movimento_estoque.custo_medio guarda o custo médio ponderado do item
+#   após o movimento, calculado pelo mesmo trigger a partir do saldo e do
+#   custo do movimento anterior (a regra de src/Models/custo_medio.py).
+#   Como Item.custo_unitario, é um custo perpétuo: um movimento retroativo
+#   não recalcula o custo dos posteriores (só o --reconstruir abaixo);
+# - fechamento_estoque guarda o saldo de todos os itens em datas de
+#   fechamento (fim de mês, ou dias avulsos), para consultar o catálogo
+#   inteiro numa data lendo o fechamento anterior mais os movimentos desde ele.
+#
+# Movimentos do tipo 'ajuste' têm quantidade com sinal; 'saida' subtrai e
+# os demais ('entrada') somam. O razão supõe movimentos só incluídos (nunca
+# alterados/excluídos); se for preciso, reconstruir com:
+#     python -m src.Models.razao_estoque --reconstruir
+
+TIPO_AJUSTE = "ajuste"
+
+_MOV = MovimentoEstoque.__table__
+_FECHAMENTO = FechamentoEstoque.__table__
+
+
+def _sinal_sql(r):
+    return f"CASE WHEN {r}.tipo_movimento = 'saida' THEN -{r}.quantidade ELSE {r}.quantidade END"
+
+
+# Quantidade com sinal (expressão SQLAlchemy)
+QUANTIDADE_COM_SINAL = case(
+    (MovimentoEstoque.tipo_movimento == "saida", -MovimentoEstoque.quantidade),
+    else_=MovimentoEstoque.quantidade
+)
+
+def _anterior_sql(coluna):
+    return (
+        f"coalesce((SELECT m.{coluna} FROM movimento_estoque m"
+        "   WHERE m.item_id = new.item_id AND (m.data_ultima_mov, m.id) < (new.data_ultima_mov, new.id)"
+        "   ORDER BY m.data_ultima_mov DESC, m.id DESC LIMIT 1), 0)"
+    )
+
+
+_DDL_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS movimento_estoque_razao_ai AFTER INSERT ON movimento_estoque BEGIN "
+    # Movimento retroativo: desloca o saldo dos movimentos posteriores do item
+    f"UPDATE movimento_estoque SET saldo = saldo + {_sinal_sql('new')} "
+    " WHERE item_id = new.item_id AND (data_ultima_mov, id) > (new.data_ultima_mov, new.id); "
+    # Saldo da linha nova = saldo do movimento anterior + quantidade; custo = o do anterior
+    f"UPDATE movimento_estoque SET saldo = {_sinal_sql('new')} + {_anterior_sql('saldo')},"
+    f" custo_medio = {_anterior_sql('custo_medio')}"
+    " WHERE id = new.id; "
+    # Entrada (ou ajuste positivo): custo médio ponderado com o saldo anterior (saldo - quantidade)
+    "UPDATE movimento_estoque SET custo_medio = CASE"
+    "   WHEN saldo - quantidade <= 0 THEN round(coalesce(preco_compra, custo_medio), 2)"
+    "   ELSE round(((saldo - quantidade) * custo_medio + quantidade * coalesce(preco_compra, custo_medio)) / saldo, 2)"
+    " END"
+    " WHERE id = new.id AND tipo_movimento <> 'saida' AND quantidade > 0; "
+    # Fechamentos na data do movimento ou depois também mudam
+    "INSERT INTO fechamento_estoque (item_id, data, saldo)"
+    f" SELECT new.item_id, f.data, {_sinal_sql('new')}"
+    "   FROM (SELECT DISTINCT data FROM fechamento_estoque WHERE data >= new.data_ultima_mov) f"
+    "  WHERE true"
+    " ON CONFLICT (item_id, data) DO UPDATE SET saldo = saldo + excluded.saldo; "
+    "END"
+)
+
+
+# ----------------------------------------------------------
+# LANÇAMENTOS
+# ----------------------------------------------------------
+def registrar_ajuste(sessao, item, diferenca, observacao="Ajuste de estoque", data=None):
+    """
+    Lança no razão a diferença de uma alteração direta de Item.estoque
+    (cadastro, importação). Não altera Item.estoque, que o chamador já gravou.
+    """
+    registrar_ajustes(sessao, [(item.id, diferenca, item.preco_venda, item.custo_unitario)], observacao, data)
+
+
+def registrar_ajustes(sessao, ajustes, observacao="Ajuste de estoque", data=None):
+    """
+    Mesmo que registrar_ajuste para vários itens, num único executemany.
+    ajustes: [(item_id, diferenca, preco_venda, custo_unitario)]
+    """
+    movimentos = []
+    for item_id, diferenca, preco_venda, custo_unitario in ajustes:
+        if not diferenca:
+            continue
+        diferenca = Decimal(str(diferenca))
+        movimentos.append({
+            "item_id": item_id,
+            "quantidade": int(diferenca) if diferenca == diferenca.to_integral_value() else float(diferenca),
+            "tipo_movimento": TIPO_AJUSTE,
+            "data_ultima_mov": data or date.today(),
+            "observacao": observacao,
+            "preco_venda": preco_venda or 0,
+            "preco_compra": custo_unitario or 0,
+            "estoque_minimo": 0,
+            "estoque_maximo": 0,
+        })
+    if movimentos:
+        sessao.execute(insert(MovimentoEstoque), movimentos)
+        somar_movimentos(sessao, movimentos)
+
+
+# ----------------------------------------------------------
+# CONSULTAS NUMA DATA
+# ----------------------------------------------------------
+def saldo_item_em(sessao, item_id, data):
+    """Saldo do item no fim da data: o saldo corrente do último movimento até ela"""
+    saldo = sessao.execute(
+        select(MovimentoEstoque.saldo)
+        .where(MovimentoEstoque.item_id == item_id, MovimentoEstoque.data_ultima_mov <= data)
+        .order_by(MovimentoEstoque.data_ultima_mov.desc(), MovimentoEstoque.id.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    return saldo if saldo is not None else Decimal("0.00")
+
+
+def _ultimo_fechamento(conexao, ate):
+    return conexao.execute(
+        select(func.max(FechamentoEstoque.data)).where(FechamentoEstoque.data <= ate)
+    ).scalar()
+
+
+def _consulta_saldos(data_base, data, item_ids=None):
+    """Saldo por item = fechamento em data_base + movimentos de (data_base, data]"""
+    base = select(FechamentoEstoque.item_id, FechamentoEstoque.saldo.label("quantidade"))
+    base = base.where(FechamentoEstoque.data == data_base) if data_base else base.where(false())
+
+    movimentos = (
+        select(MovimentoEstoque.item_id, func.sum(QUANTIDADE_COM_SINAL).label("quantidade"))
+        .where(MovimentoEstoque.data_ultima_mov <= data)
+        .group_by(MovimentoEstoque.item_id)
+    )
+    if data_base:
+        movimentos = movimentos.where(MovimentoEstoque.data_ultima_mov > data_base)
+
+    if item_ids is not None:
+        base = base.where(FechamentoEstoque.item_id.in_(item_ids))
+        movimentos = movimentos.where(MovimentoEstoque.item_id.in_(item_ids))
+
+    partes = union_all(base, movimentos).subquery()
+    return (
+        select(partes.c.item_id, func.sum(partes.c.quantidade).label("saldo"))
+        .group_by(partes.c.item_id)
+    )
+
+
+def saldos_em(sessao, data, item_ids=None):
+    """
+    {item_id: saldo} no fim da data para o catálogo inteiro (ou os itens
+    informados), a partir do fechamento mais próximo até a data. Itens com
+    saldo zero não aparecem.
+    """
+    conexao = sessao.connection()
+    linhas = conexao.execute(_consulta_saldos(_ultimo_fechamento(conexao, data), data, item_ids)).all()
+    return {item_id: Decimal(str(saldo)) for item_id, saldo in linhas if saldo}
+
+
+def variacao_item(sessao, item_id, inicio, fim):
+    """Variação do saldo do item entre o começo de `inicio` e o fim de `fim`"""
+    return saldo_item_em(sessao, item_id, fim) - saldo_item_em(sessao, item_id, inicio - timedelta(days=1))
+
+
+def variacoes_estoque(sessao, inicio, fim):
+    """{item_id: variação} dos itens que movimentaram entre as datas (inclusive)"""
+    linhas = sessao.execute(
+        select(MovimentoEstoque.item_id, func.sum(QUANTIDADE_COM_SINAL))
+        .where(MovimentoEstoque.data_ultima_mov.between(inicio, fim))
+        .group_by(MovimentoEstoque.item_id)
+    ).all()
+    return {item_id: Decimal(str(variacao)) for item_id, variacao in linhas}
+
+
+# ----------------------------------------------------------
+# KARDEX (HISTÓRICO DE UM ITEM)
+# ----------------------------------------------------------
+# Saldo acumulado que passa de uma página para a seguinte
+ANCORA_VAZIA = 0
+
+
+def ancora_kardex(sessao, item_id, desde):
+    """Saldo do item antes da data `desde` (para abrir o kardex a partir dela)"""
+    return float(saldo_item_em(sessao, item_id, desde - timedelta(days=1)))
+
+
+def consulta_kardex(item_id, limite, apos=None, desde=None, ancora=ANCORA_VAZIA):
+    """
+    Uma página do kardex em ordem cronológica (data, id), a partir da chave
+    `apos` (data, id) da última linha lida. O saldo é um SUM() OVER só dentro
+    da página, somado ao saldo (`ancora`) da página anterior: nenhuma página
+    relê o histórico. O custo médio é o gravado pelo trigger em cada movimento.
+    """
+    pagina = (
+        select(
+            MovimentoEstoque.id, MovimentoEstoque.data_ultima_mov, MovimentoEstoque.tipo_movimento,
+            MovimentoEstoque.quantidade, MovimentoEstoque.preco_compra, MovimentoEstoque.observacao,
+            MovimentoEstoque.custo_medio, QUANTIDADE_COM_SINAL.label("quantidade_sinal"),
+        )
+        .where(MovimentoEstoque.item_id == item_id)
+    )
+    if desde is not None:
+        pagina = pagina.where(MovimentoEstoque.data_ultima_mov >= desde)
+    if apos is not None:
+        pagina = pagina.where(
+            tuple_(MovimentoEstoque.data_ultima_mov, MovimentoEstoque.id) > tuple_(*apos)
+        )
+    pagina = pagina.order_by(MovimentoEstoque.data_ultima_mov, MovimentoEstoque.id).limit(limite).subquery()
+
+    def acumulado(coluna):
+        return func.sum(coluna).over(order_by=(pagina.c.data_ultima_mov, pagina.c.id), rows=(None, 0))
+
+    return (
+        select(
+            pagina.c.id, pagina.c.data_ultima_mov, pagina.c.tipo_movimento, pagina.c.quantidade,
+            pagina.c.preco_compra, pagina.c.observacao, pagina.c.custo_medio,
+            (literal(ancora) + acumulado(pagina.c.quantidade_sinal)).label("saldo"),
+        )
+        .order_by(pagina.c.data_ultima_mov, pagina.c.id)
+    )
+
+
+# ----------------------------------------------------------
+# FECHAMENTOS
+# ----------------------------------------------------------
+def gerar_fechamento(conexao, data):
+    """(Re)gera o fechamento da data a partir do fechamento anterior mais os movimentos desde ele"""
+    anterior = _ultimo_fechamento(conexao, data - timedelta(days=1))
+    saldos = _consulta_saldos(anterior, data).subquery()
+    conexao.execute(delete(_FECHAMENTO).where(_FECHAMENTO.c.data == data))
+    conexao.execute(insert(_FECHAMENTO).from_select(
+        ["item_id", "data", "saldo"],
+        select(saldos.c.item_id, literal(data, Date), saldos.c.saldo).where(saldos.c.saldo != 0)
+    ))
+
+
+def _fim_do_mes(dia):
+    proximo = (dia.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return proximo - timedelta(days=1)
+
+
+def _primeiro_dia_aberto(conexao):
+    """Dia seguinte ao último fechamento, ou o do primeiro movimento (None sem movimentos)"""
+    ultimo = conexao.execute(select(func.max(FechamentoEstoque.data))).scalar()
+    if ultimo is not None:
+        return ultimo + timedelta(days=1)
+    return conexao.execute(select(func.min(MovimentoEstoque.data_ultima_mov))).scalar()
+
+
+def periodo_pendente(conexao, ate=None, periodicidade="mensal"):
+    """Há fechamento a gerar até `ate` (padrão: ontem)? Só lê (MAX/MIN pelos índices)"""
+    ate = ate or date.today() - timedelta(days=1)
+    dia = _primeiro_dia_aberto(conexao)
+    if dia is None:
+        return False
+    return (_fim_do_mes(dia) if periodicidade == "mensal" else dia) <= ate
+
+
+def fechar_periodos(conexao, ate=None, periodicidade="mensal"):
+    """
+    Gera os fechamentos que faltam até `ate` (padrão: ontem), continuando do
+    último fechamento existente ou do primeiro movimento. periodicidade:
+    "mensal" (último dia de cada mês) ou "diaria". Devolve as datas geradas.
+    """
+    ate = ate or date.today() - timedelta(days=1)
+    dia = _primeiro_dia_aberto(conexao)
+    if dia is None:
+        return []
+
+    geradas = []
+    while True:
+        data = _fim_do_mes(dia) if periodicidade == "mensal" else dia
+        if data > ate:
+            break
+        gerar_fechamento(conexao, data)
+        geradas.append(data)
+        dia = data + timedelta(days=1)
+    return geradas
+
+
+# ----------------------------------------------------------
+# IMPLANTAÇÃO / RECONSTRUÇÃO
+# ----------------------------------------------------------
+def _lancar_saldos_de_abertura(conexao):
+    """
+    Estoque digitado direto no cadastro não tem movimento: lança um ajuste
+    na data de cadastro do item com a diferença entre Item.estoque e a soma
+    dos movimentos, para o razão fechar com o estoque atual.
+    """
+    movimentado = (
+        select(MovimentoEstoque.item_id, func.sum(QUANTIDADE_COM_SINAL).label("quantidade"))
+        .group_by(MovimentoEstoque.item_id)
+        .subquery()
+    )
+    diferenca = func.coalesce(Item.estoque, 0) - func.coalesce(movimentado.c.quantidade, 0)
+    conexao.execute(insert(_MOV).from_select(
+        ["item_id", "quantidade", "tipo_movimento", "data_ultima_mov", "observacao",
+         "preco_venda", "preco_compra", "estoque_minimo", "estoque_maximo"],
+        select(
+            Item.id, diferenca, literal(TIPO_AJUSTE),
+            func.coalesce(func.date(Item.data_cadastro), func.current_date()),
+            literal("Saldo de abertura do razão de estoque"),
+            func.coalesce(Item.preco_venda, 0), func.coalesce(Item.custo_unitario, 0), 0, 0
+        )
+        .outerjoin(movimentado, movimentado.c.item_id == Item.id)
+        .where(diferenca != 0)
+    ))
+
+
+def _recalcular_saldos(conexao):
+    """Saldo corrente de todos os movimentos com uma soma acumulada por item"""
+    acumulado = select(
+        MovimentoEstoque.id,
+        func.sum(QUANTIDADE_COM_SINAL).over(
+            partition_by=MovimentoEstoque.item_id,
+            order_by=(MovimentoEstoque.data_ultima_mov, MovimentoEstoque.id)
+        ).label("saldo")
+    ).subquery()
+    conexao.execute(
+        update(_MOV).values(saldo=acumulado.c.saldo).where(_MOV.c.id == acumulado.c.id)
+    )
+
+
+def reconstruir_razao(conexao):
+    """Recalcula saldos e custos médios dos movimentos e refaz os fechamentos existentes"""
+    _recalcular_saldos(conexao)
+    recalcular_custos_movimentos(conexao)
+    datas = conexao.execute(select(FechamentoEstoque.data).distinct().order_by(FechamentoEstoque.data)).scalars().all()
+    for data in datas:
+        gerar_fechamento(conexao, data)
+
+
+def implantar_razao_estoque(conexao):
+    """Com as colunas saldo/custo_medio e a tabela de fechamentos criadas: saldos de abertura, saldos, trigger e fechamentos mensais"""
+    _lancar_saldos_de_abertura(conexao)
+    reconstruir_resumos(conexao)
+    _recalcular_saldos(conexao)
+    recalcular_custos_movimentos(conexao)
+    conexao.exec_driver_sql(_DDL_TRIGGER)
+    fechar_periodos(conexao)
+
+
+def implantar_custo_do_razao(conexao):
+    """Com a coluna custo_medio criada: troca o trigger pelo que também mantém o custo e preenche a coluna"""
+    conexao.exec_driver_sql("DROP TRIGGER IF EXISTS movimento_estoque_razao_ai")
+    conexao.exec_driver_sql(_DDL_TRIGGER)
+    recalcular_custos_movimentos(conexao)
+
+
+if __name__ == "__main__":
+    import sys
+    from src.Models.models import engine
+    from src.Models.migracoes import executar_migracoes, transacao_exclusiva
+
+    executar_migracoes(engine)
+    with transacao_exclusiva(engine) as conexao:
+        if "--reconstruir" in sys.argv:
+            reconstruir_razao(conexao)
+            print("✅ Saldos e custos do razão de estoque reconstruídos")
+        periodicidade = "diaria" if "--diario" in sys.argv else "mensal"
+        geradas = fechar_periodos(conexao, periodicidade=periodicidade)
+    print(f"✅ {len(geradas)} fechamento(s) de estoque gerado(s)")
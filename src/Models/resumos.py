@@ -0,0 +1,124 @@
+# src/Models/resumos.py
+
+from sqlalchemy import select, insert, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.Models.models import (
+    PedidoVenda, Financeiro, MovimentoEstoque,
+    ResumoVendasDia, ResumoFinanceiro, ResumoMovimentosDia
+)
+
+# ==========================================================
+# RESUMOS DIÁRIOS DOS DASHBOARDS
+# ==========================================================
+# Os lançamentos (venda, compra, estoque, financeiro) somam seus valores
+# aqui na mesma transação em que gravam as tabelas base. Os dashboards leem
+# poucas linhas por dia em vez de agregar as tabelas inteiras.
+#
+# Se algum caminho gravar nas tabelas base sem passar por estas funções, os
+# resumos podem ser refeitos com:
+#     python -m src.Models.resumos
+
+_VENDAS = ResumoVendasDia.__table__
+_FINANCEIRO = ResumoFinanceiro.__table__
+_MOVIMENTOS = ResumoMovimentosDia.__table__
+
+
+def _somar(conexao, tabela, linhas):
+    """UPSERT em lote: soma os contadores de cada linha aos que já existem"""
+    if not linhas:
+        return
+    chaves = [c.name for c in tabela.primary_key.columns]
+    stmt = sqlite_insert(tabela)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=chaves,
+        set_={
+            c.name: c + stmt.excluded[c.name]
+            for c in tabela.columns if c.name not in chaves
+        }
+    )
+    conexao.execute(stmt, linhas)
+
+
+def somar_venda(sessao, data, cliente_id, vendedor_id, total, pedidos=1):
+    _somar(sessao.connection(), _VENDAS, [{
+        "data": data,
+        "cliente_id": cliente_id or 0,
+        "vendedor_id": vendedor_id or 0,
+        "quantidade_pedidos": pedidos,
+        "total_vendas": total,
+    }])
+
+
+def somar_financeiro(sessao, tipo_lancamento, status, vencimento, valor, sinal=1):
+    """sinal=-1 retira um lançamento (exclusão, ou o estado anterior numa edição)"""
+    _somar(sessao.connection(), _FINANCEIRO, [{
+        "tipo_lancamento": tipo_lancamento,
+        "status": status,
+        "vencimento": vencimento,
+        "quantidade": sinal,
+        "valor_total": valor * sinal,
+    }])
+
+
+def somar_movimentos(sessao, movimentos):
+    """movimentos: dicts com as colunas de MovimentoEstoque (item_id, data_ultima_mov, tipo_movimento, quantidade)"""
+    agrupados = {}
+    for mov in movimentos:
+        chave = (mov["item_id"], mov["data_ultima_mov"], mov["tipo_movimento"])
+        linha = agrupados.setdefault(chave, {
+            "item_id": chave[0], "data": chave[1], "tipo_movimento": chave[2],
+            "quantidade_movimentos": 0, "quantidade_total": 0,
+        })
+        linha["quantidade_movimentos"] += 1
+        linha["quantidade_total"] += mov["quantidade"]
+    _somar(sessao.connection(), _MOVIMENTOS, list(agrupados.values()))
+
+
+def reconstruir_resumos(conexao):
+    """Apaga e recalcula os três resumos a partir das tabelas base"""
+    for tabela in (_VENDAS, _FINANCEIRO, _MOVIMENTOS):
+        conexao.execute(tabela.delete())
+
+    cliente = func.coalesce(PedidoVenda.cliente_id, 0)
+    vendedor = func.coalesce(PedidoVenda.vendedor_id, 0)
+    conexao.execute(insert(_VENDAS).from_select(
+        ["data", "cliente_id", "vendedor_id", "quantidade_pedidos", "total_vendas"],
+        select(
+            PedidoVenda.data_emissao, cliente, vendedor,
+            func.count(PedidoVenda.id),
+            func.coalesce(func.sum(PedidoVenda.preco_total), 0)
+        )
+        .where(PedidoVenda.data_emissao.isnot(None))
+        .group_by(PedidoVenda.data_emissao, cliente, vendedor)
+    ))
+
+    conexao.execute(insert(_FINANCEIRO).from_select(
+        ["tipo_lancamento", "status", "vencimento", "quantidade", "valor_total"],
+        select(
+            Financeiro.tipo_lancamento, Financeiro.status, Financeiro.vencimento,
+            func.count(Financeiro.id),
+            func.coalesce(func.sum(Financeiro.valor_nota), 0)
+        )
+        .group_by(Financeiro.tipo_lancamento, Financeiro.status, Financeiro.vencimento)
+    ))
+
+    conexao.execute(insert(_MOVIMENTOS).from_select(
+        ["item_id", "data", "tipo_movimento", "quantidade_movimentos", "quantidade_total"],
+        select(
+            MovimentoEstoque.item_id, MovimentoEstoque.data_ultima_mov, MovimentoEstoque.tipo_movimento,
+            func.count(MovimentoEstoque.id),
+            func.coalesce(func.sum(MovimentoEstoque.quantidade), 0)
+        )
+        .group_by(MovimentoEstoque.item_id, MovimentoEstoque.data_ultima_mov, MovimentoEstoque.tipo_movimento)
+    ))
+
+
+if __name__ == "__main__":
+    from src.Models.models import engine
+    from src.Models.migracoes import executar_migracoes, transacao_exclusiva
+
+    executar_migracoes(engine)
+    with transacao_exclusiva(engine) as conexao:
+        reconstruir_resumos(conexao)
+    print("✅ Resumos dos dashboards reconstruídos")
@@ -0,0 +1,228 @@
+# src/Models/tabela_preco.py
+
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import select, insert, update, inspect, func, literal, type_coerce, Numeric, Integer
+
+from src.Models.models import Item, TabelaPreco, ReajustePreco, HistoricoPreco
+from src.Models.busca_textual import filtro_textual
+
+# ==========================================================
+# TABELA DE PREÇOS
+# ==========================================================
+# Cada produto (itens.tipo_item = 'PRODUTO') tem uma linha em tabela_preco,
+# ligada por item_id (único). Nome, estoque e custo são lidos do próprio
+# Item na consulta da tela, nunca copiados.
+
+
+def sincronizar_tabela_preco(conexao):
+    """
+    Cria, num único INSERT ... SELECT com anti-join, a linha de preço dos
+    produtos que ainda não têm uma (preço inicial = preço de venda do item).
+    Devolve o número de linhas criadas.
+    """
+    tem_preco = select(TabelaPreco.id).where(TabelaPreco.item_id == Item.id).exists()
+    resultado = conexao.execute(
+        insert(TabelaPreco).from_select(
+            ["item_id", "preco_unitario"],
+            select(Item.id, func.coalesce(Item.preco_venda, 0))
+            .where(Item.tipo_item == "PRODUTO", ~tem_preco)
+        )
+    )
+    return resultado.rowcount
+
+
+def criar_tabela_preco(conexao):
+    """
+    Migração: cria tabela_preco ligada por item_id. Uma tabela no formato
+    antigo (ligada pelo nome do produto) tem os preços levados para o item de
+    mesmo nome; linhas cujo nome não corresponde a nenhum item são descartadas.
+    """
+    antiga = False
+    inspetor = inspect(conexao)
+    if inspetor.has_table("tabela_preco"):
+        colunas = {c["name"] for c in inspetor.get_columns("tabela_preco")}
+        if "item_id" not in colunas:
+            conexao.exec_driver_sql("ALTER TABLE tabela_preco RENAME TO tabela_preco_antiga")
+            antiga = True
+
+    TabelaPreco.__table__.create(conexao, checkfirst=True)
+
+    if antiga:
+        conexao.exec_driver_sql(
+            "INSERT OR IGNORE INTO tabela_preco (item_id, preco_unitario, vencimento) "
+            "SELECT i.id, coalesce(a.preco_unitario, 0), a.vencimento "
+            "FROM tabela_preco_antiga a JOIN itens i ON i.nome = a.produto"
+        )
+        conexao.exec_driver_sql("DROP TABLE tabela_preco_antiga")
+
+    sincronizar_tabela_preco(conexao)
+
+
+# ==========================================================
+# REAJUSTE EM MASSA
+# ==========================================================
+# Um reajuste grava primeiro o histórico (preço anterior e novo de cada item
+# afetado, num INSERT ... SELECT) e depois aplica os preços novos com um
+# UPDATE ... FROM historico_preco em tabela_preco e em itens.preco_venda,
+# tudo na mesma transação. O histórico é a fonte do UPDATE, então o que foi
+# auditado é exatamente o que foi aplicado, e serve para desfazer o lote.
+
+REGRA_MARKUP = "markup"        # custo * (1 + valor%)
+REGRA_ACRESCIMO = "acrescimo"  # preço atual + valor (R$, pode ser negativo)
+REGRA_MARGEM = "margem"        # custo / (1 - valor%): margem alvo sobre o preço de venda
+REGRA_PRECO = "preco"          # preço fixo (edição manual de um item)
+
+# Regras oferecidas no reajuste em massa -> descrição
+REGRAS_REAJUSTE = {
+    REGRA_MARKUP: "Markup (%) sobre o custo",
+    REGRA_ACRESCIMO: "Acréscimo fixo (R$)",
+    REGRA_MARGEM: "Margem alvo (%) sobre a venda",
+}
+
+_HISTORICO = HistoricoPreco.__table__
+_TABELA = TabelaPreco.__table__
+_ITENS = Item.__table__
+
+
+def _expressao_preco_novo(regra, valor):
+    # O valor digitado (R$ ou %, duas casas) vai para o banco em centésimos
+    # inteiros: 10% é 1000, não 0.1 somado a 1 em float no Python
+    valor = Decimal(str(valor))
+    centesimos = literal(int((valor * 100).to_integral_value(ROUND_HALF_UP)), Integer)
+    if regra == REGRA_MARKUP:
+        expr = Item.custo_unitario * (10000 + centesimos) / 10000.0
+    elif regra == REGRA_ACRESCIMO:
+        expr = TabelaPreco.preco_unitario + centesimos / 100.0
+    elif regra == REGRA_MARGEM:
+        if not 0 <= valor < 100:
+            raise ValueError("A margem alvo deve ser maior ou igual a 0 e menor que 100%.")
+        expr = Item.custo_unitario * 10000.0 / (10000 - centesimos)
+    elif regra == REGRA_PRECO:
+        expr = centesimos / 100.0
+    else:
+        raise ValueError(f"Regra de reajuste desconhecida: {regra}")
+    return type_coerce(func.round(expr, 2), Numeric(10, 2))
+
+
+def consulta_reajuste(regra, valor, fornecedor_id=None, nome=None, item_ids=None):
+    """
+    SELECT dos itens que o reajuste altera: item_id, nome, custo_unitario,
+    preco_anterior, preco_novo. Itens sem custo ficam fora das regras sobre
+    o custo; preços que não mudariam ou ficariam <= 0 também.
+    """
+    preco_novo = _expressao_preco_novo(regra, valor)
+    stmt = (
+        select(
+            Item.id.label("item_id"), Item.nome, Item.custo_unitario,
+            TabelaPreco.preco_unitario.label("preco_anterior"),
+            preco_novo.label("preco_novo")
+        )
+        .join(TabelaPreco, TabelaPreco.item_id == Item.id)
+        .where(preco_novo > 0, preco_novo != TabelaPreco.preco_unitario)
+    )
+    if regra in (REGRA_MARKUP, REGRA_MARGEM):
+        stmt = stmt.where(Item.custo_unitario > 0)
+    if fornecedor_id:
+        stmt = stmt.where(Item.fornecedor_id == fornecedor_id)
+    if nome:
+        busca = filtro_textual(Item.id, "itens_fts", nome)
+        if busca is not None:
+            stmt = stmt.where(busca)
+    if item_ids is not None:
+        stmt = stmt.where(Item.id.in_(item_ids))
+    return stmt
+
+
+def previa_reajuste(sessao, regra, valor, **filtros):
+    """Linhas que aplicar_reajuste alteraria, ordenadas por nome (nada é gravado)"""
+    return sessao.execute(consulta_reajuste(regra, valor, **filtros).order_by(Item.nome)).all()
+
+
+def aplicar_reajuste(sessao, regra, valor, descricao, **filtros):
+    """
+    Aplica o reajuste numa única transação e faz o commit. Devolve o
+    ReajustePreco gravado, ou None se nenhum preço mudaria.
+    """
+    try:
+        reajuste = ReajustePreco(descricao=descricao[:255])
+        sessao.add(reajuste)
+        sessao.flush()
+
+        conexao = sessao.connection()
+        afetados = consulta_reajuste(regra, valor, **filtros).subquery()
+        quantidade = conexao.execute(
+            insert(_HISTORICO).from_select(
+                ["reajuste_id", "item_id", "preco_anterior", "preco_novo"],
+                select(literal(reajuste.id), afetados.c.item_id,
+                       afetados.c.preco_anterior, afetados.c.preco_novo)
+            )
+        ).rowcount
+
+        if quantidade == 0:
+            sessao.rollback()
+            return None
+
+        do_lote = _HISTORICO.c.reajuste_id == reajuste.id
+        conexao.execute(
+            update(_TABELA)
+            .values(preco_unitario=_HISTORICO.c.preco_novo)
+            .where(do_lote, _HISTORICO.c.item_id == _TABELA.c.item_id)
+        )
+        conexao.execute(
+            update(_ITENS)
+            .values(preco_venda=_HISTORICO.c.preco_novo, versao=_ITENS.c.versao + 1)
+            .where(do_lote, _HISTORICO.c.item_id == _ITENS.c.id)
+        )
+
+        reajuste.quantidade_itens = quantidade
+        sessao.commit()
+        return reajuste
+    except Exception:
+        sessao.rollback()
+        raise
+
+
+def ultimo_reajuste(sessao):
+    """Reajuste mais recente que ainda não foi desfeito"""
+    return sessao.execute(
+        select(ReajustePreco)
+        .where(ReajustePreco.desfeito_em.is_(None))
+        .order_by(ReajustePreco.id.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def desfazer_reajuste(sessao, reajuste_id):
+    """
+    Volta os preços do lote para os valores anteriores. Itens cujo preço foi
+    alterado de novo depois do reajuste são mantidos. Devolve quantos itens
+    foram restaurados.
+    """
+    try:
+        reajuste = sessao.get(ReajustePreco, reajuste_id)
+        if reajuste is None or reajuste.desfeito_em is not None:
+            raise ValueError("Reajuste não encontrado ou já desfeito.")
+
+        conexao = sessao.connection()
+        do_lote = _HISTORICO.c.reajuste_id == reajuste_id
+        restaurados = conexao.execute(
+            update(_TABELA)
+            .values(preco_unitario=_HISTORICO.c.preco_anterior)
+            .where(do_lote, _HISTORICO.c.item_id == _TABELA.c.item_id,
+                   _TABELA.c.preco_unitario == _HISTORICO.c.preco_novo)
+        ).rowcount
+        conexao.execute(
+            update(_ITENS)
+            .values(preco_venda=_HISTORICO.c.preco_anterior, versao=_ITENS.c.versao + 1)
+            .where(do_lote, _HISTORICO.c.item_id == _ITENS.c.id,
+                   _ITENS.c.preco_venda == _HISTORICO.c.preco_novo)
+        )
+
+        reajuste.desfeito_em = datetime.now()
+        sessao.commit()
+        return restaurados
+    except Exception:
+        sessao.rollback()
+        raise
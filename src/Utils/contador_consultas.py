@@ -0,0 +1,48 @@
+# src/Utils/contador_consultas.py
+
+from sqlalchemy import event
+
+
+class ContadorConsultas:
+    """
+    Registra os comandos SQL executados num engine enquanto o bloco roda.
+
+        with ContadorConsultas(engine, maximo=3) as contador:
+            tela.load_data()
+        contador.total  # -> 3
+
+    Com `maximo`, a saída do bloco falha (AssertionError, com os comandos
+    executados na mensagem) se o número de comandos passar do limite. Serve
+    para verificar que uma tela de listagem roda um número fixo de consultas
+    por página, sem lazy loads por linha (N+1).
+    """
+
+    def __init__(self, engine, maximo=None):
+        self.engine = engine
+        self.maximo = maximo
+        self.comandos = []
+
+    def _registrar(self, conn, cursor, statement, parameters, context, executemany):
+        self.comandos.append(statement)
+
+    @property
+    def total(self):
+        return len(self.comandos)
+
+    def __enter__(self):
+        self.comandos = []
+        event.listen(self.engine, "before_cursor_execute", self._registrar)
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        event.remove(self.engine, "before_cursor_execute", self._registrar)
+        if tipo_exc is None and self.maximo is not None:
+            self.afirmar_maximo(self.maximo)
+        return False
+
+    def afirmar_maximo(self, maximo):
+        if self.total > maximo:
+            comandos = "\n".join(f"  {i}. {c}" for i, c in enumerate(self.comandos, 1))
+            raise AssertionError(
+                f"{self.total} comandos SQL executados (máximo {maximo}):\n{comandos}"
+            )
@@ -0,0 +1,70 @@
+# src/Utils/controlador_busca.py
+
+import string
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# SQLite só ignora maiúsculas/minúsculas em ASCII no LIKE/ILIKE
+_ASCII_MINUSCULAS = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def contem_ilike(valor, termo):
+    """Equivalente em Python de 'valor ILIKE %termo%' no SQLite"""
+    return termo.translate(_ASCII_MINUSCULAS) in (valor or "").translate(_ASCII_MINUSCULAS)
+
+
+class ControladorBusca(QObject):
+    """
+    Liga o campo de busca de uma tela à sua consulta.
+
+    - debounce: só pesquisa quando o usuário para de digitar por `intervalo` ms;
+      os termos intermediários são descartados sem tocar no banco;
+    - termo repetido (ex.: espaço no fim) não gera nova consulta;
+    - refinamento: se o novo termo só acrescenta texto ao anterior e a tela
+      ainda tem o resultado completo do termo anterior (marcar_resultado),
+      emite `refinar` para a tela filtrar em memória em vez de `buscar`.
+
+    A tela chama marcar_resultado() ao fim de cada carga, inclusive as que não
+    vieram da busca (filtros, paginação, edição), para o estado não envelhecer.
+    """
+
+    buscar = pyqtSignal(str)
+    refinar = pyqtSignal(str)
+
+    INTERVALO_PADRAO = 300
+
+    def __init__(self, campo, intervalo=None, parent=None):
+        super().__init__(parent)
+        self.campo = campo
+        self.termo_atual = None
+        self.resultado_completo = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(intervalo or self.INTERVALO_PADRAO)
+        self._timer.timeout.connect(self._disparar)
+
+        campo.textChanged.connect(self._timer.start)
+
+    def marcar_resultado(self, termo, completo):
+        """Informa o termo exibido e se a tela tem todas as linhas que ele encontra"""
+        self.termo_atual = termo
+        self.resultado_completo = completo
+
+    def cancelar(self):
+        """Descarta a busca pendente (ex.: ao limpar o campo por código)"""
+        self._timer.stop()
+
+    def _disparar(self):
+        termo = self.campo.text().strip()
+        if termo == self.termo_atual:
+            return
+
+        anterior = self.termo_atual
+        if (self.resultado_completo and anterior is not None
+                and termo.lower().startswith(anterior.lower())):
+            self.termo_atual = termo
+            self.refinar.emit(termo)
+        else:
+            self.resultado_completo = False
+            self.buscar.emit(termo)
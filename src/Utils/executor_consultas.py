@@ -0,0 +1,134 @@
+# src/Utils/executor_consultas.py
+
+import logging
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from src.Models.models import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Uma sessão por thread do pool e por banco (a sessão da janela principal
+# nunca sai da thread da GUI)
+_sessoes = threading.local()
+
+
+def sessao_da_thread(bind=None):
+    """Sessão desta thread para o engine `bind` (padrão: o erp.db do SessionLocal)"""
+    por_engine = getattr(_sessoes, "por_engine", None)
+    if por_engine is None:
+        por_engine = _sessoes.por_engine = {}
+    sessao = por_engine.get(bind)
+    if sessao is None:
+        sessao = SessionLocal(bind=bind) if bind is not None else SessionLocal()
+        por_engine[bind] = sessao
+    return sessao
+
+
+class _SinaisTarefa(QObject):
+    concluida = pyqtSignal(int, object)
+    falhou = pyqtSignal(int, str)
+
+
+class _TarefaConsulta(QRunnable):
+    def __init__(self, id_tarefa, funcao, executor):
+        super().__init__()
+        self.id_tarefa = id_tarefa
+        self.funcao = funcao
+        self.executor = executor
+        self.sinais = _SinaisTarefa()
+
+    def run(self):
+        # Pedido já superado por outro mais recente: nem chega a consultar o banco
+        if self.executor.esta_obsoleta(self.id_tarefa):
+            return
+
+        sessao = sessao_da_thread(self.executor.bind)
+        try:
+            resultado = self.funcao(sessao)
+            sessao.commit()
+        except Exception as e:
+            sessao.rollback()
+            logger.exception("Falha na consulta em segundo plano")
+            self.sinais.falhou.emit(self.id_tarefa, str(e))
+            return
+        finally:
+            # Libera a conexão; objetos devolvidos ficam desanexados (sem lazy load)
+            sessao.close()
+
+        self.sinais.concluida.emit(self.id_tarefa, resultado)
+
+
+class ExecutorConsultas(QObject):
+    """
+    Executa consultas fora da thread da GUI e entrega o resultado por sinal.
+
+    A função recebe uma sessão própria da thread e deve devolver dados prontos
+    (tuplas/Row, dicts, Decimal...): a sessão faz commit e é fechada ao final,
+    o que expira objetos do ORM. `bind` escolhe o banco dessa sessão; as telas
+    passam o engine da própria sessão (session.get_bind()). Só o resultado do
+    pedido mais recente é entregue: os anteriores são descartados (cancelados
+    se ainda não começaram).
+    """
+
+    resultado_pronto = pyqtSignal(object)
+    erro = pyqtSignal(str)
+    carregando = pyqtSignal(bool)
+
+    def __init__(self, parent=None, pool=None, bind=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.bind = bind
+        self._ultimo_id = 0
+        self._lock = threading.Lock()
+        self._pendentes = {}
+
+    def executar(self, funcao, ao_concluir=None):
+        with self._lock:
+            self._ultimo_id += 1
+            id_tarefa = self._ultimo_id
+
+        tarefa = _TarefaConsulta(id_tarefa, funcao, self)
+        tarefa.sinais.concluida.connect(self._ao_concluir)
+        tarefa.sinais.falhou.connect(self._ao_falhar)
+        # Pedidos anteriores já não serão entregues; mantém só o atual
+        self._pendentes.clear()
+        self._pendentes[id_tarefa] = (tarefa.sinais, ao_concluir)
+
+        self.carregando.emit(True)
+        self.pool.start(tarefa)
+        return id_tarefa
+
+    def cancelar(self):
+        """Descarta qualquer resultado ainda não entregue"""
+        with self._lock:
+            self._ultimo_id += 1
+        self._pendentes.clear()
+        self.carregando.emit(False)
+
+    def esta_obsoleta(self, id_tarefa):
+        with self._lock:
+            return id_tarefa != self._ultimo_id
+
+    def ocupado(self):
+        return bool(self._pendentes)
+
+    # ------------------------------------------------------------------ #
+    #   ENTREGA (executado na thread da GUI)
+    # ------------------------------------------------------------------ #
+    def _ao_concluir(self, id_tarefa, resultado):
+        _, ao_concluir = self._pendentes.pop(id_tarefa, (None, None))
+        if self.esta_obsoleta(id_tarefa):
+            return
+        self.carregando.emit(False)
+        if ao_concluir:
+            ao_concluir(resultado)
+        self.resultado_pronto.emit(resultado)
+
+    def _ao_falhar(self, id_tarefa, mensagem):
+        self._pendentes.pop(id_tarefa, None)
+        if self.esta_obsoleta(id_tarefa):
+            return
+        self.carregando.emit(False)
+        self.erro.emit(mensagem)
@@ -0,0 +1,89 @@
+# src/Utils/importador_csv.py
+
+import logging
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from src.Utils.executor_consultas import sessao_da_thread
+
+logger = logging.getLogger(__name__)
+
+
+class _SinaisImportacao(QObject):
+    progresso = pyqtSignal(int, int, int)
+    concluida = pyqtSignal(object)
+    falhou = pyqtSignal(str)
+
+
+class _TarefaImportacao(QRunnable):
+    def __init__(self, importar, caminho):
+        super().__init__()
+        self.importar = importar
+        self.caminho = caminho
+        self.sinais = _SinaisImportacao()
+
+    def run(self):
+        sessao = sessao_da_thread()
+        try:
+            resultado = self.importar(sessao, self.caminho, progresso=self._progresso)
+        except Exception as e:
+            # Arquivo ilegível, sem a coluna obrigatória ou erro do banco
+            sessao.rollback()
+            logger.exception("Falha ao importar %s", self.caminho)
+            self.sinais.falhou.emit(str(e))
+            return
+        finally:
+            sessao.close()
+        self.sinais.concluida.emit(resultado)
+
+    def _progresso(self, resultado):
+        # Cópia dos contadores: o ResultadoImportacao continua mudando nesta thread
+        self.sinais.progresso.emit(resultado.lidas, resultado.gravadas, resultado.rejeitadas)
+
+
+class ImportadorCSV(QObject):
+    """
+    Roda importar_produtos / importar_pessoas (src.Models.importacao) fora da
+    thread da GUI. `progresso` é emitido a cada lote gravado com os contadores
+    (lidas, gravadas, rejeitadas) até ali; `concluida` traz o
+    ResultadoImportacao final. Os lotes já gravados permanecem mesmo se a
+    importação falhar no meio.
+    """
+
+    progresso = pyqtSignal(int, int, int)
+    concluida = pyqtSignal(object)
+    falhou = pyqtSignal(str)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._tarefa = None
+
+    def importar(self, importar, caminho):
+        tarefa = _TarefaImportacao(importar, caminho)
+        tarefa.sinais.progresso.connect(self.progresso)
+        tarefa.sinais.concluida.connect(self._ao_terminar)
+        tarefa.sinais.falhou.connect(self._ao_falhar)
+        self._tarefa = tarefa
+        self.pool.start(tarefa)
+
+    def ocupado(self):
+        return self._tarefa is not None
+
+    def _ao_terminar(self, resultado):
+        self._tarefa = None
+        self.concluida.emit(resultado)
+
+    def _ao_falhar(self, mensagem):
+        self._tarefa = None
+        self.falhou.emit(mensagem)
+
+
+def texto_resultado(resultado, maximo_erros=10):
+    """Resumo da importação com as primeiras rejeições, para exibir ao usuário"""
+    linhas = [resultado.resumo()]
+    for numero, motivo in resultado.erros[:maximo_erros]:
+        linhas.append(f"Linha {numero}: {motivo}")
+    if resultado.rejeitadas > maximo_erros:
+        linhas.append(f"... e mais {resultado.rejeitadas - maximo_erros} rejeição(ões)")
+    return "\n".join(linhas)
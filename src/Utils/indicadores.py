@@ -0,0 +1,123 @@
+# src/Utils/indicadores.py
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import select, func, or_, cast, case, distinct, Integer
+
+from src.Models.models import (
+    Item, Entidade, EnumStatus, ResumoVendasDia, ResumoFinanceiro, ResumoMovimentosDia
+)
+
+CENTAVO = Decimal("0.01")
+
+
+def _centavos(coluna):
+    """Valor Numeric(10, 2) convertido para centavos inteiros (aritmética exata no SQLite)"""
+    return cast(func.round(func.coalesce(coluna, 0) * 100), Integer)
+
+
+# ==========================================================
+# INDICADORES DE PRODUTOS
+# ==========================================================
+class IndicadoresProdutos:
+    """Números do dashboard de produtos, prontos para exibir"""
+    __slots__ = ("total_produtos", "valor_estoque", "total_fornecedores")
+
+    def __init__(self, total_produtos=0, valor_estoque=Decimal("0.00"), total_fornecedores=0):
+        self.total_produtos = total_produtos
+        self.valor_estoque = valor_estoque
+        self.total_fornecedores = total_fornecedores
+
+
+def consulta_indicadores_produtos():
+    """
+    Um único SELECT agregado. O valor do estoque é somado em centavos² como
+    inteiro (estoque e custo têm 2 casas), evitando a soma em ponto flutuante
+    que o SQLite faria com as colunas Numeric.
+    """
+    total_fornecedores = (
+        select(func.count(Entidade.id))
+        .where(or_(
+            Entidade.tipo_entidade.ilike('%FORNECEDOR%'),
+            Entidade.tipo_entidade.ilike('%AMBOS%')
+        ))
+        .scalar_subquery()
+    )
+    return (
+        select(
+            func.count(Item.id),
+            func.coalesce(func.sum(_centavos(Item.estoque) * _centavos(Item.custo_unitario)), 0),
+            total_fornecedores
+        )
+        .where(Item.ativo == True)
+    )
+
+
+def indicadores_produtos(sessao):
+    total_produtos, valor_centavos2, total_fornecedores = sessao.execute(
+        consulta_indicadores_produtos()
+    ).one()
+    valor_estoque = (Decimal(int(valor_centavos2)) / 10000).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+    return IndicadoresProdutos(total_produtos, valor_estoque, total_fornecedores)
+
+
+# ==========================================================
+# INDICADORES LIDOS DOS RESUMOS DIÁRIOS (src/Models/resumos.py)
+# ==========================================================
+class IndicadoresVendas:
+    __slots__ = ("total_vendas", "total_pedidos", "ticket_medio", "clientes_ativos")
+
+    def __init__(self, total_vendas, total_pedidos, clientes_ativos):
+        self.total_vendas = total_vendas
+        self.total_pedidos = total_pedidos
+        self.ticket_medio = (total_vendas / total_pedidos).quantize(CENTAVO) if total_pedidos else Decimal("0.00")
+        self.clientes_ativos = clientes_ativos
+
+
+def indicadores_vendas(sessao, data_inicio, data_fim, vendedor_id=None, cliente_id=None):
+    stmt = select(
+        func.coalesce(func.sum(ResumoVendasDia.total_vendas), 0),
+        func.coalesce(func.sum(ResumoVendasDia.quantidade_pedidos), 0),
+        # cliente_id = 0 agrupa as vendas sem cliente: não é um cliente ativo
+        func.count(distinct(case((ResumoVendasDia.cliente_id != 0, ResumoVendasDia.cliente_id))))
+    ).where(ResumoVendasDia.data.between(data_inicio, data_fim))
+    if vendedor_id:
+        stmt = stmt.where(ResumoVendasDia.vendedor_id == vendedor_id)
+    if cliente_id:
+        stmt = stmt.where(ResumoVendasDia.cliente_id == cliente_id)
+
+    total, pedidos, clientes = sessao.execute(stmt).one()
+    return IndicadoresVendas(Decimal(str(total)).quantize(CENTAVO), int(pedidos), clientes)
+
+
+class IndicadoresFinanceiro:
+    __slots__ = ("total_receber", "total_pagar", "atrasados")
+
+    def __init__(self, total_receber, total_pagar, atrasados):
+        self.total_receber = total_receber
+        self.total_pagar = total_pagar
+        self.atrasados = atrasados
+
+    @property
+    def saldo(self):
+        return self.total_receber - self.total_pagar
+
+
+def indicadores_financeiro(sessao, hoje):
+    aberta = ResumoFinanceiro.status == EnumStatus.ABERTA
+    receber, pagar, atrasados = sessao.execute(
+        select(
+            func.coalesce(func.sum(ResumoFinanceiro.valor_total).filter(ResumoFinanceiro.tipo_lancamento == "R"), 0),
+            func.coalesce(func.sum(ResumoFinanceiro.valor_total).filter(ResumoFinanceiro.tipo_lancamento == "P"), 0),
+            func.coalesce(func.sum(ResumoFinanceiro.quantidade).filter(ResumoFinanceiro.vencimento < hoje), 0)
+        ).where(aberta)
+    ).one()
+    return IndicadoresFinanceiro(Decimal(str(receber)).quantize(CENTAVO), Decimal(str(pagar)).quantize(CENTAVO), int(atrasados))
+
+
+def movimentos_desde(sessao, data_inicio):
+    """Quantidade de movimentações de estoque a partir da data"""
+    return sessao.execute(
+        select(func.coalesce(func.sum(ResumoMovimentosDia.quantidade_movimentos), 0))
+        .where(ResumoMovimentosDia.data >= data_inicio)
+    ).scalar_one()
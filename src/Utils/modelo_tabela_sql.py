@@ -0,0 +1,212 @@
+# src/Utils/modelo_tabela_sql.py
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.Utils.executor_consultas import ExecutorConsultas
+from src.Utils.paginador import predicado_keyset
+
+# Papel usado para devolver a linha original do banco (sem formatação)
+LINHA_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class ColunaTabela:
+    """Descreve uma coluna: título e como formatar o valor a partir da linha do banco"""
+
+    def __init__(self, titulo, formatar, cor_texto=None, cor_fundo=None):
+        self.titulo = titulo
+        self.formatar = formatar
+        self.cor_texto = cor_texto
+        self.cor_fundo = cor_fundo
+
+
+class ModeloTabelaSQL(QAbstractTableModel):
+    """
+    Modelo de tabela lido em lotes conforme a view rola (canFetchMore/fetchMore).
+    Cada lote é um SELECT curto com LIMIT, continuando da chave (keyset) da
+    última linha lida
+
+        WHERE (data, id) < (:ultima_data, :ultimo_id) ORDER BY data DESC, id DESC LIMIT :lote
+
+    e lido inteiro antes de voltar à GUI: nenhum cursor fica aberto entre os
+    lotes (um cursor aberto prende o snapshot do WAL e o arquivo -wal cresce),
+    e commits na sessão não interrompem a rolagem.
+
+    A consulta deve selecionar colunas, não entidades: as linhas são tuplas
+    (Row), que um commit na sessão não expira nem recarrega uma a uma. A chave
+    deve ser única (termine com a PK), ter uma só direção e estar entre as
+    colunas selecionadas. As células só são formatadas quando a view pede, em data().
+
+    Com assincrono=True os lotes são lidos por um ExecutorConsultas próprio
+    (sessão da thread do pool, no banco da `session`): o modelo nasce vazio e
+    as linhas entram quando cada lote chega, sinalizado por `carregado`.
+    """
+
+    TAMANHO_LOTE = 200
+
+    # Falha ao ler um lote (a tela decide como avisar)
+    erro = pyqtSignal(str)
+    # Lote lido em segundo plano já inserido no modelo
+    carregado = pyqtSignal()
+
+    def __init__(self, session, stmt, colunas, chave=(), descendente=True, tamanho_lote=None,
+                 assincrono=False, parent=None):
+        super().__init__(parent)
+        self.session = session
+        self.colunas = colunas
+        self.chave = list(chave)
+        self.descendente = descendente
+        self.tamanho_lote = tamanho_lote or self.TAMANHO_LOTE
+        self.linhas = []
+        self.esgotado = False
+
+        if stmt is not None:
+            stmt = stmt.order_by(*[c.desc() if descendente else c.asc() for c in self.chave])
+        self.stmt = stmt
+
+        self.executor = None
+        if assincrono:
+            self.executor = ExecutorConsultas(self, bind=session.get_bind())
+            self.executor.erro.connect(self._falhou)
+            self._pedir_lote()
+        else:
+            # Primeiro lote já disponível para a primeira pintura (erros sobem para a tela)
+            self.linhas.extend(self._ler_lote())
+
+    # ------------------------------------------------------------------ #
+    #   LEITURA SOB DEMANDA
+    # ------------------------------------------------------------------ #
+    def valores_chave(self, linha):
+        return tuple(getattr(linha, coluna.key) for coluna in self.chave)
+
+    def consulta_lote(self):
+        """SELECT do próximo lote, a partir da chave da última linha lida"""
+        stmt = self.stmt
+        if self.linhas:
+            ultima = self.valores_chave(self.linhas[-1])
+            stmt = stmt.where(predicado_keyset(self.chave, ultima, self.descendente))
+        return stmt.limit(self.tamanho_lote)
+
+    def _ler_lote(self):
+        if self.esgotado:
+            return []
+        # .all() consome e fecha o cursor antes de devolver o lote
+        lote = self.session.execute(self.consulta_lote()).all()
+        if len(lote) < self.tamanho_lote:
+            self.esgotado = True
+        return lote
+
+    def _pedir_lote(self):
+        # A consulta é montada aqui (lê self.linhas); só a execução vai para o pool
+        consulta = self.consulta_lote()
+        self.executor.executar(lambda sessao: sessao.execute(consulta).all(), self._receber_lote)
+
+    def _receber_lote(self, lote):
+        if len(lote) < self.tamanho_lote:
+            self.esgotado = True
+        self._inserir(lote)
+        self.carregado.emit()
+
+    def _falhou(self, mensagem):
+        # Mantém o que já foi lido e para de buscar
+        self.esgotado = True
+        self.erro.emit(mensagem)
+
+    def _inserir(self, lote):
+        if not lote:
+            return
+        inicio = len(self.linhas)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(lote) - 1)
+        self.linhas.extend(lote)
+        self.endInsertRows()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        # Um lote por vez: o próximo só é pedido depois que o atual chegar
+        return not self.esgotado and not (self.executor and self.executor.ocupado())
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        if self.executor is not None:
+            self._pedir_lote()
+            return
+        try:
+            lote = self._ler_lote()
+        except SQLAlchemyError as e:
+            self._falhou(str(e))
+            return
+        self._inserir(lote)
+
+    def completo(self):
+        """True quando todas as linhas do resultado já estão em memória"""
+        return self.esgotado and not (self.executor and self.executor.ocupado())
+
+    def buscar_tudo(self):
+        """Lê o restante do resultado (usar apenas quando realmente necessário; só no modo síncrono)"""
+        while self.canFetchMore():
+            self.fetchMore()
+
+    def fechar(self):
+        self.esgotado = True
+        if self.executor is not None:
+            # Lote ainda em leitura não é mais entregue
+            self.executor.cancelar()
+
+    # ------------------------------------------------------------------ #
+    #   INTERFACE QAbstractTableModel
+    # ------------------------------------------------------------------ #
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.linhas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.colunas)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.colunas[section].titulo
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        linha = self.linhas[index.row()]
+        coluna = self.colunas[index.column()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            valor = coluna.formatar(linha)
+            return "" if valor is None else str(valor)
+        if role == LINHA_ROLE:
+            return linha
+        if role == Qt.ItemDataRole.ForegroundRole and coluna.cor_texto:
+            return coluna.cor_texto(linha)
+        if role == Qt.ItemDataRole.BackgroundRole and coluna.cor_fundo:
+            return coluna.cor_fundo(linha)
+        return None
+
+    def linha(self, row):
+        """Devolve a linha original do banco na posição informada"""
+        if 0 <= row < len(self.linhas):
+            return self.linhas[row]
+        return None
+
+
+class ModeloTabelaLista(ModeloTabelaSQL):
+    """Mesmas colunas/papéis, mas com linhas já em memória (ex.: busca refinada localmente)"""
+
+    def __init__(self, linhas, colunas, parent=None):
+        self._linhas_iniciais = list(linhas)
+        super().__init__(None, None, colunas, parent=parent)
+
+    def _ler_lote(self):
+        linhas, self._linhas_iniciais = self._linhas_iniciais, []
+        self.esgotado = True
+        return linhas
+
+    def substituir(self, linhas):
+        """Troca todas as linhas de uma vez (um único reset, sem inserções linha a linha)"""
+        self.beginResetModel()
+        self.linhas = list(linhas)
+        self.endResetModel()
@@ -0,0 +1,174 @@
+# src/Utils/paginador.py
+
+from sqlalchemy import select, func, tuple_
+
+
+def predicado_keyset(colunas, valores, descendente=True):
+    """(c1, c2) < (v1, v2) na ordem decrescente, > na crescente (row values do SQLite)"""
+    if descendente:
+        return tuple_(*colunas) < tuple_(*valores)
+    return tuple_(*colunas) > tuple_(*valores)
+
+
+class PaginadorKeyset:
+    """
+    Paginação por chave (seek) para telas com botões Anterior/Próxima.
+
+    Cada página é "WHERE (ordem, id) < (:ultima_ordem, :ultimo_id) LIMIT n+1":
+    o custo não cresce com o número da página, como acontecia com OFFSET, e a
+    linha extra diz se existe próxima página sem precisar contar.
+
+    O total de registros só é contado quando a assinatura da consulta (filtros
+    e ordenação) muda, e fica em cache até invalidar_contagem(). No modo de
+    contagem aproximada, a contagem para em `limite_contagem` linhas e o total
+    é exibido como "N+" para tabelas muito grandes.
+
+    A coluna de ordenação não pode ter NULL (a comparação por tupla os perderia).
+    A consulta deve selecionar colunas: as páginas são tuplas (Row).
+
+    Para ler fora da thread da GUI: preparar() devolve a leitura da página (e
+    da contagem, se não estiver em cache) como função de uma sessão, para o
+    ExecutorConsultas; o resultado volta para receber(), já na thread da GUI,
+    que atualiza o paginador e devolve as linhas. carregar() faz as duas
+    coisas na sessão do próprio paginador.
+    """
+
+    TAMANHO_PAGINA = 20
+    LIMITE_CONTAGEM = 10000
+
+    def __init__(self, sessao, tamanho_pagina=None, contagem_aproximada=False, limite_contagem=None):
+        self.sessao = sessao
+        self.tamanho_pagina = tamanho_pagina or self.TAMANHO_PAGINA
+        self.contagem_aproximada = contagem_aproximada
+        self.limite_contagem = limite_contagem or self.LIMITE_CONTAGEM
+
+        self.stmt = None
+        self.chave = []
+        self.descendente = True
+        self.assinatura = None
+
+        self.pagina = 1
+        self.tem_proxima = False
+        # _limites[p - 1] = chave da última linha da página p - 1 (None para a página 1)
+        self._limites = [None]
+        self._contagens = {}
+
+    # ------------------------------------------------------------------ #
+    #   CONSULTA
+    # ------------------------------------------------------------------ #
+    def definir_consulta(self, stmt, coluna_ordem, coluna_id, descendente=True, assinatura=None):
+        """
+        stmt: SELECT sem ORDER BY/LIMIT. Se a assinatura mudou (outros filtros
+        ou outra ordenação), volta para a página 1.
+        """
+        self.stmt = stmt
+        self.chave = [coluna_id] if coluna_ordem is coluna_id else [coluna_ordem, coluna_id]
+        self.descendente = descendente
+
+        if assinatura is None:
+            compilado = stmt.compile()
+            assinatura = (str(compilado), repr(sorted(compilado.params.items())))
+        assinatura = (assinatura, tuple(str(c) for c in self.chave), descendente)
+
+        if assinatura != self.assinatura:
+            self.assinatura = assinatura
+            self.primeira()
+
+    def primeira(self):
+        self.pagina = 1
+        self._limites = [None]
+
+    def _valores_chave(self, linha):
+        return tuple(getattr(linha, coluna.key) for coluna in self.chave)
+
+    def carregar(self):
+        """Linhas da página atual"""
+        return self.receber(self.preparar()(self.sessao))
+
+    def preparar(self):
+        """
+        Função consultar(sessao) que lê a página atual, e o total se ainda não
+        está em cache, sem tocar no paginador (pode rodar em outra thread).
+        """
+        ordem = [c.desc() if self.descendente else c.asc() for c in self.chave]
+        stmt = self.stmt.order_by(*ordem).limit(self.tamanho_pagina + 1)
+        chave, descendente = self.chave, self.descendente
+        limites = self._limites[:self.pagina]
+        assinatura = self.assinatura
+        contagem = None if assinatura in self._contagens else self._consulta_contagem()
+
+        def consultar(sessao):
+            pagina = len(limites)
+            while True:
+                limite = limites[pagina - 1]
+                pagina_stmt = stmt if limite is None else stmt.where(predicado_keyset(chave, limite, descendente))
+                linhas = sessao.execute(pagina_stmt).all()
+                # Página esvaziada (ex.: exclusões): volta para a anterior
+                if linhas or pagina == 1:
+                    break
+                pagina -= 1
+            total = sessao.execute(contagem).scalar_one() if contagem is not None else None
+            return pagina, linhas, assinatura, total
+
+        return consultar
+
+    def receber(self, resultado):
+        """Aplica o resultado de preparar() ao paginador e devolve as linhas da página"""
+        pagina, linhas, assinatura, total = resultado
+        if total is not None:
+            aproximado = self.contagem_aproximada and total >= self.limite_contagem
+            self._contagens[assinatura] = (total, aproximado)
+
+        self.pagina = pagina
+        self.tem_proxima = len(linhas) > self.tamanho_pagina
+        linhas = linhas[:self.tamanho_pagina]
+
+        del self._limites[self.pagina:]
+        if self.tem_proxima:
+            self._limites.append(self._valores_chave(linhas[-1]))
+        return linhas
+
+    def proxima(self):
+        """Avança o cursor; a tela então chama carregar(). False se já está na última"""
+        if not self.tem_proxima:
+            return False
+        self.pagina += 1
+        return True
+
+    def anterior(self):
+        if self.pagina <= 1:
+            return False
+        self.pagina -= 1
+        return True
+
+    # ------------------------------------------------------------------ #
+    #   CONTAGEM
+    # ------------------------------------------------------------------ #
+    def total(self):
+        """(total de registros, aproximado?) da consulta atual, com cache por assinatura"""
+        if self.assinatura not in self._contagens:
+            total = self.sessao.execute(self._consulta_contagem()).scalar_one()
+            aproximado = self.contagem_aproximada and total >= self.limite_contagem
+            self._contagens[self.assinatura] = (total, aproximado)
+        return self._contagens[self.assinatura]
+
+    def _consulta_contagem(self):
+        if self.contagem_aproximada:
+            subconsulta = self.stmt.limit(self.limite_contagem).subquery()
+        else:
+            subconsulta = self.stmt.subquery()
+        return select(func.count()).select_from(subconsulta)
+
+    def total_paginas(self):
+        total, aproximado = self.total()
+        paginas = max(1, (total + self.tamanho_pagina - 1) // self.tamanho_pagina)
+        # A página atual pode passar da estimativa quando a contagem foi limitada
+        return max(paginas, self.pagina), aproximado
+
+    def descricao_paginas(self):
+        paginas, aproximado = self.total_paginas()
+        return f"Página {self.pagina} de {paginas}{'+' if aproximado else ''}"
+
+    def invalidar_contagem(self):
+        """Chamar após incluir/excluir registros"""
+        self._contagens.clear()
@@ -5,6 +5,25 @@ from decimal import Decimal
 from sqlalchemy import select
 from PyQt6.QtWidgets import QMessageBox
 
+LIMITE_CREDITO_PADRAO = Decimal('5000.00')
+
+# Quantidade máxima de ids por cláusula IN (limite de parâmetros do SQLite)
+TAMANHO_LOTE_IN = 500
+
+PALAVRAS_PERECIVEIS = ['leite', 'iogurte', 'queijo', 'carne', 'frango', 'peixe',
+                       'presunto', 'salame', 'manteiga', 'ovo', 'fruta', 'verdura',
+                       'legume', 'pão', 'bolo', 'torta']
+
+
+class ContextoValidacao:
+    """Dados do banco usados pelas regras de uma venda, carregados em lote"""
+    def __init__(self):
+        self.produtos = {}          # produto_id -> Item
+        self.cliente = None         # Entidade
+        self.vendedor = None        # Usuario (com perfil carregado)
+        self.total_em_aberto = Decimal('0')
+
+
 class ValidadorComercial:
     def __init__(self, sessao):
         self.sessao = sessao
@@ -48,8 +67,61 @@ class ValidadorComercial:
                 print(f"❌ Erro na consulta: {e}")
                 raise e
 
+    # 0. Carga em lote dos dados usados pelas regras
+    def carregar_contexto(self, dados_venda):
+        """
+        Lê de uma vez tudo o que as validações precisam: os produtos do
+        carrinho (um único IN), o cliente junto com o total em aberto e o
+        vendedor com o perfil. As regras depois rodam só em memória.
+        """
+        from src.Models.models import Item, Entidade, Usuario, Financeiro
+        from sqlalchemy import func
+        from sqlalchemy.orm import joinedload
+
+        contexto = ContextoValidacao()
+
+        produto_ids = {
+            item.get('produto_id') for item in dados_venda.get('itens', [])
+            if item.get('produto_id')
+        }
+        ids = list(produto_ids)
+        for inicio in range(0, len(ids), TAMANHO_LOTE_IN):
+            lote = ids[inicio:inicio + TAMANHO_LOTE_IN]
+            produtos = self._executar_consulta_segura(
+                select(Item).where(Item.id.in_(lote))
+            ).scalars().all()
+            contexto.produtos.update({produto.id: produto for produto in produtos})
+
+        cliente_id = dados_venda.get('cliente_id')
+        if cliente_id:
+            total_em_aberto = (
+                select(func.coalesce(func.sum(Financeiro.valor_nota), 0))
+                .where(
+                    Financeiro.cliente_id == Entidade.id,
+                    Financeiro.status == 'ABERTA',
+                    Financeiro.tipo_lancamento == 'R'  # Receber
+                )
+                .correlate(Entidade)
+                .scalar_subquery()
+            )
+            linha = self._executar_consulta_segura(
+                select(Entidade, total_em_aberto).where(Entidade.id == cliente_id)
+            ).first()
+            if linha:
+                contexto.cliente, contexto.total_em_aberto = linha[0], Decimal(str(linha[1] or 0))
+
+        vendedor_id = dados_venda.get('vendedor_id')
+        if vendedor_id:
+            contexto.vendedor = self._executar_consulta_segura(
+                select(Usuario)
+                .options(joinedload(Usuario.perfil))
+                .where(Usuario.id == vendedor_id)
+            ).scalar_one_or_none()
+
+        return contexto
+
     # 1. Validação de Cliente Obrigatório - CORRIGIDA
-    def validar_cliente(self, cliente_id, cliente_nome):
+    def validar_cliente(self, cliente_id, cliente_nome, contexto=None):
         """Valida se o cliente foi selecionado"""
         if not cliente_id and not cliente_nome:
             self.adicionar_erro("Cliente é obrigatório para a venda")
@@ -57,12 +129,10 @@ class ValidadorComercial:
         
         # Se tem ID, verifica se existe no banco
         if cliente_id:
-            from src.Models.models import Entidade
             try:
-                print(f"🔍 Validando cliente ID: {cliente_id}")
-                cliente = self._executar_consulta_segura(
-                    select(Entidade).where(Entidade.id == cliente_id)
-                ).scalar_one_or_none()
+                if contexto is None:
+                    contexto = self.carregar_contexto({'cliente_id': cliente_id})
+                cliente = contexto.cliente
                 
                 if not cliente:
                     self.adicionar_erro("Cliente não encontrado no cadastro")
@@ -72,19 +142,16 @@ class ValidadorComercial:
                     self.adicionar_erro("Cliente está bloqueado para novas vendas")
                     return False
                     
-                print("✅ Cliente validado com sucesso")
                 return True
                     
             except Exception as e:
-                error_msg = f"Erro ao validar cliente: {str(e)}"
-                print(f"❌ {error_msg}")
-                self.adicionar_erro(error_msg)
+                self.adicionar_erro(f"Erro ao validar cliente: {str(e)}")
                 return False
         
         return True
 
     # 2. Validação de Dados do Vendedor - CORRIGIDA
-    def validar_vendedor(self, vendedor_id, vendedor_nome):
+    def validar_vendedor(self, vendedor_id, vendedor_nome, contexto=None):
         """Valida se o vendedor foi selecionado"""
         if not vendedor_id and not vendedor_nome:
             self.adicionar_erro("Vendedor é obrigatório para a venda")
@@ -92,59 +159,44 @@ class ValidadorComercial:
         
         # Verifica se o vendedor existe e está ativo
         if vendedor_id:
-            from src.Models.models import Usuario, Perfil
+            from src.Models.models import CargoPerfilEnum
             try:
-                print(f"🔍 Validando vendedor ID: {vendedor_id}")
-                vendedor = self._executar_consulta_segura(
-                    select(Usuario).where(Usuario.id == vendedor_id)
-                ).scalar_one_or_none()
+                if contexto is None:
+                    contexto = self.carregar_contexto({'vendedor_id': vendedor_id})
+                vendedor = contexto.vendedor
                 
                 if not vendedor:
                     self.adicionar_erro("Vendedor não encontrado no sistema")
                     return False
                 
                 # Verifica se o vendedor tem perfil de vendas
-                perfil_valido = vendedor.perfil.cargo.value in ['vendas', 'administrador']
+                perfil_valido = vendedor.perfil is not None and vendedor.perfil.cargo in (
+                    CargoPerfilEnum.VENDAS, CargoPerfilEnum.ADMINISTRADOR
+                )
                 if not perfil_valido:
                     self.adicionar_erro("Vendedor não tem permissão para realizar vendas")
                     return False
                 
-                print("✅ Vendedor validado com sucesso")
                 return True
                     
             except Exception as e:
-                error_msg = f"Erro ao validar vendedor: {str(e)}"
-                print(f"❌ {error_msg}")
-                self.adicionar_erro(error_msg)
+                self.adicionar_erro(f"Erro ao validar vendedor: {str(e)}")
                 return False
         
         return True
 
     # 3. Validação de Limite de Crédito do Cliente - CORRIGIDA
-    def validar_limite_credito(self, cliente_id, valor_total_venda):
+    def validar_limite_credito(self, cliente_id, valor_total_venda, contexto=None):
         """Valida se o cliente tem limite de crédito disponível"""
         if not cliente_id:
             return True  # Venda para cliente balcão não precisa de limite
         
-        from src.Models.models import Entidade, Financeiro
-        from sqlalchemy import func
-        
         try:
-            print(f"💰 Validando limite de crédito para cliente: {cliente_id}")
-            # Buscar limite do cliente
-            LIMITE_PADRAO = Decimal('5000.00')  # Limite padrão de R$ 5.000,00
-            
-            # Calcular vendas em aberto do cliente
-            total_em_aberto = self._executar_consulta_segura(
-                select(func.coalesce(func.sum(Financeiro.valor_nota), 0))
-                .where(
-                    Financeiro.cliente_id == cliente_id,
-                    Financeiro.status == 'ABERTA',
-                    Financeiro.tipo_lancamento == 'R'  # Receber
-                )
-            ).scalar()
-            
-            limite_disponivel = LIMITE_PADRAO - total_em_aberto
+            if contexto is None:
+                contexto = self.carregar_contexto({'cliente_id': cliente_id})
+
+            # Limite padrão de R$ 5.000,00 menos as vendas em aberto do cliente
+            limite_disponivel = LIMITE_CREDITO_PADRAO - contexto.total_em_aberto
             
             if valor_total_venda > limite_disponivel:
                 self.adicionar_erro(
@@ -154,138 +206,113 @@ class ValidadorComercial:
                 )
                 return False
                 
-            print("✅ Limite de crédito validado com sucesso")
             return True
                 
         except Exception as e:
-            error_msg = f"Erro ao validar limite de crédito: {str(e)}"
-            print(f"❌ {error_msg}")
-            self.adicionar_erro(error_msg)
+            self.adicionar_erro(f"Erro ao validar limite de crédito: {str(e)}")
             return False
 
     # 4. Validação de Preços Mínimos - CORRIGIDA
-    def validar_preco_minimo(self, itens_venda):
+    def validar_preco_minimo(self, itens_venda, contexto=None):
         """Valida se os preços estão acima do mínimo permitido"""
-        from src.Models.models import Item
-        
+        try:
+            if contexto is None:
+                contexto = self.carregar_contexto({'itens': itens_venda})
+        except Exception as e:
+            self.adicionar_erro(f"Erro ao validar preço do produto: {str(e)}")
+            return False
+
         for item in itens_venda:
             produto_id = item.get('produto_id')
             preco_venda = item.get('preco_unitario')
-            quantidade = item.get('quantidade', 1)
             
             if produto_id and preco_venda:
-                try:
-                    print(f"📊 Validando preço mínimo para produto: {produto_id}")
-                    produto = self._executar_consulta_segura(
-                        select(Item).where(Item.id == produto_id)
-                    ).scalar_one_or_none()
+                produto = contexto.produtos.get(produto_id)
+                if produto:
+                    # Calcular preço mínimo (custo + 10% de margem)
+                    preco_minimo = (produto.custo_unitario or 0) * Decimal('1.10')
                     
-                    if produto:
-                        # Calcular preço mínimo (custo + 10% de margem)
-                        preco_minimo = produto.custo_unitario * Decimal('1.10')
-                        
-                        if preco_venda < preco_minimo:
-                            self.adicionar_erro(
-                                f"Preço abaixo do mínimo para {produto.nome}\n"
-                                f"Preço mínimo: R$ {preco_minimo:,.2f}\n"
-                                f"Preço informado: R$ {preco_venda:,.2f}"
-                            )
-                            return False
-                    print("✅ Preço mínimo validado com sucesso")
-                except Exception as e:
-                    error_msg = f"Erro ao validar preço do produto: {str(e)}"
-                    print(f"❌ {error_msg}")
-                    self.adicionar_erro(error_msg)
-                    return False
+                    if preco_venda < preco_minimo:
+                        self.adicionar_erro(
+                            f"Preço abaixo do mínimo para {produto.nome}\n"
+                            f"Preço mínimo: R$ {preco_minimo:,.2f}\n"
+                            f"Preço informado: R$ {preco_venda:,.2f}"
+                        )
+                        return False
         
         return True
 
     # 5. Validação de Data de Validade (para produtos perecíveis) - CORRIGIDA
-    def validar_validade_produtos(self, itens_venda):
+    def validar_validade_produtos(self, itens_venda, contexto=None):
         """Valida a validade de produtos perecíveis"""
-        from src.Models.models import Item
-        
         hoje = date.today()
+
+        try:
+            if contexto is None:
+                contexto = self.carregar_contexto({'itens': itens_venda})
+        except Exception as e:
+            self.adicionar_erro(f"Erro ao validar validade do produto: {str(e)}")
+            return False
         
         for item in itens_venda:
             produto_id = item.get('produto_id')
             data_validade = item.get('data_validade')
             
             if produto_id and data_validade:
-                try:
-                    print(f"📅 Validando validade para produto: {produto_id}")
-                    produto = self._executar_consulta_segura(
-                        select(Item).where(Item.id == produto_id)
-                    ).scalar_one_or_none()
+                produto = contexto.produtos.get(produto_id)
+                if produto:
+                    # Verificar se é produto perecível (baseado no tipo ou nome)
+                    is_perecivel = self.is_produto_perecivel(produto)
                     
-                    if produto:
-                        # Verificar se é produto perecível (baseado no tipo ou nome)
-                        is_perecivel = self.is_produto_perecivel(produto)
-                        
-                        if is_perecivel and data_validade < hoje:
-                            self.adicionar_erro(
-                                f"Produto {produto.nome} está vencido\n"
-                                f"Data de validade: {data_validade.strftime('%d/%m/%Y')}"
-                            )
-                            return False
-                    print("✅ Validade validada com sucesso")
-                except Exception as e:
-                    error_msg = f"Erro ao validar validade do produto: {str(e)}"
-                    print(f"❌ {error_msg}")
-                    self.adicionar_erro(error_msg)
-                    return False
+                    if is_perecivel and data_validade < hoje:
+                        self.adicionar_erro(
+                            f"Produto {produto.nome} está vencido\n"
+                            f"Data de validade: {data_validade.strftime('%d/%m/%Y')}"
+                        )
+                        return False
         
         return True
 
     def is_produto_perecivel(self, produto):
         """Verifica se o produto é perecível baseado no nome ou categoria"""
-        palavras_chave = ['leite', 'iogurte', 'queijo', 'carne', 'frango', 'peixe', 
-                         'presunto', 'salame', 'manteiga', 'ovo', 'fruta', 'verdura',
-                         'legume', 'pão', 'bolo', 'torta']
-        
         nome_produto = produto.nome.lower() if produto.nome else ""
         
-        return any(palavra in nome_produto for palavra in palavras_chave)
+        return any(palavra in nome_produto for palavra in PALAVRAS_PERECIVEIS)
 
     # 6. Validação de Estoque - CORRIGIDA
-    def validar_estoque(self, itens_venda):
+    def validar_estoque(self, itens_venda, contexto=None):
         """Valida se há estoque suficiente para todos os itens"""
-        from src.Models.models import Item
-        
+        try:
+            if contexto is None:
+                contexto = self.carregar_contexto({'itens': itens_venda})
+        except Exception as e:
+            self.adicionar_erro(f"Erro ao validar estoque do produto: {str(e)}")
+            return False
+
         for item in itens_venda:
             produto_id = item.get('produto_id')
             quantidade = item.get('quantidade', 0)
             
             if produto_id:
-                try:
-                    print(f"📦 Validando estoque para produto: {produto_id}")
-                    produto = self._executar_consulta_segura(
-                        select(Item).where(Item.id == produto_id)
-                    ).scalar_one_or_none()
+                produto = contexto.produtos.get(produto_id)
+                if produto:
+                    estoque = produto.estoque or 0
+                    if estoque < quantidade:
+                        self.adicionar_erro(
+                            f"Estoque insuficiente para {produto.nome}\n"
+                            f"Estoque disponível: {estoque}\n"
+                            f"Quantidade solicitada: {quantidade}"
+                        )
+                        return False
                     
-                    if produto:
-                        if produto.estoque < quantidade:
-                            self.adicionar_erro(
-                                f"Estoque insuficiente para {produto.nome}\n"
-                                f"Estoque disponível: {produto.estoque}\n"
-                                f"Quantidade solicitada: {quantidade}"
-                            )
-                            return False
-                        
-                        # Verificar estoque mínimo
-                        if produto.estoque - quantidade < produto.estoque_minimo:
-                            self.adicionar_erro(
-                                f"Atenção: Venda deixará estoque abaixo do mínimo para {produto.nome}\n"
-                                f"Estoque após venda: {produto.estoque - quantidade}\n"
-                                f"Estoque mínimo: {produto.estoque_minimo}"
-                            )
-                            # Não bloqueia a venda, apenas alerta
-                    print("✅ Estoque validado com sucesso")
-                except Exception as e:
-                    error_msg = f"Erro ao validar estoque do produto: {str(e)}"
-                    print(f"❌ {error_msg}")
-                    self.adicionar_erro(error_msg)
-                    return False
+                    # Verificar estoque mínimo
+                    if estoque - quantidade < (produto.estoque_minimo or 0):
+                        self.adicionar_erro(
+                            f"Atenção: Venda deixará estoque abaixo do mínimo para {produto.nome}\n"
+                            f"Estoque após venda: {estoque - quantidade}\n"
+                            f"Estoque mínimo: {produto.estoque_minimo}"
+                        )
+                        # Não bloqueia a venda, apenas alerta
         
         return True
 
@@ -312,8 +339,7 @@ class ValidadorComercial:
 
     # 8. Validação Completa Integrada - CORRIGIDA
     def validar_venda_completa(self, dados_venda, parent=None):
-        """Executa todas as validações da venda"""
-        print("🚀 Iniciando validação completa da venda...")
+        """Executa todas as validações da venda sobre um único snapshot do banco"""
         self.limpar_erros()
         
         # Dados básicos
@@ -325,31 +351,29 @@ class ValidadorComercial:
         itens = dados_venda.get('itens', [])
         
         try:
-            # Executar validações
+            # Carrega produtos, cliente, vendedor e títulos em aberto de uma vez
+            contexto = self.carregar_contexto(dados_venda)
+
+            # Executar validações (todas em memória)
             validacoes = [
                 lambda: self.validar_dados_obrigatorios(dados_venda),
-                lambda: self.validar_cliente(cliente_id, cliente_nome),
-                lambda: self.validar_vendedor(vendedor_id, vendedor_nome),
-                lambda: self.validar_limite_credito(cliente_id, valor_total),
-                lambda: self.validar_estoque(itens),
-                lambda: self.validar_preco_minimo(itens),
-                lambda: self.validar_validade_produtos(itens)
+                lambda: self.validar_cliente(cliente_id, cliente_nome, contexto),
+                lambda: self.validar_vendedor(vendedor_id, vendedor_nome, contexto),
+                lambda: self.validar_limite_credito(cliente_id, valor_total, contexto),
+                lambda: self.validar_estoque(itens, contexto),
+                lambda: self.validar_preco_minimo(itens, contexto),
+                lambda: self.validar_validade_produtos(itens, contexto)
             ]
             
-            for i, validacao in enumerate(validacoes):
-                print(f"🔍 Executando validação {i+1}...")
+            for validacao in validacoes:
                 if not validacao():
-                    print(f"❌ Validação {i+1} falhou")
                     break  # Para na primeira validação que falhar
-                else:
-                    print(f"✅ Validação {i+1} passou")
                     
         except Exception as e:
             error_msg = f"Erro inesperado durante a validação: {str(e)}"
             print(f"❌ {error_msg}")
             self.adicionar_erro(error_msg)
         
-        print(f"🎯 Validação concluída. Erros encontrados: {len(self.erros)}")
         return self.mostrar_erros(parent)
 
 # Classe para representar itens da venda
@@ -7,6 +7,10 @@ from sqlalchemy import select, or_
 from datetime import datetime
 # CORREÇÃO: Usamos Entidade em vez de Fornecedor
 from src.Models.models import Item, MovimentoEstoque, Entidade
+from src.Models.resumos import somar_movimentos
+from src.Models.custo_medio import registrar_entradas, registrar_saidas
+from src.Models.concorrencia import com_retentativas, EstoqueInsuficiente
+from src.Views.kardex_view import KardexDialog
 
 class CadastroEstoqueWidget(QWidget):
     def __init__(self, sessao):
@@ -66,6 +70,11 @@ class CadastroEstoqueWidget(QWidget):
         self.btn_salvar.setStyleSheet("background-color: #007bff; color: white; font-weight: bold; padding: 10px;")
         self.btn_salvar.clicked.connect(self.salvar_movimento)
         layout.addWidget(self.btn_salvar)
+
+        # Histórico do produto selecionado
+        self.btn_kardex = QPushButton("📒 Ver Kardex do Produto")
+        self.btn_kardex.clicked.connect(self.abrir_kardex)
+        layout.addWidget(self.btn_kardex)
         
         layout.addStretch()
 
@@ -96,6 +105,13 @@ class CadastroEstoqueWidget(QWidget):
         except Exception as e:
             print(f"Erro ao carregar dados estoque: {e}")
 
+    def abrir_kardex(self):
+        produto_id = self.combo_produto.currentData()
+        if not produto_id:
+            QMessageBox.warning(self, "Aviso", "Selecione um produto.")
+            return
+        KardexDialog(self.sessao, produto_id, self).exec()
+
     def salvar_movimento(self):
         produto_id = self.combo_produto.currentData()
         qtd = self.spin_qtd.value()
@@ -108,24 +124,23 @@ class CadastroEstoqueWidget(QWidget):
 
         tipo = "entrada" if self.radio_entrada.isChecked() else "saida"
 
-        try:
+        def gravar():
             # Busca produto para atualizar estoque atual
             produto = self.sessao.get(Item, produto_id)
-            estoque_antigo = float(produto.estoque or 0)
             
             if tipo == "entrada":
-                produto.estoque = estoque_antigo + qtd
-                # Atualiza custo se for entrada
-                if preco > 0: produto.custo_unitario = preco
+                # Estoque e custo médio ponderado no banco; sem preço, entra pelo custo atual
+                custo = preco if preco > 0 else float(produto.custo_unitario or 0)
+                registrar_entradas(self.sessao.connection(), {produto.id: (qtd, qtd * custo)})
             else:
-                produto.estoque = estoque_antigo - qtd
+                # Baixa relativa no banco, só se o saldo cobre: não depende do estoque lido (outros terminais)
+                custo = produto.custo_unitario or 0
+                registrar_saidas(self.sessao.connection(), {produto.id: qtd})
+            self.sessao.expire(produto, ["estoque", "custo_unitario", "versao"])
 
             # Cria registro de histórico
-            # Se não selecionou fornecedor, tenta usar o padrão do produto ou None (se o banco permitir, senão 1)
-            if not forn_id and produto.fornecedor_id:
-                forn_id = produto.fornecedor_id
-            
-            # Se ainda for nulo e o banco obrigar, cuidado. Vamos assumir que pode ser nulo ou pegamos o primeiro.
+            # Se não selecionou fornecedor, usa o padrão do produto (ou None)
+            fornecedor_id = forn_id or produto.fornecedor_id
             
             mov = MovimentoEstoque(
                 item_id=produto.id,
@@ -136,16 +151,28 @@ class CadastroEstoqueWidget(QWidget):
                 estoque_minimo=0,
                 estoque_maximo=0,
                 preco_venda=produto.preco_venda or 0,
-                preco_compra=preco if tipo == 'entrada' else (produto.custo_unitario or 0),
-                fornecedor_id=forn_id # Pode ser None se o banco aceitar, ou precisa tratar no models
+                preco_compra=custo,
+                fornecedor_id=fornecedor_id
             )
             
             self.sessao.add(mov)
+            somar_movimentos(self.sessao, [{
+                "item_id": mov.item_id,
+                "data_ultima_mov": mov.data_ultima_mov,
+                "tipo_movimento": mov.tipo_movimento,
+                "quantidade": mov.quantidade,
+            }])
             self.sessao.commit()
-            
-            QMessageBox.information(self, "Sucesso", f"Estoque atualizado!\nNovo saldo: {produto.estoque}")
+            return produto.estoque
+
+        try:
+            novo_saldo = com_retentativas(self.sessao, gravar)
+            QMessageBox.information(self, "Sucesso", f"Estoque atualizado!\nNovo saldo: {novo_saldo}")
             self.spin_qtd.setValue(1)
-            
+
+        except EstoqueInsuficiente as e:
+            self.sessao.rollback()
+            QMessageBox.warning(self, "Estoque", str(e))
         except Exception as e:
             self.sessao.rollback()
             QMessageBox.critical(self, "Erro", f"Erro ao salvar: {e}")
\ No newline at end of file
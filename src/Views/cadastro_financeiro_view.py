@@ -6,6 +6,10 @@ from PyQt6.QtGui import QStandardItemModel, QStandardItem
 from sqlalchemy import select, func, delete
 
 from src.Models.models import Financeiro, EnumStatus
+from src.Models.resumos import somar_financeiro
+from src.Utils.controlador_busca import ControladorBusca, contem_ilike
+from src.Utils.paginador import PaginadorKeyset
+from src.Utils.executor_consultas import ExecutorConsultas
 from src.Components.Financeiro.cadastro_financeiro_dialog import CadastroFinanceiroDialog, FiltroFinanceiroDialog
 
 
@@ -16,8 +20,10 @@ class CadastroFinanceiroWidget(QWidget):
         self.main_layout = QVBoxLayout(self)
 
         self.PAGE_SIZE = 20
-        self.current_page = 1
         self.total_records = 0
+        self.paginador = PaginadorKeyset(session, self.PAGE_SIZE, contagem_aproximada=True)
+        self.executor_consultas = ExecutorConsultas(self, bind=session.get_bind())
+        self.executor_consultas.erro.connect(self.erro_carregamento)
         
         # Mapeamento de campos para ordenação
         self.field_to_model = {
@@ -42,7 +48,9 @@ class CadastroFinanceiroWidget(QWidget):
         search_filter_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Buscar por descrição...")
-        self.search_input.textChanged.connect(lambda: self.load_data(reset_page=True))
+        self.controlador_busca = ControladorBusca(self.search_input, parent=self)
+        self.controlador_busca.buscar.connect(lambda _termo: self.load_data(reset_page=True))
+        self.controlador_busca.refinar.connect(self.refinar_busca)
 
         self.filter_btn = QPushButton("⚙️ Filtro Avançado")
         self.filter_btn.setStyleSheet(
@@ -110,7 +118,7 @@ class CadastroFinanceiroWidget(QWidget):
         self.add_btn.clicked.connect(self.open_add_dialog)
         self.edit_btn.clicked.connect(self.open_edit_dialog)
         self.delete_btn.clicked.connect(self.delete_item)
-        self.refresh_btn.clicked.connect(self.load_data)
+        self.refresh_btn.clicked.connect(self.atualizar)
 
         self.prev_btn.clicked.connect(self.go_to_previous_page)
         self.next_btn.clicked.connect(self.go_to_next_page)
@@ -141,89 +149,107 @@ class CadastroFinanceiroWidget(QWidget):
     #  NAVEGAÇÃO
     # =========================================================================
     def go_to_previous_page(self):
-        if self.current_page > 1:
-            self.current_page -= 1
+        if self.paginador.anterior():
             self.load_data()
 
     def go_to_next_page(self):
-        total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-        if self.current_page < total_pages:
-            self.current_page += 1
+        if self.paginador.proxima():
             self.load_data()
 
 
     # =========================================================================
     #  CARREGAR DADOS
     # =========================================================================
+    def atualizar(self):
+        # Dados podem ter mudado (aqui ou em outro terminal): recontar
+        self.paginador.invalidar_contagem()
+        self.load_data()
+
     def load_data(self, reset_page=False):
 
         if reset_page:
-            self.current_page = 1
+            self.paginador.primeira()
 
         filtro = self.search_input.text().strip()
 
-        try:
-            # ==============================
-            #  Query base
-            # ==============================
-            base_query = select(Financeiro)
+        # ==============================
+        #  Query base (só as colunas da tabela)
+        # ==============================
+        base_query = select(
+            Financeiro.id, Financeiro.tipo_lancamento, Financeiro.origem, Financeiro.descricao,
+            Financeiro.valor_nota, Financeiro.vencimento, Financeiro.status
+        )
+
+        # ---- Filtro texto (descrição)
+        if filtro:
+            base_query = base_query.where(Financeiro.descricao.ilike(f"%{filtro}%"))
 
-            # ---- Filtro texto (descrição)
-            if filtro:
-                base_query = base_query.where(Financeiro.descricao.ilike(f"%{filtro}%"))
+        # ---- Filtros avançados
+        if self.current_filters.get("status"):
+            base_query = base_query.where(Financeiro.status == self.current_filters["status"])
 
-            # ---- Filtros avançados
-            if self.current_filters.get("status"):
-                base_query = base_query.where(Financeiro.status == self.current_filters["status"])
+        if self.current_filters.get("valor_min"):
+            base_query = base_query.where(Financeiro.valor_nota >= self.current_filters["valor_min"])
 
-            if self.current_filters.get("valor_min"):
-                base_query = base_query.where(Financeiro.valor_nota >= self.current_filters["valor_min"])
+        if self.current_filters.get("valor_max"):
+            base_query = base_query.where(Financeiro.valor_nota <= self.current_filters["valor_max"])
 
-            if self.current_filters.get("valor_max"):
-                base_query = base_query.where(Financeiro.valor_nota <= self.current_filters["valor_max"])
+        # ==============================
+        #  Ordenação + página (keyset sobre campo e id)
+        # ==============================
+        sort_field_name = self.current_filters.get("sort_column_field", "id")
+        sort_direction = self.current_filters.get("sort_order", "DESC")
 
-            # ==============================
-            #  Total registros
-            # ==============================
-            total_count = select(func.count()).select_from(base_query.subquery())
-            self.total_records = self.session.execute(total_count).scalar_one()
-            total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
+        sort_field = self.field_to_model.get(sort_field_name, Financeiro.id)
+
+        self.paginador.definir_consulta(
+            base_query, sort_field, Financeiro.id, descendente=(sort_direction != "ASC")
+        )
 
-            if self.current_page > total_pages and total_pages > 0:
-                self.current_page = total_pages
-            elif total_pages == 0:
-                self.current_page = 1
+        # ==============================
+        #  Página + total (contagem em cache enquanto os filtros não mudam),
+        #  lidos em segundo plano
+        # ==============================
+        self.exibir_carregando()
+        self.executor_consultas.executar(
+            self.paginador.preparar(),
+            lambda resultado: self.exibir_pagina(resultado, filtro)
+        )
 
-            offset = (self.current_page - 1) * self.PAGE_SIZE
+    def exibir_carregando(self):
+        # Navegação travada até a página chegar: o paginador só avança a partir dela
+        self.prev_btn.setEnabled(False)
+        self.next_btn.setEnabled(False)
+        self.page_info_label.setText("Carregando...")
 
-            # ==============================
-            #  Ordenação
-            # ==============================
-            sort_field_name = self.current_filters.get("sort_column_field", "id")
-            sort_direction = self.current_filters.get("sort_order", "DESC")
+    def exibir_pagina(self, resultado, filtro):
+        items = self.paginador.receber(resultado)
+        self.total_records, _ = self.paginador.total()
 
-            sort_field = self.field_to_model.get(sort_field_name, Financeiro.id)
+        self.itens_carregados = items
+        self.preencher_tabela(items)
 
-            if sort_direction == "ASC":
-                base_query = base_query.order_by(sort_field.asc())
-            else:
-                base_query = base_query.order_by(sort_field.desc())
+        # Com uma única página, a tela tem todas as linhas do termo: dá para refinar em memória
+        self.controlador_busca.marcar_resultado(
+            filtro, self.paginador.pagina == 1 and not self.paginador.tem_proxima
+        )
 
-            # ==============================
-            #  Exec Query
-            # ==============================
-            query = base_query.offset(offset).limit(self.PAGE_SIZE)
-            items = self.session.execute(query).scalars().all()
+    def erro_carregamento(self, mensagem):
+        QMessageBox.critical(self, "Erro", f"Falha ao carregar dados.\n{mensagem}")
+        self.prev_btn.setEnabled(self.paginador.pagina > 1)
+        self.next_btn.setEnabled(self.paginador.tem_proxima)
+        self.page_info_label.setText("Erro ao carregar")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Falha ao carregar dados.\n{e}")
-            items = []
-            total_pages = 1
-            self.total_records = 0
+    def refinar_busca(self, termo):
+        items = [f for f in self.itens_carregados if contem_ilike(f.descricao, termo)]
+        self.itens_carregados = items
+        self.total_records = len(items)
+        self.preencher_tabela(items)
 
-        # ==============================
-        #  Montar tabela
-        # ==============================
+    # =========================================================================
+    #  MONTAR TABELA
+    # =========================================================================
+    def preencher_tabela(self, items):
         headers = ["ID", "Tipo", "Origem", "Descrição", "Valor (R$)", "Vencimento", "Status"]
 
         model = QStandardItemModel(len(items), len(headers))
@@ -241,10 +267,10 @@ class CadastroFinanceiroWidget(QWidget):
         self.table_view.setModel(model)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
 
-        self.prev_btn.setEnabled(self.current_page > 1)
-        self.next_btn.setEnabled(self.current_page < total_pages)
+        self.prev_btn.setEnabled(self.paginador.pagina > 1)
+        self.next_btn.setEnabled(self.paginador.tem_proxima)
 
-        self.page_info_label.setText(f"Página {self.current_page} de {total_pages if total_pages > 0 else 1}")
+        self.page_info_label.setText(self.paginador.descricao_paginas())
 
         main_window = self.window()
         if hasattr(main_window, "total_registros_label"):
@@ -258,6 +284,7 @@ class CadastroFinanceiroWidget(QWidget):
     def open_add_dialog(self):
         dialog = CadastroFinanceiroDialog(self.session, parent=self)
         if dialog.exec():
+            self.paginador.invalidar_contagem()
             self.load_data(reset_page=True)
 
     def get_selected_item(self):
@@ -280,12 +307,14 @@ class CadastroFinanceiroWidget(QWidget):
         if item:
             dialog = CadastroFinanceiroDialog(self.session, lancamento=item, parent=self)
             if dialog.exec():
+                self.paginador.invalidar_contagem()
                 self.load_data()
 
 
     def delete_item(self):
-        item, lanc_id = self.get_selected_item()
+        item = self.get_selected_item()
         if item:
+            lanc_id = item.id
             reply = QMessageBox.question(
                 self,
                 "Excluir",
@@ -295,9 +324,12 @@ class CadastroFinanceiroWidget(QWidget):
             
             if reply == QMessageBox.StandardButton.Yes:
                 try:
+                    somar_financeiro(self.session, item.tipo_lancamento, item.status,
+                                     item.vencimento, item.valor_nota, sinal=-1)
                     self.session.execute(delete(Financeiro).where(Financeiro.id == lanc_id))
                     self.session.commit()
                     QMessageBox.information(self, "Sucesso", "Lançamento excluído.")
+                    self.paginador.invalidar_contagem()
                     self.load_data(reset_page=True)
                 except Exception as e:
                     self.session.rollback()
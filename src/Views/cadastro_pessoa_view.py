@@ -1,14 +1,19 @@
 from src.Components.Cadastro.filtro_avancado_pessoas_dialog import FiltroAvancadoPessoasDialog
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTableView, QLabel, QMessageBox, QLineEdit, QHeaderView
+    QTableView, QLabel, QMessageBox, QLineEdit, QHeaderView, QFileDialog
 )
-from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtGui import QStandardItemModel
 from PyQt6.QtCore import Qt
 from sqlalchemy import select
 
 
 from src.Models.models import Entidade
+from src.Models.busca_textual import filtro_textual, corresponde, somente_digitos
+from src.Utils.modelo_tabela_sql import ModeloTabelaSQL, ModeloTabelaLista, ColunaTabela
+from src.Utils.controlador_busca import ControladorBusca
+from src.Utils.importador_csv import ImportadorCSV, texto_resultado
+from src.Models.importacao import importar_pessoas
 from src.Components.Cadastro.cadastro_pessoa_dialog import (
     CadastroPessoaDialog,
     TIPOS_ENTIDADE_DB_TO_LABEL,
@@ -50,7 +55,9 @@ class CadastroPessoasWidget(QWidget):
 
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Buscar por nome, CPF/CNPJ...")
-        self.search_input.textChanged.connect(self.load_data)
+        self.controlador_busca = ControladorBusca(self.search_input, parent=self)
+        self.controlador_busca.buscar.connect(lambda _termo: self.load_data())
+        self.controlador_busca.refinar.connect(self.refinar_busca)
 
         self.filter_btn = QPushButton("⚙️ Filtro Avançado")
         # Estilo inspirado no Cadastro de Produtos
@@ -74,6 +81,7 @@ class CadastroPessoasWidget(QWidget):
         self.edit_btn = QPushButton("📝 Editar")
         self.delete_btn = QPushButton("❌ Excluir")
         self.refresh_btn = QPushButton("🔄 Atualizar")
+        self.import_btn = QPushButton("📥 Importar CSV")
 
         self.add_btn.setStyleSheet(
             "background-color: #28a745; color: white; "
@@ -92,11 +100,13 @@ class CadastroPessoasWidget(QWidget):
             "padding: 10px; border-radius: 5px; "
             "border: 1px solid #CED4DA;"
         )
+        self.import_btn.setStyleSheet(self.refresh_btn.styleSheet())
 
         button_layout.addWidget(self.add_btn)
         button_layout.addWidget(self.edit_btn)
         button_layout.addWidget(self.delete_btn)
         button_layout.addWidget(self.refresh_btn)
+        button_layout.addWidget(self.import_btn)
         button_layout.addStretch()
 
         self.main_layout.addLayout(button_layout)
@@ -119,6 +129,15 @@ class CadastroPessoasWidget(QWidget):
         self.edit_btn.clicked.connect(self.editar_pessoa)
         self.delete_btn.clicked.connect(self.excluir_pessoa)
         self.refresh_btn.clicked.connect(self.load_data)
+        self.import_btn.clicked.connect(self.importar_csv)
+
+        # Importação em segundo plano (src/Models/importacao.py)
+        self.importador = ImportadorCSV(self)
+        self.importador.progresso.connect(
+            lambda lidas, gravadas, rejeitadas: self.import_btn.setText(f"⏳ {lidas} linhas lidas...")
+        )
+        self.importador.concluida.connect(self._importacao_concluida)
+        self.importador.falhou.connect(self._importacao_falhou)
 
         # Carregar dados ao abrir
         self.load_data()
@@ -147,8 +166,11 @@ class CadastroPessoasWidget(QWidget):
         filtro = self.search_input.text().strip()
         fa = self.filtros_avancados  # filtros avançados aplicados
 
-        # Base da consulta (somente entidades permitidas)
-        stmt = select(Entidade).where(
+        # Base da consulta (somente entidades permitidas; só as colunas exibidas)
+        stmt = select(
+            Entidade.id, Entidade.tipo_entidade, Entidade.tipo_pessoa, Entidade.razao_social,
+            Entidade.nome_fantasia, Entidade.cpf_cnpj, Entidade.esta_bloqueado,
+        ).where(
             Entidade.tipo_entidade != None
         )
 
@@ -182,99 +204,83 @@ class CadastroPessoasWidget(QWidget):
         # ==========================================================
         # BUSCA GERAL (campo de pesquisa)
         # ==========================================================
-        if filtro:
-            like = f"%{filtro}%"
-            stmt = stmt.where(
-                (Entidade.razao_social.ilike(like))
-                | (Entidade.nome_fantasia.ilike(like))
-                | (Entidade.cpf_cnpj.ilike(like))
-            )
-
-        stmt = stmt.order_by(Entidade.id.desc())
-
-        # ==========================================================
-        # EXECUÇÃO
-        # ==========================================================
-        try:
-            result = self.session.execute(stmt).scalars().all()
-        except Exception as e:
-            QMessageBox.critical(
-                self, "Erro no BD",
-                f"Não foi possível carregar as pessoas.\nErro: {e}"
-            )
-            return
+        # Índice FTS5 (razão social, nome fantasia, CPF/CNPJ), sem acentos e por prefixo
+        busca = filtro_textual(Entidade.id, "entidade_fts", filtro) if filtro else None
+        if busca is not None:
+            stmt = stmt.where(busca)
 
         # ==========================================================
-        # MONTAGEM DO MODELO DA TABELA
+        # EXECUÇÃO (lotes lidos em segundo plano, sob demanda, pelo modelo)
         # ==========================================================
-        headers = [
-            "ID",
-            "Categoria",
-            "Tipo Pessoa",
-            "Razão Social / Nome",
-            "Nome Fantasia",
-            "CPF/CNPJ",
-            "Bloqueado",
-        ]
-
-        model = QStandardItemModel(len(result), len(headers))
-        model.setHorizontalHeaderLabels(headers)
-
-        for row_idx, ent in enumerate(result):
-
-            # ID
-            item_id = QStandardItem(str(ent.id))
-
-            # ======================================================
-            # CATEGORIAS MÚLTIPLAS (Cliente, Transportadora, etc.)
-            # ======================================================
-            tokens = parse_categorias(ent.tipo_entidade)
-            labels = [
-                TIPOS_ENTIDADE_DB_TO_LABEL.get(tok, tok.title())
-                for tok in tokens
-            ]
-            categoria_label = ", ".join(labels)
-            item_categoria = QStandardItem(categoria_label)
-
-            # Tipo de pessoa
-            tipo_pessoa_label = ""
-            if ent.tipo_pessoa:
-                if ent.tipo_pessoa.value == "FISICA":
-                    tipo_pessoa_label = "Física"
-                elif ent.tipo_pessoa.value == "JURIDICA":
-                    tipo_pessoa_label = "Jurídica"
-            item_tipo_pessoa = QStandardItem(tipo_pessoa_label)
-
-            # Razão, fantasia, CPF
-            item_razao = QStandardItem(ent.razao_social or "")
-            item_fantasia = QStandardItem(ent.nome_fantasia or "")
-            item_cpf_cnpj = QStandardItem(ent.cpf_cnpj or "")
-
-            # Bloqueado
-            bloqueado_str = "Sim" if ent.esta_bloqueado else "Não"
-            item_bloqueado = QStandardItem(bloqueado_str)
-
-            row_items = [
-                item_id,
-                item_categoria,
-                item_tipo_pessoa,
-                item_razao,
-                item_fantasia,
-                item_cpf_cnpj,
-                item_bloqueado,
-            ]
-
-            for item in row_items:
-                item.setEditable(False)
-
-            for col_idx, item in enumerate(row_items):
-                model.setItem(row_idx, col_idx, item)
-
+        model = ModeloTabelaSQL(
+            self.session, stmt, self._colunas_tabela(), chave=[Entidade.id], assincrono=True
+        )
+        model.carregado.connect(lambda: self._lote_carregado(model, filtro))
+        self.refresh_btn.setText("⏳ Carregando...")
+        self._exibir_modelo(model)
+
+    def _lote_carregado(self, model, filtro):
+        self.refresh_btn.setText("🔄 Atualizar")
+        self.controlador_busca.marcar_resultado(filtro, model.completo())
+
+    def refinar_busca(self, termo):
+        # O termo só acrescentou texto ao anterior e todas as linhas dele estão em memória
+        atual = self.table_view.model()
+        linhas = [ent for ent in atual.linhas if corresponde(termo, self._campos_busca(ent))]
+        self._exibir_modelo(ModeloTabelaLista(linhas, self._colunas_tabela()))
+
+    @staticmethod
+    def _campos_busca(ent):
+        # Mesmas colunas do índice entidade_fts
+        return [ent.razao_social, ent.nome_fantasia, ent.cpf_cnpj, somente_digitos(ent.cpf_cnpj)]
+
+    def _exibir_modelo(self, model):
+        model.erro.connect(self._erro_tabela)
+        antigo = self.table_view.model()
         self.table_view.setModel(model)
+        if isinstance(antigo, ModeloTabelaSQL):
+            antigo.fechar()
         self.table_view.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
 
+    def _erro_tabela(self, mensagem):
+        self.refresh_btn.setText("🔄 Atualizar")
+        QMessageBox.critical(
+            self, "Erro no BD",
+            f"Não foi possível carregar as pessoas.\nErro: {mensagem}"
+        )
+
+    def _colunas_tabela(self):
+        return [
+            ColunaTabela("ID", lambda ent: ent.id),
+            ColunaTabela("Categoria", self._formatar_categorias),
+            ColunaTabela("Tipo Pessoa", self._formatar_tipo_pessoa),
+            ColunaTabela("Razão Social / Nome", lambda ent: ent.razao_social),
+            ColunaTabela("Nome Fantasia", lambda ent: ent.nome_fantasia),
+            ColunaTabela("CPF/CNPJ", lambda ent: ent.cpf_cnpj),
+            ColunaTabela("Bloqueado", lambda ent: "Sim" if ent.esta_bloqueado else "Não"),
+        ]
+
+    @staticmethod
+    def _formatar_categorias(ent):
+        # Categorias múltiplas (Cliente, Transportadora, etc.)
+        tokens = parse_categorias(ent.tipo_entidade)
+        labels = [
+            TIPOS_ENTIDADE_DB_TO_LABEL.get(tok, tok.title())
+            for tok in tokens
+        ]
+        return ", ".join(labels)
+
+    @staticmethod
+    def _formatar_tipo_pessoa(ent):
+        if ent.tipo_pessoa:
+            if ent.tipo_pessoa.value == "FISICA":
+                return "Física"
+            elif ent.tipo_pessoa.value == "JURIDICA":
+                return "Jurídica"
+        return ""
+
 
     # ------------------------------------------------------------------ #
     #   AUXILIAR
@@ -285,19 +291,16 @@ class CadastroPessoasWidget(QWidget):
             QMessageBox.warning(self, "Seleção", "Selecione uma pessoa na tabela.")
             return None
 
-        row = index.row()
         model = self.table_view.model()
-        id_item = model.item(row, 0)
+        linha = model.linha(index.row()) if isinstance(model, ModeloTabelaSQL) else None
 
-        try:
-            entidade_id = int(id_item.text())
-        except (TypeError, ValueError):
+        if linha is None:
             QMessageBox.warning(
                 self, "Erro", "Não foi possível obter o ID da pessoa selecionada."
             )
             return None
 
-        ent = self.session.get(Entidade, entidade_id)
+        ent = self.session.get(Entidade, linha.id)
         if not ent:
             QMessageBox.warning(
                 self, "Erro", "Registro não encontrado no banco de dados."
@@ -354,3 +357,30 @@ class CadastroPessoasWidget(QWidget):
             self.filtros_avancados = dialog.filtros
             self.load_data()
 
+
+
+    # ------------------------------------------------------------------ #
+    #   IMPORTAÇÃO CSV
+    # ------------------------------------------------------------------ #
+    def importar_csv(self):
+        if self.importador.ocupado():
+            return
+        caminho, _ = QFileDialog.getOpenFileName(
+            self, "Importar pessoas", "", "Arquivos CSV (*.csv *.txt);;Todos os arquivos (*)"
+        )
+        if not caminho:
+            return
+        self.import_btn.setEnabled(False)
+        self.importador.importar(importar_pessoas, caminho)
+
+    def _importacao_concluida(self, resultado):
+        self.import_btn.setEnabled(True)
+        self.import_btn.setText("📥 Importar CSV")
+        QMessageBox.information(self, "Importação de Pessoas", texto_resultado(resultado))
+        self.load_data()
+
+    def _importacao_falhou(self, mensagem):
+        self.import_btn.setEnabled(True)
+        self.import_btn.setText("📥 Importar CSV")
+        QMessageBox.critical(self, "Importação de Pessoas", f"Erro ao importar: {mensagem}")
+        self.load_data()
\ No newline at end of file
@@ -3,13 +3,19 @@
 from PyQt6.QtGui import QStandardItemModel, QStandardItem, QColor
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QLabel, QMessageBox,
-    QLineEdit, QDialog, QHeaderView, QAbstractItemView
+    QLineEdit, QDialog, QHeaderView, QAbstractItemView, QFileDialog
 )
 from sqlalchemy import select, func, delete, or_
 import sys
 
 # Modelos do Banco (Ajustado para o novo models.py)
 from src.Models.models import Item, Entidade
+from src.Models.busca_textual import filtro_textual, corresponde
+from src.Utils.controlador_busca import ControladorBusca
+from src.Utils.paginador import PaginadorKeyset
+from src.Utils.executor_consultas import ExecutorConsultas
+from src.Utils.importador_csv import ImportadorCSV, texto_resultado
+from src.Models.importacao import importar_produtos
 
 # SEUS DIALOGS ORIGINAIS (Certifique-se que o arquivo cadastro_produto_dialog.py está nesta pasta)
 # Se estiver na mesma pasta 'Views', o import é direto. 
@@ -27,8 +33,10 @@ class CadastroProdutosWidget(QWidget):
         self.main_layout = QVBoxLayout(self)
 
         self.PAGE_SIZE = 20
-        self.current_page = 1
         self.total_records = 0
+        self.paginador = PaginadorKeyset(session, self.PAGE_SIZE, contagem_aproximada=True)
+        self.executor_consultas = ExecutorConsultas(self, bind=session.get_bind())
+        self.executor_consultas.erro.connect(self.erro_carregamento)
         
         # Mapeamento para ordenação
         self.field_to_model = { 
@@ -50,7 +58,9 @@ class CadastroProdutosWidget(QWidget):
         search_filter_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Buscar por nome do produto ou código...")
-        self.search_input.textChanged.connect(lambda: self.load_data(reset_page=True))
+        self.controlador_busca = ControladorBusca(self.search_input, parent=self)
+        self.controlador_busca.buscar.connect(lambda _termo: self.load_data(reset_page=True))
+        self.controlador_busca.refinar.connect(self.refinar_busca)
         
         self.filter_btn = QPushButton("⚙️ Filtro Avançado")
         self.filter_btn.setStyleSheet("background-color: #E0E0E0; color: #424242; font-weight: bold; border-radius: 5px; border: 1px solid #CCCCCC;")
@@ -67,16 +77,19 @@ class CadastroProdutosWidget(QWidget):
         self.edit_btn = QPushButton("📝 Editar")
         self.delete_btn = QPushButton("❌ Excluir")
         self.refresh_btn = QPushButton("🔄 Atualizar")
+        self.import_btn = QPushButton("📥 Importar CSV")
         
         self.add_btn.setStyleSheet("background-color: #28a745; color: white; padding: 10px; border-radius: 5px;")
         self.edit_btn.setStyleSheet("background-color: #007bff; color: white; padding: 10px; border-radius: 5px;")
         self.delete_btn.setStyleSheet("background-color: #dc3545; color: white; padding: 10px; border-radius: 5px;")
         self.refresh_btn.setStyleSheet("background-color: #E9ECEF; color: #495057; padding: 10px; border-radius: 5px; border: 1px solid #CED4DA;")
+        self.import_btn.setStyleSheet("background-color: #E9ECEF; color: #495057; padding: 10px; border-radius: 5px; border: 1px solid #CED4DA;")
 
         button_layout.addWidget(self.add_btn)
         button_layout.addWidget(self.edit_btn)
         button_layout.addWidget(self.delete_btn)
         button_layout.addWidget(self.refresh_btn)
+        button_layout.addWidget(self.import_btn)
         button_layout.addStretch() 
         
         self.main_layout.addLayout(button_layout)
@@ -107,7 +120,16 @@ class CadastroProdutosWidget(QWidget):
         self.add_btn.clicked.connect(self.open_add_dialog)
         self.edit_btn.clicked.connect(self.open_edit_dialog) 
         self.delete_btn.clicked.connect(self.delete_item)     
-        self.refresh_btn.clicked.connect(self.load_data) 
+        self.refresh_btn.clicked.connect(self.atualizar) 
+        self.import_btn.clicked.connect(self.importar_csv)
+
+        # Importação em segundo plano (src/Models/importacao.py)
+        self.importador = ImportadorCSV(self)
+        self.importador.progresso.connect(
+            lambda lidas, gravadas, rejeitadas: self.import_btn.setText(f"⏳ {lidas} linhas lidas...")
+        )
+        self.importador.concluida.connect(self._importacao_concluida)
+        self.importador.falhou.connect(self._importacao_falhou)
         self.prev_btn.clicked.connect(self.go_to_previous_page)
         self.next_btn.clicked.connect(self.go_to_next_page)
 
@@ -116,50 +138,84 @@ class CadastroProdutosWidget(QWidget):
 
     # --- LÓGICA DE DADOS ---
 
+    def atualizar(self):
+        # Dados podem ter mudado (aqui ou em outro terminal): recontar
+        self.paginador.invalidar_contagem()
+        self.load_data()
+
     def load_data(self, reset_page=False):
         if reset_page:
-            self.current_page = 1
+            self.paginador.primeira()
 
         filtro_texto = self.search_input.text().strip()
-        try:
-            base_query = select(Item)
-            
-            # Filtro de Texto
-            if filtro_texto:
-                base_query = base_query.where(
-                    (Item.nome.ilike(f'%{filtro_texto}%')) |
-                    (Item.codigo_item.ilike(f'%{filtro_texto}%'))
-                )
-            
-            # Filtros Avançados (Se existirem no dicionário)
-            if self.current_filters.get('ativo') is not None:
-                base_query = base_query.where(Item.ativo == self.current_filters.get('ativo'))
-
-            if self.current_filters.get('preco_min') is not None:
-                base_query = base_query.where(Item.preco_venda >= self.current_filters.get('preco_min'))
-
-            if self.current_filters.get('preco_max') is not None:
-                base_query = base_query.where(Item.preco_venda <= self.current_filters.get('preco_max'))
-
-            # Paginação
-            total_count_query = select(func.count()).select_from(base_query.subquery())
-            self.total_records = self.session.execute(total_count_query).scalar_one()
-            
-            total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-            if total_pages == 0: total_pages = 1
-            if self.current_page > total_pages: self.current_page = total_pages
-
-            offset = (self.current_page - 1) * self.PAGE_SIZE
-            
-            # Ordenação padrão por ID decrescente (mais recentes primeiro)
-            query = base_query.order_by(Item.id.desc()).limit(self.PAGE_SIZE).offset(offset)
-            items = self.session.execute(query).scalars().all()
-
-        except Exception as e:
-            print(f"Erro ao carregar dados: {e}")
-            items = []
-            total_pages = 1
 
+        # Só as colunas da tabela; fornecedor no mesmo SELECT (LEFT JOIN), sem um SELECT por linha
+        base_query = (
+            select(
+                Item.id, Item.codigo_item, Item.nome, Item.preco_venda, Item.custo_unitario,
+                Item.estoque, Item.ativo,
+                func.coalesce(func.nullif(Entidade.nome_fantasia, ""), Entidade.razao_social)
+                .label("fornecedor_nome"),
+            )
+            .outerjoin(Entidade, Entidade.id == Item.fornecedor_id)
+        )
+        
+        # Filtro de Texto (índice FTS5 de nome e código, sem acentos e por prefixo)
+        busca = filtro_textual(Item.id, "itens_fts", filtro_texto) if filtro_texto else None
+        if busca is not None:
+            base_query = base_query.where(busca)
+        
+        # Filtros Avançados (Se existirem no dicionário)
+        if self.current_filters.get('ativo') is not None:
+            base_query = base_query.where(Item.ativo == self.current_filters.get('ativo'))
+
+        if self.current_filters.get('preco_min') is not None:
+            base_query = base_query.where(Item.preco_venda >= self.current_filters.get('preco_min'))
+
+        if self.current_filters.get('preco_max') is not None:
+            base_query = base_query.where(Item.preco_venda <= self.current_filters.get('preco_max'))
+
+        # Paginação por chave, ordenação padrão por ID decrescente (mais recentes primeiro)
+        self.paginador.definir_consulta(base_query, Item.id, Item.id, descendente=True)
+
+        # Página + total lidos em segundo plano
+        self.exibir_carregando()
+        self.executor_consultas.executar(
+            self.paginador.preparar(),
+            lambda resultado: self.exibir_pagina(resultado, filtro_texto)
+        )
+
+    def exibir_carregando(self):
+        # Navegação travada até a página chegar: o paginador só avança a partir dela
+        self.prev_btn.setEnabled(False)
+        self.next_btn.setEnabled(False)
+        self.page_info_label.setText("Carregando...")
+
+    def exibir_pagina(self, resultado, filtro_texto):
+        items = self.paginador.receber(resultado)
+        self.total_records, _ = self.paginador.total()
+
+        self.itens_carregados = items
+        self.preencher_tabela(items)
+
+        # Com uma única página, a tela tem todas as linhas do termo: dá para refinar em memória
+        self.controlador_busca.marcar_resultado(
+            filtro_texto, self.paginador.pagina == 1 and not self.paginador.tem_proxima
+        )
+
+    def erro_carregamento(self, mensagem):
+        QMessageBox.critical(self, "Erro", f"Erro ao carregar dados: {mensagem}")
+        self.prev_btn.setEnabled(self.paginador.pagina > 1)
+        self.next_btn.setEnabled(self.paginador.tem_proxima)
+        self.page_info_label.setText("Erro ao carregar")
+
+    def refinar_busca(self, termo):
+        items = [i for i in self.itens_carregados if corresponde(termo, [i.nome, i.codigo_item])]
+        self.itens_carregados = items
+        self.total_records = len(items)
+        self.preencher_tabela(items)
+
+    def preencher_tabela(self, items):
         # Preencher Tabela
         headers = ["Id", "Código", "Nome do Produto", "Preço Venda (R$)", "Custo (R$)", "Estoque", "Fornecedor", "Ativo"]
         model = QStandardItemModel(len(items), len(headers))
@@ -180,10 +236,7 @@ class CadastroProdutosWidget(QWidget):
             model.setItem(row, 5, QStandardItem(str(estoque)))
             
             # Nome do Fornecedor (Proteção contra None)
-            nome_fornecedor = "-"
-            if item.fornecedor:
-                nome_fornecedor = item.fornecedor.nome_fantasia or item.fornecedor.razao_social
-            model.setItem(row, 6, QStandardItem(nome_fornecedor))
+            model.setItem(row, 6, QStandardItem(item.fornecedor_nome or "-"))
             
             status_item = QStandardItem("✅ Sim" if item.ativo else "❌ Não")
             status_item.setForeground(QColor("green") if item.ativo else QColor("red"))
@@ -193,18 +246,17 @@ class CadastroProdutosWidget(QWidget):
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table_view.hideColumn(4) # Ocultar custo se desejar
         
-        self.prev_btn.setEnabled(self.current_page > 1)
-        self.next_btn.setEnabled(self.current_page < total_pages)
-        self.page_info_label.setText(f"Página {self.current_page} de {total_pages}")
+        self.prev_btn.setEnabled(self.paginador.pagina > 1)
+        self.next_btn.setEnabled(self.paginador.tem_proxima)
+        self.page_info_label.setText(self.paginador.descricao_paginas())
 
     def go_to_previous_page(self):
-        if self.current_page > 1:
-            self.current_page -= 1
+        if self.paginador.anterior():
             self.load_data()
 
     def go_to_next_page(self):
-        self.current_page += 1
-        self.load_data()
+        if self.paginador.proxima():
+            self.load_data()
 
     def get_selected_item(self):
         indexes = self.table_view.selectionModel().selectedRows()
@@ -232,6 +284,7 @@ class CadastroProdutosWidget(QWidget):
                 # self.session.delete(item) # Física
                 item.ativo = False # Lógica
                 self.session.commit()
+                self.paginador.invalidar_contagem()
                 self.load_data(reset_page=True)
                 QMessageBox.information(self, "Sucesso", "Produto desativado/excluído!")
             except Exception as e:
@@ -244,6 +297,7 @@ class CadastroProdutosWidget(QWidget):
         try:
             dialog = CadastroProdutosDialog(self.session, parent=self)
             if dialog.exec() == QDialog.DialogCode.Accepted:
+                self.paginador.invalidar_contagem()
                 self.load_data(reset_page=True)
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao abrir cadastro: {e}")
@@ -254,6 +308,7 @@ class CadastroProdutosWidget(QWidget):
             try:
                 dialog = CadastroProdutosDialog(self.session, item=item, parent=self)
                 if dialog.exec() == QDialog.DialogCode.Accepted:
+                    self.paginador.invalidar_contagem()
                     self.load_data()
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Erro ao abrir edição: {e}")
@@ -273,4 +328,28 @@ class CadastroProdutosWidget(QWidget):
                     self.filter_btn.setStyleSheet("background-color: #E0E0E0; color: #424242; font-weight: bold; border-radius: 5px;")
                     self.filter_btn.setText("⚙️ Filtro Avançado")
         except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro no filtro: {e}")
\ No newline at end of file
+            QMessageBox.critical(self, "Erro", f"Erro no filtro: {e}")
+
+    # --- IMPORTAÇÃO CSV ---
+    def importar_csv(self):
+        if self.importador.ocupado():
+            return
+        caminho, _ = QFileDialog.getOpenFileName(
+            self, "Importar produtos", "", "Arquivos CSV (*.csv *.txt);;Todos os arquivos (*)"
+        )
+        if not caminho:
+            return
+        self.import_btn.setEnabled(False)
+        self.importador.importar(importar_produtos, caminho)
+
+    def _importacao_concluida(self, resultado):
+        self.import_btn.setEnabled(True)
+        self.import_btn.setText("📥 Importar CSV")
+        QMessageBox.information(self, "Importação de Produtos", texto_resultado(resultado))
+        self.atualizar()
+
+    def _importacao_falhou(self, mensagem):
+        self.import_btn.setEnabled(True)
+        self.import_btn.setText("📥 Importar CSV")
+        QMessageBox.critical(self, "Importação de Produtos", f"Erro ao importar: {mensagem}")
+        self.atualizar()
\ No newline at end of file
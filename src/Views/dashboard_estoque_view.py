@@ -1,22 +1,33 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QHBoxLayout, QGroupBox,
     QTableView, QLineEdit, QPushButton, QComboBox, QDialog,
-    QDateEdit, QFormLayout
+    QDateEdit, QFormLayout, QMessageBox
 )
-from PyQt6.QtGui import QStandardItemModel, QStandardItem
-from PyQt6.QtCore import Qt, QSortFilterProxyModel, QDate
-from sqlalchemy import select, func
-from sqlalchemy.exc import SQLAlchemyError
-from datetime import date, timedelta, datetime
-import traceback
+from PyQt6.QtCore import Qt, QSortFilterProxyModel, QDate, QTimer
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import aliased
+from datetime import date, timedelta
 
-from src.Models.models import Item, MovimentoEstoque
+from src.Models.models import Item, MovimentoEstoque, Entidade
+from src.Utils.modelo_tabela_sql import ModeloTabelaSQL, ColunaTabela, LINHA_ROLE
+from src.Utils.executor_consultas import ExecutorConsultas
+from src.Utils.indicadores import movimentos_desde
+
+# Texto do combo -> valor gravado em MovimentoEstoque.tipo_movimento
+TIPOS_MOVIMENTO = {"Entrada": "entrada", "Saída": "saida", "Ajuste": "ajuste"}
+NOMES_TIPOS_MOVIMENTO = {valor: texto for texto, valor in TIPOS_MOVIMENTO.items()}
 
 
 # ===============================================================
 # PROXY MODEL (FILTROS)
 # ===============================================================
 class MovimentoFilterProxy(QSortFilterProxyModel):
+    """
+    Guarda o estado dos filtros. O filtro de verdade roda no banco
+    (aplicar_em); filterAcceptsRow só confere os valores tipados da linha
+    (date e código do tipo), sem formatar nem converter texto.
+    """
+
     def __init__(self):
         super().__init__()
         self.texto = ""
@@ -24,24 +35,33 @@ class MovimentoFilterProxy(QSortFilterProxyModel):
         self.data_inicio = None
         self.data_fim = None
 
-    def filterAcceptsRow(self, row, parent):
-        model = self.sourceModel()
-
-        item = model.index(row, 1, parent).data() or ""
-        tipo = model.index(row, 2, parent).data() or ""
-        data_str = model.index(row, 5, parent).data() or ""
-        obs = model.index(row, 6, parent).data() or ""
-
-        texto_ok = self.texto in f"{item} {obs}".lower()
-        tipo_ok = self.tipo == "Todos" or tipo == self.tipo
-
-        try:
-            data_mov = datetime.strptime(data_str, "%d/%m/%Y").date()
-            data_ok = self.data_inicio <= data_mov <= self.data_fim
-        except Exception:
-            data_ok = True
+    def aplicar_em(self, stmt):
+        if self.texto:
+            termo = f"%{self.texto}%"
+            stmt = stmt.where(or_(Item.nome.ilike(termo), MovimentoEstoque.observacao.ilike(termo)))
+        if self.tipo in TIPOS_MOVIMENTO:
+            stmt = stmt.where(MovimentoEstoque.tipo_movimento == TIPOS_MOVIMENTO[self.tipo])
+        if self.data_inicio:
+            stmt = stmt.where(MovimentoEstoque.data_ultima_mov >= self.data_inicio)
+        if self.data_fim:
+            stmt = stmt.where(MovimentoEstoque.data_ultima_mov <= self.data_fim)
+        return stmt
 
-        return texto_ok and tipo_ok and data_ok
+    def filterAcceptsRow(self, row, parent):
+        mov = self.sourceModel().index(row, 0, parent).data(LINHA_ROLE)
+        if mov is None:
+            return True
+
+        if self.texto:
+            if self.texto not in f"{mov.item_nome or ''} {mov.observacao or ''}".lower():
+                return False
+        if self.tipo in TIPOS_MOVIMENTO and mov.tipo_movimento != TIPOS_MOVIMENTO[self.tipo]:
+            return False
+        if self.data_inicio and mov.data_ultima_mov < self.data_inicio:
+            return False
+        if self.data_fim and mov.data_ultima_mov > self.data_fim:
+            return False
+        return True
 
 
 # ===============================================================
@@ -58,7 +78,7 @@ class FiltroMovimentosDialog(QDialog):
         form = QFormLayout()
 
         self.combo_tipo = QComboBox()
-        self.combo_tipo.addItems(["Todos", "Entrada", "Saída"])
+        self.combo_tipo.addItems(["Todos", *TIPOS_MOVIMENTO])
 
         self.data_inicio = QDateEdit()
         self.data_inicio.setCalendarPopup(True)
@@ -90,6 +110,8 @@ class DashboardEstoqueWidget(QWidget):
     def __init__(self, session):
         super().__init__()
         self.session = session
+        self.executor_consultas = ExecutorConsultas(self, bind=session.get_bind())
+        self.executor_consultas.erro.connect(self._erro_indicadores)
 
         self.main_layout = QVBoxLayout(self)
 
@@ -143,12 +165,23 @@ class DashboardEstoqueWidget(QWidget):
         box_layout.addWidget(self.table)
         self.main_layout.addWidget(box)
 
+        # Duplo clique abre o kardex do item da movimentação
+        self.table.doubleClicked.connect(self.abrir_kardex)
+
         # ===========================================================
         # FILTRO
         # ===========================================================
         self.proxy_model = MovimentoFilterProxy()
+        self.proxy_model.data_inicio = date.today() - timedelta(days=365)
+        self.proxy_model.data_fim = date.today()
         self.filtro_dialog = FiltroMovimentosDialog(self)
 
+        # Busca por texto vai ao banco: espera o usuário parar de digitar
+        self.timer_busca = QTimer(self)
+        self.timer_busca.setSingleShot(True)
+        self.timer_busca.setInterval(300)
+        self.timer_busca.timeout.connect(self.carregar_movimentos)
+
         self.search_input.textChanged.connect(self._filtrar_texto)
         self.btn_filtro.clicked.connect(self.filtro_dialog.show)
         self.filtro_dialog.btn_aplicar.clicked.connect(self._aplicar_filtro)
@@ -182,78 +215,115 @@ class DashboardEstoqueWidget(QWidget):
 
     # ===============================================================
     def load_data(self):
-        hoje = date.today()
-        data_30 = hoje - timedelta(days=30)
-
-        try:
-            total_itens = self.session.execute(
-                select(func.count()).select_from(Item)
-            ).scalar() or 0
-
-            mov_30 = self.session.execute(
-                select(func.count())
-                .select_from(MovimentoEstoque)
-                .where(MovimentoEstoque.data_ultima_mov >= data_30)
-            ).scalar() or 0
-
-            abaixo = self.session.execute(
-                select(func.count())
-                .select_from(Item)
-                .where(Item.estoque < Item.estoque_minimo)
-            ).scalar() or 0
-
-            movimentos = self.session.execute(
-                select(MovimentoEstoque)
-                .order_by(MovimentoEstoque.data_ultima_mov.desc())
-            ).scalars().all()
-
-        except SQLAlchemyError:
-            traceback.print_exc()
-            return
+        # KPIs agregam tabelas inteiras: calculados em segundo plano
+        for lbl in (self.lbl_total, self.lbl_mov_30, self.lbl_abaixo):
+            lbl.setText("...")
+        self.executor_consultas.executar(self._consultar_indicadores, self._exibir_indicadores)
+
+        self.carregar_movimentos()
+
+    def consulta_movimentos(self):
+        # Só as colunas exibidas; Item entra no JOIN também para o filtro por nome
+        fornecedor = aliased(Entidade)
+        stmt = (
+            select(
+                MovimentoEstoque.id, MovimentoEstoque.item_id, Item.nome.label("item_nome"),
+                MovimentoEstoque.tipo_movimento, MovimentoEstoque.quantidade,
+                func.coalesce(fornecedor.nome_fantasia, fornecedor.razao_social).label("fornecedor_nome"),
+                MovimentoEstoque.data_ultima_mov, MovimentoEstoque.observacao,
+            )
+            .outerjoin(MovimentoEstoque.item)
+            .outerjoin(fornecedor, MovimentoEstoque.fornecedor_id == fornecedor.id)
+        )
+        return self.proxy_model.aplicar_em(stmt)
+
+    def carregar_movimentos(self):
+        model = ModeloTabelaSQL(
+            self.session,
+            self.consulta_movimentos(),
+            self._colunas_tabela(),
+            chave=[MovimentoEstoque.data_ultima_mov, MovimentoEstoque.id],
+            assincrono=True
+        )
+        model.erro.connect(self._erro_tabela)
+
+        # Tabela (páginas lidas em segundo plano, sob demanda, pelo modelo)
+        antigo = self.proxy_model.sourceModel()
+        self.proxy_model.setSourceModel(model)
+        self.table.setModel(self.proxy_model)
+        if isinstance(antigo, ModeloTabelaSQL):
+            antigo.fechar()
+
+    @staticmethod
+    def _consultar_indicadores(session):
+        data_30 = date.today() - timedelta(days=30)
+
+        total_itens = session.execute(
+            select(func.count()).select_from(Item)
+        ).scalar() or 0
+
+        mov_30 = movimentos_desde(session, data_30)
+
+        abaixo = session.execute(
+            select(func.count())
+            .select_from(Item)
+            .where(Item.estoque < Item.estoque_minimo)
+        ).scalar() or 0
+
+        return total_itens, mov_30, abaixo
 
-        # KPIs
+    def _exibir_indicadores(self, indicadores):
+        total_itens, mov_30, abaixo = indicadores
         self.lbl_total.setText(str(total_itens))
         self.lbl_mov_30.setText(str(mov_30))
         self.lbl_abaixo.setText(str(abaixo))
 
-        # Tabela
-        headers = ["ID", "Item", "Tipo", "Quantidade", "Fornecedor", "Data", "Obs"]
-        model = QStandardItemModel(len(movimentos), len(headers))
-        model.setHorizontalHeaderLabels(headers)
-
-        for row, m in enumerate(movimentos):
-            dados = [
-                str(m.id),
-                getattr(m.item, "nome", ""),
-                "Entrada" if m.tipo_movimento == "entrada" else "Saída",
-                str(m.quantidade),
-                getattr(m.fornecedor, "nome", ""),
-                m.data_ultima_mov.strftime("%d/%m/%Y") if m.data_ultima_mov else "",
-                m.observacao or ""
-            ]
-            for col, v in enumerate(dados):
-                model.setItem(row, col, QStandardItem(v))
-
-        self.proxy_model.setSourceModel(model)
-        self.table.setModel(self.proxy_model)
-
-        self.proxy_model.data_inicio = hoje - timedelta(days=365)
-        self.proxy_model.data_fim = hoje
+    def _erro_indicadores(self, mensagem):
+        print(f"Erro ao carregar indicadores de estoque: {mensagem}")
+        for lbl in (self.lbl_total, self.lbl_mov_30, self.lbl_abaixo):
+            lbl.setText("ERRO")
+
+    def _erro_tabela(self, mensagem):
+        QMessageBox.critical(self, "Erro", f"Erro ao carregar movimentações: {mensagem}")
+
+    def _colunas_tabela(self):
+        return [
+            ColunaTabela("ID", lambda m: m.id),
+            ColunaTabela("Item", lambda m: m.item_nome or ""),
+            ColunaTabela("Tipo", lambda m: NOMES_TIPOS_MOVIMENTO.get(m.tipo_movimento, m.tipo_movimento)),
+            ColunaTabela("Quantidade", lambda m: m.quantidade),
+            ColunaTabela("Fornecedor", lambda m: m.fornecedor_nome or ""),
+            ColunaTabela("Data", lambda m: m.data_ultima_mov.strftime("%d/%m/%Y") if m.data_ultima_mov else ""),
+            ColunaTabela("Obs", lambda m: m.observacao),
+        ]
+
+    def abrir_kardex(self, index):
+        # Import local: kardex_view usa os nomes de tipo definidos neste módulo
+        from src.Views.kardex_view import KardexDialog
+
+        mov = index.data(LINHA_ROLE)
+        if mov is None or mov.item_id is None:
+            return
+        KardexDialog(self.session, mov.item_id, self).exec()
 
     # ===============================================================
     def _filtrar_texto(self, texto):
-        self.proxy_model.texto = texto.lower()
-        self.proxy_model.invalidateFilter()
+        self.proxy_model.texto = texto.strip().lower()
+        self.timer_busca.start()
 
     def _aplicar_filtro(self):
         self.proxy_model.tipo = self.filtro_dialog.combo_tipo.currentText()
         self.proxy_model.data_inicio = self.filtro_dialog.data_inicio.date().toPyDate()
         self.proxy_model.data_fim = self.filtro_dialog.data_fim.date().toPyDate()
-        self.proxy_model.invalidateFilter()
+        self.carregar_movimentos()
         self.filtro_dialog.close()
 
     def _limpar_filtros(self):
+        self.search_input.blockSignals(True)
         self.search_input.clear()
+        self.search_input.blockSignals(False)
         self.filtro_dialog.combo_tipo.setCurrentIndex(0)
         self.proxy_model.texto = ""
-        self.proxy_model.invalidateFilter()
+        self.proxy_model.tipo = "Todos"
+        self.timer_busca.stop()
+        self.carregar_movimentos()
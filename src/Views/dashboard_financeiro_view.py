@@ -1,17 +1,19 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QHBoxLayout, QGroupBox,
     QTableView, QLineEdit, QPushButton, QComboBox, QDialog,
-    QDateEdit, QFormLayout
+    QDateEdit, QFormLayout, QMessageBox
 )
 from PyQt6.QtGui import QStandardItemModel, QStandardItem, QColor
 from PyQt6.QtCore import Qt, QSortFilterProxyModel, QDate, QLocale
 from sqlalchemy import select, func
-from sqlalchemy.exc import SQLAlchemyError
 from datetime import date, datetime, timedelta
 import traceback 
 from decimal import Decimal
 
 from src.Models.models import Financeiro, EnumStatus
+from src.Utils.modelo_tabela_sql import ModeloTabelaSQL, ColunaTabela
+from src.Utils.executor_consultas import ExecutorConsultas
+from src.Utils.indicadores import indicadores_financeiro
 
 
 # ===============================================================
@@ -91,6 +93,8 @@ class DashboardFinanceiroWidget(QWidget):
     def __init__(self, session):
         super().__init__()
         self.session = session
+        self.executor_consultas = ExecutorConsultas(self, bind=session.get_bind())
+        self.executor_consultas.erro.connect(self.erro_indicadores)
 
         self.main_layout = QVBoxLayout(self)
 
@@ -185,47 +189,60 @@ class DashboardFinanceiroWidget(QWidget):
     # ===================================================================
     def load_data(self):
         locale = QLocale(QLocale.Language.Portuguese, QLocale.Country.Brazil)
-        try:
-            total_receber = self.session.execute(
-                select(func.sum(Financeiro.valor_nota)).where(
-                    Financeiro.tipo_lancamento == "R",
-                    Financeiro.status == EnumStatus.ABERTA
-                )
-            ).scalar() or Decimal("0")
-
-            total_pagar = self.session.execute(
-                select(func.sum(Financeiro.valor_nota)).where(
-                    Financeiro.tipo_lancamento == "P",
-                    Financeiro.status == EnumStatus.ABERTA
-                )
-            ).scalar() or Decimal("0")
-
-            hoje = date.today()
-            atrasados = self.session.execute(
-                select(func.count()).where(
-                    Financeiro.status == EnumStatus.ABERTA,
-                    Financeiro.vencimento < hoje
-                )
-            ).scalar() or 0
-
-            saldo = total_receber - total_pagar
-            
-        except SQLAlchemyError as e:
-            print(f"Erro ao acessar o banco de dados: {e}")
-            traceback.print_exc()
-            total_receber = total_pagar = saldo = 0.0
-            atrasados = 0
-            
-            self.lbl_receber.setText("ERRO")
-            self.lbl_pagar.setText("ERRO")
-            self.lbl_saldo.setText("ERRO")
-            self.lbl_atrasados.setText("ERRO")
-            self.table_view.setModel(QStandardItemModel(0, 0))
-            return 
+
+        # KPIs calculados em segundo plano; "..." enquanto carregam
+        for lbl in (self.lbl_receber, self.lbl_pagar, self.lbl_saldo, self.lbl_atrasados):
+            lbl.setText("...")
+        self.executor_consultas.executar(self.consultar_indicadores, self.exibir_indicadores)
 
         # -------------------------------------------------
-        # Preencher KPIs e aplicar Estilo Dinâmico
+        # Monta modelo da tabela
         # -------------------------------------------------
+        # Linhas lidas em segundo plano, sob demanda (lotes por vencimento), e formatadas em data()
+        model = ModeloTabelaSQL(
+            self.session,
+            select(
+                Financeiro.id, Financeiro.tipo_lancamento, Financeiro.descricao,
+                Financeiro.valor_nota, Financeiro.vencimento, Financeiro.status,
+            )
+            .where(Financeiro.status == EnumStatus.ABERTA),
+            self._colunas_tabela(locale),
+            chave=[Financeiro.vencimento, Financeiro.id],
+            descendente=False,
+            assincrono=True
+        )
+        model.erro.connect(self.erro_tabela)
+
+        # aplica modelo no proxy e view
+        antigo = self.proxy_model.sourceModel()
+        self.proxy_model.setSourceModel(model)
+        self.table_view.setModel(self.proxy_model)
+        if isinstance(antigo, ModeloTabelaSQL):
+            antigo.fechar()
+
+        # configura coluna para ocupar toda largura
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(header.ResizeMode.Stretch)
+
+        # padrão datas
+        self.proxy_model.data_inicio = date.today() - timedelta(days=365)
+        self.proxy_model.data_fim = date.today()
+
+    @staticmethod
+    def consultar_indicadores(session):
+        # Totais em aberto lidos do resumo por status/vencimento
+        return indicadores_financeiro(session, date.today())
+
+    # -------------------------------------------------
+    # Preencher KPIs e aplicar Estilo Dinâmico
+    # -------------------------------------------------
+    def exibir_indicadores(self, indicadores):
+        total_receber = indicadores.total_receber
+        total_pagar = indicadores.total_pagar
+        atrasados = indicadores.atrasados
+        saldo = indicadores.saldo
+        locale = QLocale(QLocale.Language.Portuguese, QLocale.Country.Brazil)
+
         receber_fmt = locale.toString(float(total_receber), 'f', 2)
         pagar_fmt = locale.toString(float(total_pagar), 'f', 2)
         saldo_fmt = locale.toString(float(saldo), 'f', 2)
@@ -242,48 +259,31 @@ class DashboardFinanceiroWidget(QWidget):
         else:
             self.lbl_saldo.setStyleSheet("font-size: 20pt; font-weight: bold; color: #1a73e8;") # Azul Padrão
 
-        # -------------------------------------------------
-        # Monta modelo da tabela
-        # -------------------------------------------------
-        query = self.session.execute(
-            select(Financeiro)
-            .where(Financeiro.status == EnumStatus.ABERTA)
-            .order_by(Financeiro.vencimento.asc())
-            .limit(500)
-        ).scalars().all()
-
-        headers = ["ID", "Tipo", "Descrição", "Valor", "Vencimento", "Status"]
-        model = QStandardItemModel(len(query), len(headers))
-        model.setHorizontalHeaderLabels(headers)
-
-        for row, f in enumerate(query):
-            valor_fmt = locale.toString(float(f.valor_nota), 'f', 2)
-            item_valor = QStandardItem(f"R$ {valor_fmt}")
-            item_vencimento = QStandardItem(f.vencimento.strftime("%d/%m/%Y"))
-            item_status = QStandardItem(f.status.value.capitalize())
-
-            model.setItem(row, 0, QStandardItem(str(f.id)))
-            model.setItem(row, 1, QStandardItem("Pagar" if f.tipo_lancamento == "P" else "Receber"))
-            model.setItem(row, 2, QStandardItem(f.descricao))
-            model.setItem(row, 3, item_valor)
-            model.setItem(row, 4, item_vencimento)
-            model.setItem(row, 5, item_status)
-
-            if f.tipo_lancamento == "P":
-                for col in range(len(headers)):
-                    model.item(row, col).setBackground(QColor("#f0f0f0"))
-
-        # aplica modelo no proxy e view
-        self.proxy_model.setSourceModel(model)
-        self.table_view.setModel(self.proxy_model)
-
-        # configura coluna para ocupar toda largura
-        header = self.table_view.horizontalHeader()
-        header.setSectionResizeMode(header.ResizeMode.Stretch)
-
-        # padrão datas
-        self.proxy_model.data_inicio = date.today() - timedelta(days=365)
-        self.proxy_model.data_fim = date.today()
+    def erro_indicadores(self, mensagem):
+        print(f"Erro ao acessar o banco de dados: {mensagem}")
+        self.lbl_receber.setText("ERRO")
+        self.lbl_pagar.setText("ERRO")
+        self.lbl_saldo.setText("ERRO")
+        self.lbl_atrasados.setText("ERRO")
+
+    def erro_tabela(self, mensagem):
+        QMessageBox.critical(self, "Erro", f"Erro ao carregar lançamentos: {mensagem}")
+
+    def _colunas_tabela(self, locale):
+        # Lançamentos a pagar ficam com fundo cinza
+        cor_fundo = lambda f: QColor("#f0f0f0") if f.tipo_lancamento == "P" else None
+
+        def coluna(titulo, formatar):
+            return ColunaTabela(titulo, formatar, cor_fundo=cor_fundo)
+
+        return [
+            coluna("ID", lambda f: f.id),
+            coluna("Tipo", lambda f: "Pagar" if f.tipo_lancamento == "P" else "Receber"),
+            coluna("Descrição", lambda f: f.descricao),
+            coluna("Valor", lambda f: f"R$ {locale.toString(float(f.valor_nota), 'f', 2)}"),
+            coluna("Vencimento", lambda f: f.vencimento.strftime("%d/%m/%Y")),
+            coluna("Status", lambda f: f.status.value.capitalize()),
+        ]
 
     # ===============================================================
     # FILTROS / integração com dialog
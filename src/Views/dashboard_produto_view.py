@@ -2,14 +2,17 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QFrame, QGridLayout)
 from PyQt6.QtCore import Qt
-from sqlalchemy import select, func, or_
-# CORREÇÃO: Importamos Entidade em vez de Fornecedor
-from src.Models.models import Item, Entidade
+from src.Utils.executor_consultas import ExecutorConsultas
+from src.Utils.indicadores import indicadores_produtos
 
 class DashboardProdutosWidget(QWidget):
     def __init__(self, sessao):
         super().__init__()
         self.sessao = sessao
+        self.executor_consultas = ExecutorConsultas(self, bind=sessao.get_bind())
+        self.executor_consultas.erro.connect(
+            lambda msg: print(f"Erro ao carregar dashboard produtos: {msg}")
+        )
         self.setup_ui()
         self.load_data()
 
@@ -64,25 +67,17 @@ class DashboardProdutosWidget(QWidget):
         return frame
 
     def load_data(self):
-        try:
-            # 1. Total de Produtos Ativos
-            total_prod = self.sessao.query(func.count(Item.id)).where(Item.ativo == True).scalar()
-            self.lbl_total_prod.setText(str(total_prod))
+        # Consulta roda em segundo plano; os cards mostram "..." até o resultado chegar
+        for lbl in (self.lbl_total_prod, self.lbl_valor_est, self.lbl_total_forn):
+            lbl.setText("...")
+        self.executor_consultas.executar(self.consultar_indicadores, self.exibir_indicadores)
 
-            # 2. Valor Total do Estoque (Custo * Quantidade)
-            # Calcula em Python para evitar problemas de tipos no SQL se estiver vazio
-            produtos = self.sessao.execute(select(Item).where(Item.ativo == True)).scalars().all()
-            valor_total = sum((p.estoque or 0) * (p.custo_unitario or 0) for p in produtos)
-            self.lbl_valor_est.setText(f"R$ {valor_total:,.2f}".replace('.', '#').replace(',', '.').replace('#', ','))
+    @staticmethod
+    def consultar_indicadores(sessao):
+        # Todos os números dos cards em um único SELECT agregado
+        return indicadores_produtos(sessao)
 
-            # 3. Total de Fornecedores (CORREÇÃO: Busca na tabela Entidade)
-            total_forn = self.sessao.query(func.count(Entidade.id)).where(
-                or_(
-                    Entidade.tipo_entidade.ilike('%FORNECEDOR%'),
-                    Entidade.tipo_entidade.ilike('%AMBOS%')
-                )
-            ).scalar()
-            self.lbl_total_forn.setText(str(total_forn))
-
-        except Exception as e:
-            print(f"Erro ao carregar dashboard produtos: {e}")
\ No newline at end of file
+    def exibir_indicadores(self, indicadores):
+        self.lbl_total_prod.setText(str(indicadores.total_produtos))
+        self.lbl_valor_est.setText(f"R$ {indicadores.valor_estoque:,.2f}".replace('.', '#').replace(',', '.').replace('#', ','))
+        self.lbl_total_forn.setText(str(indicadores.total_fornecedores))
\ No newline at end of file
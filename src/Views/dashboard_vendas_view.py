@@ -6,12 +6,12 @@ from PyQt6.QtCore import QDate, Qt
 from sqlalchemy import select, func
 
 from src.Models.models import (
-    PedidoVenda,
-    PedidoVendaItem,
     Entidade,
-    Item,
-    TipoEntidadeEnum
+    Usuario,
+    ResumoVendasDia
 )
+from src.Utils.indicadores import indicadores_vendas
+from src.Utils.executor_consultas import ExecutorConsultas
 
 
 class DashboardVendasWidget(QWidget):
@@ -19,10 +19,16 @@ class DashboardVendasWidget(QWidget):
         super().__init__()
         self.sessao = sessao
         self.rotulos_kpi = {}
+
+        # KPIs e listas dos filtros lidos em segundo plano (um executor para
+        # cada: um pedido novo de KPIs não descarta o dos filtros)
+        self.executor_consultas = ExecutorConsultas(self, bind=sessao.get_bind())
+        self.executor_consultas.erro.connect(self.erro_indicadores)
+        self.executor_filtros = ExecutorConsultas(self, bind=sessao.get_bind())
+        self.executor_filtros.erro.connect(self.erro_filtros)
         
         self.setup_ui()
-        self.carregar_vendedores()
-        self.carregar_clientes()
+        self.carregar_filtros()
         self.carregar_dados()
 
     def setup_ui(self):
@@ -147,45 +153,42 @@ class DashboardVendasWidget(QWidget):
         cartao4, self.rotulos_kpi['clientes_ativos'] = self.criar_cartao_kpi("Clientes Ativos", "0", "#fd7e14")
         self.layout_kpi.addWidget(cartao4, 1, 0)
 
-    def carregar_vendedores(self):
-        try:
-            self.combo_vendedor.clear()
-            self.combo_vendedor.addItem("Todos os Vendedores", None)
-
-            vendedores = self.sessao.execute(
-                select(Entidade).where(
-                    Entidade.tipo_entidade == TipoEntidadeEnum.VENDEDOR,
-                    Entidade.ativo == True
-            )
-            ).scalars().all()
-
-            for vendedor in vendedores:
-                nome = self.obter_nome_entidade(vendedor)
-                self.combo_vendedor.addItem(nome, vendedor.id)
-
-        except Exception as e:
-            print(f"Erro ao carregar vendedores: {e}")
-
-
-    def carregar_clientes(self):
-        try:
-            self.combo_cliente.clear()
-            self.combo_cliente.addItem("Todos os Clientes", None)
-
-            clientes = self.sessao.execute(
-                select(Entidade).where(
-                    Entidade.tipo_entidade == TipoEntidadeEnum.CLIENTE,
-                    Entidade.ativo == True
-                )
-            ).scalars().all()
-
-            for cliente in clientes:
-                nome = self.obter_nome_entidade(cliente)
-                self.combo_cliente.addItem(nome, cliente.id)
+    def carregar_filtros(self):
+        """Vendedores e clientes dos combos"""
+        self.executor_filtros.executar(self.consultar_filtros, self.exibir_filtros)
+
+    @staticmethod
+    def consultar_filtros(sessao):
+        # O vendedor do pedido é o usuário que o lançou (PedidoVenda.vendedor_id)
+        vendedores = sessao.execute(
+            select(Usuario.id, Usuario.nome).order_by(Usuario.nome)
+        ).all()
+
+        # Só clientes com vendas nos resumos: a lista não cresce com o cadastro inteiro
+        com_vendas = select(ResumoVendasDia.cliente_id).where(ResumoVendasDia.cliente_id != 0).distinct()
+        clientes = sessao.execute(
+            select(Entidade.id, Entidade.nome_fantasia, Entidade.razao_social)
+            .where(Entidade.id.in_(com_vendas))
+            .order_by(Entidade.razao_social)
+        ).all()
+        return vendedores, clientes
+
+    def exibir_filtros(self, filtros):
+        vendedores, clientes = filtros
+
+        self.combo_vendedor.clear()
+        self.combo_vendedor.addItem("Todos os Vendedores", None)
+        for vendedor_id, nome in vendedores:
+            self.combo_vendedor.addItem(nome, vendedor_id)
 
-        except Exception as e:
-            print(f"Erro ao carregar clientes: {e}")
+        self.combo_cliente.clear()
+        self.combo_cliente.addItem("Todos os Clientes", None)
+        for cliente in clientes:
+            nome = self.obter_nome_entidade(cliente)
+            self.combo_cliente.addItem(nome, cliente.id)
 
+    def erro_filtros(self, mensagem):
+        QMessageBox.warning(self, "Aviso", f"Erro ao carregar vendedores e clientes: {mensagem}")
 
     def obter_nome_entidade(self, entidade):
         """Obtém o nome apropriado para uma entidade"""
@@ -203,54 +206,39 @@ class DashboardVendasWidget(QWidget):
 
     def carregar_dados(self):
         """Carrega e exibe os dados do dashboard"""
-        try:
-            data_inicio = self.data_inicio.date().toPyDate()
-            data_fim = self.data_fim.date().toPyDate()
-            
-            if data_inicio > data_fim:
-                QMessageBox.warning(self, "Aviso", "Data inicial não pode ser maior que data final")
-                return
-
-            # Consulta principal para vendas
-            query = (
-                select(
-                    func.count(PedidoVenda.id.distinct()).label("quantidade_pedidos"),
-                    func.coalesce(func.sum(PedidoVendaItem.preco_total), 0).label("total_vendas")
-                )
-                .select_from(PedidoVenda)
-                .join(PedidoVendaItem, PedidoVendaItem.pedido_id == PedidoVenda.id)
-                .where(PedidoVenda.data_emissao >= data_inicio)
-                .where(PedidoVenda.data_emissao <= data_fim)
-            )
-
-            # Aplicar filtros
-            vendedor_id = self.combo_vendedor.currentData()
-            if vendedor_id:
-                query = query.where(PedidoVenda.vendedor_id == vendedor_id)
-
-            cliente_id = self.combo_cliente.currentData()
-            if cliente_id:
-                query = query.where(PedidoVenda.cliente_id == cliente_id)
-
-            resultado = self.sessao.execute(query).one()
-            
-            quantidade_pedidos = int(getattr(resultado, "quantidade_pedidos", 0) or 0)
-            total_vendas = float(getattr(resultado, "total_vendas", 0) or 0.0)
-            ticket_medio = total_vendas / quantidade_pedidos if quantidade_pedidos > 0 else 0.0
-
-            # Clientes ativos
-            clientes_ativos = self.sessao.execute(
-                select(func.count(PedidoVenda.cliente_id.distinct()))
-                .where(PedidoVenda.data_emissao >= data_inicio)
-                .where(PedidoVenda.data_emissao <= data_fim)
-            ).scalar_one() or 0
-
-            # Atualizar interface
-            self.rotulos_kpi['total_vendas'].setText(f"R$ {total_vendas:,.2f}".replace('.', '#').replace(',', '.').replace('#', ','))
-            self.rotulos_kpi['total_pedidos'].setText(f"{quantidade_pedidos}")
-            self.rotulos_kpi['ticket_medio'].setText(f"R$ {ticket_medio:,.2f}".replace('.', '#').replace(',', '.').replace('#', ','))
-            self.rotulos_kpi['clientes_ativos'].setText(f"{clientes_ativos}")
-            
-        except Exception as e:
-            print(f"Erro ao carregar dados: {e}")
-            QMessageBox.critical(self, "Erro", f"Ocorreu um erro ao carregar dados: {e}")
\ No newline at end of file
+        data_inicio = self.data_inicio.date().toPyDate()
+        data_fim = self.data_fim.date().toPyDate()
+        
+        if data_inicio > data_fim:
+            QMessageBox.warning(self, "Aviso", "Data inicial não pode ser maior que data final")
+            return
+
+        vendedor_id = self.combo_vendedor.currentData()
+        cliente_id = self.combo_cliente.currentData()
+
+        # Lido dos resumos diários: custo proporcional ao número de dias, não de pedidos
+        for rotulo in self.rotulos_kpi.values():
+            rotulo.setText("...")
+        self.executor_consultas.executar(
+            lambda sessao: indicadores_vendas(
+                sessao, data_inicio, data_fim, vendedor_id=vendedor_id, cliente_id=cliente_id
+            ),
+            self.exibir_indicadores
+        )
+
+    def exibir_indicadores(self, indicadores):
+        total_vendas = indicadores.total_vendas
+        quantidade_pedidos = indicadores.total_pedidos
+        ticket_medio = indicadores.ticket_medio
+        clientes_ativos = indicadores.clientes_ativos
+
+        # Atualizar interface
+        self.rotulos_kpi['total_vendas'].setText(f"R$ {total_vendas:,.2f}".replace('.', '#').replace(',', '.').replace('#', ','))
+        self.rotulos_kpi['total_pedidos'].setText(f"{quantidade_pedidos}")
+        self.rotulos_kpi['ticket_medio'].setText(f"R$ {ticket_medio:,.2f}".replace('.', '#').replace(',', '.').replace('#', ','))
+        self.rotulos_kpi['clientes_ativos'].setText(f"{clientes_ativos}")
+
+    def erro_indicadores(self, mensagem):
+        for rotulo in self.rotulos_kpi.values():
+            rotulo.setText("ERRO")
+        QMessageBox.critical(self, "Erro", f"Ocorreu um erro ao carregar dados: {mensagem}")
@@ -7,17 +7,21 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import QDate, Qt
 from PyQt6.QtGui import QStandardItemModel, QStandardItem
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, case, String
 from datetime import datetime, timedelta
 
 from src.Models.models import PedidoVenda, PedidoVendaItem, Entidade
 from src.Components.Comercial.filtros_vendas_dialog import FiltroVendasDialog
+from src.Utils.modelo_tabela_sql import ModeloTabelaSQL, ColunaTabela
+from src.Utils.executor_consultas import ExecutorConsultas
 
 class HistoricoVendasWidget(QWidget):
     def __init__(self, sessao):
         super().__init__()
         self.sessao = sessao
         self.filtros_atuais = {}
+        self.executor_consultas = ExecutorConsultas(self, bind=sessao.get_bind())
+        self.executor_consultas.erro.connect(self.erro_estatisticas)
         
         self.setup_ui()
         self.carregar_dados()
@@ -253,24 +257,41 @@ class HistoricoVendasWidget(QWidget):
 
     def carregar_dados(self):
         try:
-            # Query base
-            query = select(PedidoVenda).order_by(PedidoVenda.data_emissao.desc())
+            # Query base: cada venda já vem com o resumo dos seus itens
+            resumo = self.consulta_resumo_itens()
+            query = (
+                select(
+                    PedidoVenda.id, PedidoVenda.data_emissao, PedidoVenda.cliente_id,
+                    PedidoVenda.preco_total, PedidoVenda.status,
+                    resumo.c.produtos, resumo.c.quantidade_total,
+                )
+                .outerjoin(resumo, resumo.c.pedido_id == PedidoVenda.id)
+            )
             
             # Aplicar filtros
             query = self.aplicar_filtros(query)
             
-            # Executar query
-            vendas = self.sessao.execute(query).scalars().all()
-            
-            # Atualizar estatísticas
-            self.atualizar_estatisticas(vendas)
+            # Atualizar estatísticas (agregadas no banco, em segundo plano)
+            self.atualizar_estatisticas(self.aplicar_filtros(select(PedidoVenda)))
             
-            # Preencher tabela
-            self.preencher_tabela(vendas)
+            # Preencher tabela (lotes lidos em segundo plano, sob demanda, pelo modelo)
+            self.preencher_tabela(query)
             
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar dados: {str(e)}")
 
+    def consulta_resumo_itens(self):
+        """Subquery com nomes dos produtos e quantidade total agrupados por pedido"""
+        return (
+            select(
+                PedidoVendaItem.pedido_id.label("pedido_id"),
+                func.group_concat(PedidoVendaItem.produto, ", ").label("produtos"),
+                func.coalesce(func.sum(PedidoVendaItem.quantidade), 0).label("quantidade_total"),
+            )
+            .group_by(PedidoVendaItem.pedido_id)
+            .subquery()
+        )
+
     def aplicar_filtros(self, query):
         busca = self.busca_input.text().strip()
         if busca:
@@ -304,45 +325,71 @@ class HistoricoVendasWidget(QWidget):
 
         return query
 
-    def atualizar_estatisticas(self, vendas):
-        total_vendas = len(vendas)
-        valor_total = sum(float(venda.preco_total or 0) for venda in vendas)
-        
+    def atualizar_estatisticas(self, query):
         hoje = datetime.now().date()
-        vendas_hoje = sum(1 for venda in vendas 
-                         if venda.data_emissao and venda.data_emissao == hoje)
+        vendas = query.subquery()
+        consulta = select(
+            func.count(),
+            func.coalesce(func.sum(vendas.c.preco_total), 0),
+            func.coalesce(func.sum(case((vendas.c.data_emissao == hoje, 1), else_=0)), 0),
+        ).select_from(vendas)
+
+        self.lbl_total_vendas.setText("Total de Vendas: ...")
+        self.lbl_valor_total.setText("Valor Total: ...")
+        self.lbl_vendas_hoje.setText("Vendas Hoje: ...")
+        self.executor_consultas.executar(
+            lambda sessao: tuple(sessao.execute(consulta).one()), self.exibir_estatisticas
+        )
+
+    def exibir_estatisticas(self, estatisticas):
+        total_vendas, valor_total, vendas_hoje = estatisticas
+        valor_total = float(valor_total)
         
         self.lbl_total_vendas.setText(f"Total de Vendas: {total_vendas}")
         self.lbl_valor_total.setText(f"Valor Total: R$ {valor_total:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
         self.lbl_vendas_hoje.setText(f"Vendas Hoje: {vendas_hoje}")
 
-    def preencher_tabela(self, vendas):
-        model = QStandardItemModel(len(vendas), 7)
-        model.setHorizontalHeaderLabels([
-            "Nº Pedido", "Data", "Cliente", "Produtos", "Quantidade", "Total (R$)", "Status"
-        ])
-        
-        for row, venda in enumerate(vendas):
-            # Obter itens da venda
-            itens_query = select(PedidoVendaItem).where(PedidoVendaItem.pedido_id == venda.id)
-            itens = self.sessao.execute(itens_query).scalars().all()
-            
-            # Nomes dos produtos
-            produtos = ", ".join([item.produto for item in itens if item.produto])
-            quantidade_total = sum(item.quantidade or 0 for item in itens)
-            
-            model.setItem(row, 0, QStandardItem(str(venda.id)))
-            model.setItem(row, 1, QStandardItem(venda.data_emissao.strftime("%d/%m/%Y") if venda.data_emissao else ""))
-            model.setItem(row, 2, QStandardItem(str(venda.cliente_id or "Cliente Balcão")))
-            model.setItem(row, 3, QStandardItem(produtos[:50] + "..." if len(produtos) > 50 else produtos))
-            model.setItem(row, 4, QStandardItem(str(quantidade_total)))
-            model.setItem(row, 5, QStandardItem(f"{venda.preco_total or 0:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')))
-            model.setItem(row, 6, QStandardItem(self.obter_status_texto(venda.status)))
-        
+    def erro_estatisticas(self, mensagem):
+        for lbl, titulo in ((self.lbl_total_vendas, "Total de Vendas"), (self.lbl_valor_total, "Valor Total"),
+                            (self.lbl_vendas_hoje, "Vendas Hoje")):
+            lbl.setText(f"{titulo}: ERRO")
+        QMessageBox.critical(self, "Erro", f"Erro ao carregar dados: {mensagem}")
+
+    def preencher_tabela(self, query):
+        """Recebe a consulta das colunas da venda com produtos e quantidade_total já agregados"""
+        model = ModeloTabelaSQL(
+            self.sessao, query, self.colunas_tabela(),
+            chave=[PedidoVenda.data_emissao, PedidoVenda.id], assincrono=True
+        )
+        model.erro.connect(self.erro_tabela)
+        
+        antigo = self.tabela_vendas.model()
         self.tabela_vendas.setModel(model)
+        if isinstance(antigo, ModeloTabelaSQL):
+            antigo.fechar()
+        self.tabela_vendas.selectionModel().selectionChanged.connect(self.on_selecao_mudou)
+        self.btn_detalhes.setEnabled(False)
         self.tabela_vendas.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
         self.tabela_vendas.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
 
+    def erro_tabela(self, mensagem):
+        QMessageBox.critical(self, "Erro", f"Erro ao carregar dados: {mensagem}")
+
+    def colunas_tabela(self):
+        def resumir(produtos):
+            produtos = produtos or ""
+            return produtos[:50] + "..." if len(produtos) > 50 else produtos
+
+        return [
+            ColunaTabela("Nº Pedido", lambda linha: linha.id),
+            ColunaTabela("Data", lambda linha: linha.data_emissao.strftime("%d/%m/%Y") if linha.data_emissao else ""),
+            ColunaTabela("Cliente", lambda linha: linha.cliente_id or "Cliente Balcão"),
+            ColunaTabela("Produtos", lambda linha: resumir(linha.produtos)),
+            ColunaTabela("Quantidade", lambda linha: linha.quantidade_total or 0),
+            ColunaTabela("Total (R$)", lambda linha: f"{linha.preco_total or 0:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')),
+            ColunaTabela("Status", lambda linha: self.obter_status_texto(linha.status)),
+        ]
+
     def obter_status_texto(self, status):
         status_map = {
             'F': '✅ Finalizada',
@@ -362,7 +409,7 @@ class HistoricoVendasWidget(QWidget):
             return
         
         row = indices[0].row()
-        pedido_id = int(self.tabela_vendas.model().item(row, 0).text())
+        pedido_id = self.tabela_vendas.model().linha(row).id
         
         # Buscar dados completos do pedido
         pedido = self.sessao.execute(
@@ -0,0 +1,134 @@
+# src/Views/kardex_view.py
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableView, QDateEdit, QCheckBox, QPushButton
+)
+from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtGui import QColor
+from sqlalchemy import select, func
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.Models.models import Item, MovimentoEstoque
+from src.Models.razao_estoque import consulta_kardex, ancora_kardex, ANCORA_VAZIA
+from src.Utils.modelo_tabela_sql import ModeloTabelaSQL, ColunaTabela
+from src.Views.dashboard_estoque_view import NOMES_TIPOS_MOVIMENTO
+
+
+def _quantidade(valor):
+    return f"{float(valor):g}" if valor else ""
+
+
+COLUNAS_KARDEX = [
+    ColunaTabela("Data", lambda l: l.data_ultima_mov.strftime("%d/%m/%Y")),
+    ColunaTabela("Tipo", lambda l: NOMES_TIPOS_MOVIMENTO.get(l.tipo_movimento, l.tipo_movimento)),
+    ColunaTabela("Entrada", lambda l: _quantidade(l.quantidade) if l.tipo_movimento != "saida" else ""),
+    ColunaTabela("Saída", lambda l: _quantidade(l.quantidade) if l.tipo_movimento == "saida" else ""),
+    ColunaTabela("Saldo", lambda l: f"{float(l.saldo):g}",
+                 cor_texto=lambda l: QColor("#c62828") if l.saldo < 0 else None),
+    ColunaTabela("Custo Unit.", lambda l: f"R$ {float(l.preco_compra or 0):.2f}"),
+    ColunaTabela("Custo Médio", lambda l: f"R$ {l.custo_medio:.2f}" if l.custo_medio is not None else ""),
+    ColunaTabela("Obs", lambda l: l.observacao),
+]
+
+
+class ModeloKardex(ModeloTabelaSQL):
+    """
+    Kardex de um item, lido em lotes cronológicos (data, id) conforme a view
+    rola. Cada lote é uma consulta_kardex a partir da última linha lida, que
+    também fornece o saldo acumulado para o lote seguinte: abrir um item com
+    muitos movimentos custa só a primeira página.
+    """
+
+    def __init__(self, session, item_id, colunas, desde=None, tamanho_lote=None, parent=None):
+        self.item_id = item_id
+        self.desde = desde
+        # Saldo anterior à data inicial (zero para o histórico completo)
+        self.ancora = ANCORA_VAZIA if desde is None else ancora_kardex(session, item_id, desde)
+        super().__init__(session, None, colunas, tamanho_lote=tamanho_lote, parent=parent)
+
+    def consulta_lote(self):
+        if self.linhas:
+            ultima = self.linhas[-1]
+            apos = (ultima.data_ultima_mov, ultima.id)
+            ancora = float(ultima.saldo)
+        else:
+            apos, ancora = None, self.ancora
+        return consulta_kardex(self.item_id, self.tamanho_lote, apos, self.desde, ancora)
+
+
+# ===============================================================
+# DIALOG DO KARDEX
+# ===============================================================
+class KardexDialog(QDialog):
+    def __init__(self, session, item_id, parent=None):
+        super().__init__(parent)
+        self.session = session
+        self.item_id = item_id
+        self.setWindowTitle("Kardex do Produto")
+        self.resize(900, 560)
+
+        layout = QVBoxLayout(self)
+
+        self.lbl_item = QLabel()
+        self.lbl_item.setStyleSheet("font-size: 14pt; font-weight: bold; color: #333;")
+        layout.addWidget(self.lbl_item)
+
+        # ------------------- PERÍODO -------------------
+        barra = QHBoxLayout()
+        self.chk_tudo = QCheckBox("Todo o histórico")
+        self.chk_tudo.setChecked(True)
+        self.data_inicio = QDateEdit()
+        self.data_inicio.setCalendarPopup(True)
+        self.data_inicio.setDate(QDate.currentDate().addMonths(-1))
+        self.data_inicio.setEnabled(False)
+        self.btn_atualizar = QPushButton("🔄 Atualizar")
+
+        barra.addWidget(self.chk_tudo)
+        barra.addWidget(QLabel("A partir de:"))
+        barra.addWidget(self.data_inicio)
+        barra.addStretch()
+        barra.addWidget(self.btn_atualizar)
+        layout.addLayout(barra)
+
+        # ------------------- TABELA -------------------
+        self.table = QTableView()
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(header.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        self.lbl_status = QLabel()
+        layout.addWidget(self.lbl_status)
+
+        self.chk_tudo.toggled.connect(lambda marcado: self.data_inicio.setEnabled(not marcado))
+        self.chk_tudo.toggled.connect(self.carregar)
+        self.data_inicio.dateChanged.connect(self.carregar)
+        self.btn_atualizar.clicked.connect(self.carregar)
+
+        self.carregar()
+
+    def carregar(self):
+        desde = None if self.chk_tudo.isChecked() else self.data_inicio.date().toPyDate()
+        try:
+            item = self.session.get(Item, self.item_id)
+            total = self.session.execute(
+                select(func.count()).select_from(MovimentoEstoque)
+                .where(MovimentoEstoque.item_id == self.item_id)
+            ).scalar_one()
+            model = ModeloKardex(self.session, self.item_id, COLUNAS_KARDEX, desde=desde)
+        except SQLAlchemyError as e:
+            self.lbl_status.setText(f"Erro ao carregar o kardex: {e}")
+            return
+
+        self.lbl_item.setText(
+            f"{item.codigo_item or ''} - {item.nome}   |   Estoque atual: {float(item.estoque or 0):g}"
+        )
+        self.lbl_status.setText(f"{total} movimentos no histórico do item")
+
+        model.erro.connect(lambda mensagem: self.lbl_status.setText(f"Erro ao carregar o kardex: {mensagem}"))
+        antigo = self.table.model()
+        self.table.setModel(model)
+        if isinstance(antigo, ModeloTabelaSQL):
+            antigo.fechar()
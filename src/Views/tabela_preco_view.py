@@ -1,6 +1,8 @@
+from decimal import Decimal
+
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
+    QLineEdit, QPushButton, QTableView,
     QHeaderView, QAbstractItemView, QColorDialog, QMessageBox,
     QDialog, QFormLayout, QDoubleSpinBox, QDialogButtonBox
 )
@@ -8,8 +10,71 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
 
 # Importa os modelos do banco
-from sqlalchemy import select
-from src.Models.models import TabelaPreco, Item
+from sqlalchemy import select, or_
+from src.Models.models import TabelaPreco, Item, Entidade
+from src.Models.tabela_preco import (
+    sincronizar_tabela_preco, previa_reajuste, aplicar_reajuste, ultimo_reajuste,
+    desfazer_reajuste, REGRAS_REAJUSTE, REGRA_ACRESCIMO, REGRA_PRECO
+)
+from src.Models.razao_estoque import registrar_ajuste
+from src.Utils.modelo_tabela_sql import ColunaTabela, ModeloTabelaLista, LINHA_ROLE
+from src.Utils.controlador_busca import ControladorBusca
+
+COR_MARGEM_NEGATIVA = QColor("#dc3545")
+COR_MARGEM_BAIXA = QColor("#d39e00")
+COR_MARGEM_OK = QColor("#28a745")
+
+
+def margem(linha):
+    """Margem (%) do preço de venda sobre o custo, ou None sem custo"""
+    custo = float(linha.custo_unitario or 0)
+    if custo <= 0:
+        return None
+    return (float(linha.preco_unitario or 0) - custo) / custo * 100
+
+
+def cor_margem(linha):
+    valor = margem(linha)
+    if valor is None:
+        return None
+    if valor < 0:
+        return COR_MARGEM_NEGATIVA
+    if valor < 20:
+        return COR_MARGEM_BAIXA
+    return COR_MARGEM_OK
+
+
+COLUNAS_PRECO = [
+    ColunaTabela("ID", lambda l: l.id),
+    ColunaTabela("Produto", lambda l: l.nome),
+    ColunaTabela("Estoque", lambda l: l.estoque or 0),
+    ColunaTabela("Preço Compra (Custo)", lambda l: f"R$ {float(l.custo_unitario or 0):.2f}"),
+    ColunaTabela("Preço Venda", lambda l: f"R$ {float(l.preco_unitario or 0):.2f}"),
+    ColunaTabela(
+        "Margem (%)",
+        lambda l: "N/A" if margem(l) is None else f"{margem(l):.1f}%",
+        cor_texto=cor_margem
+    ),
+    ColunaTabela("Vencimento", lambda l: l.vencimento.strftime("%d/%m/%Y") if l.vencimento else "-"),
+]
+
+
+def variacao(linha):
+    anterior = float(linha.preco_anterior or 0)
+    return (float(linha.preco_novo) - anterior) / anterior * 100 if anterior else None
+
+
+COLUNAS_PREVIA = [
+    ColunaTabela("Produto", lambda l: l.nome),
+    ColunaTabela("Custo", lambda l: f"R$ {float(l.custo_unitario or 0):.2f}"),
+    ColunaTabela("Preço Atual", lambda l: f"R$ {float(l.preco_anterior or 0):.2f}"),
+    ColunaTabela("Preço Novo", lambda l: f"R$ {float(l.preco_novo):.2f}"),
+    ColunaTabela(
+        "Variação (%)",
+        lambda l: "-" if variacao(l) is None else f"{variacao(l):+.1f}%",
+        cor_texto=lambda l: COR_MARGEM_NEGATIVA if (variacao(l) or 0) < 0 else None
+    ),
+]
 
 class EditarPrecoDialog(QDialog):
     def __init__(self, produto_nome, preco_atual, parent=None):
@@ -155,6 +220,169 @@ class NovoItemDialog(QDialog):
             'estoque': self.input_estoque.value()
         }
 
+class ReajustePrecoDialog(QDialog):
+    """Reajuste em massa: define a regra e os filtros, mostra a prévia e aplica tudo de uma vez"""
+
+    def __init__(self, sessao, parent=None):
+        super().__init__(parent)
+        self.sessao = sessao
+        self.reajuste = None
+        self.setWindowTitle("Reajuste de Preços em Massa")
+        self.resize(800, 600)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        form_layout = QFormLayout()
+
+        self.combo_regra = QComboBox()
+        for regra, descricao in REGRAS_REAJUSTE.items():
+            self.combo_regra.addItem(descricao, regra)
+        form_layout.addRow("Regra:", self.combo_regra)
+
+        self.input_valor = QDoubleSpinBox()
+        self.input_valor.setRange(-999999.99, 999999.99)
+        self.input_valor.setDecimals(2)
+        form_layout.addRow("Valor:", self.input_valor)
+
+        self.combo_fornecedor = QComboBox()
+        self.carregar_fornecedores()
+        form_layout.addRow("Fornecedor:", self.combo_fornecedor)
+
+        self.input_nome = QLineEdit()
+        self.input_nome.setPlaceholderText("Filtrar pelo nome do produto (opcional)")
+        form_layout.addRow("Nome:", self.input_nome)
+
+        layout.addLayout(form_layout)
+
+        self.btn_previa = QPushButton("🔍 Pré-visualizar")
+        self.btn_previa.clicked.connect(self.pre_visualizar)
+        layout.addWidget(self.btn_previa)
+
+        self.modelo_previa = ModeloTabelaLista([], COLUNAS_PREVIA, self)
+        self.tabela_previa = QTableView()
+        self.tabela_previa.setModel(self.modelo_previa)
+        self.tabela_previa.verticalHeader().setVisible(False)
+        self.tabela_previa.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.tabela_previa.setAlternatingRowColors(True)
+        layout.addWidget(self.tabela_previa)
+
+        self.lbl_resumo = QLabel("Defina a regra e clique em Pré-visualizar.")
+        self.lbl_resumo.setStyleSheet("color: #666;")
+        layout.addWidget(self.lbl_resumo)
+
+        self.botoes = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        self.btn_aplicar = self.botoes.button(QDialogButtonBox.StandardButton.Ok)
+        self.btn_aplicar.setText("Aplicar Reajuste")
+        self.btn_aplicar.setEnabled(False)
+        self.botoes.accepted.connect(self.aplicar)
+        self.botoes.rejected.connect(self.reject)
+        layout.addWidget(self.botoes)
+
+        # Qualquer mudança nos parâmetros invalida a prévia exibida
+        self.combo_regra.currentIndexChanged.connect(self.regra_alterada)
+        self.combo_regra.currentIndexChanged.connect(self.invalidar_previa)
+        self.input_valor.valueChanged.connect(self.invalidar_previa)
+        self.combo_fornecedor.currentIndexChanged.connect(self.invalidar_previa)
+        self.input_nome.textChanged.connect(self.invalidar_previa)
+        self.regra_alterada()
+
+    def carregar_fornecedores(self):
+        try:
+            fornecedores = self.sessao.execute(
+                select(Entidade.id, Entidade.nome_fantasia, Entidade.razao_social)
+                .where(or_(
+                    Entidade.tipo_entidade.ilike('%FORNECEDOR%'),
+                    Entidade.tipo_entidade.ilike('%AMBOS%')
+                ))
+                .order_by(Entidade.razao_social)
+            ).all()
+
+            self.combo_fornecedor.clear()
+            self.combo_fornecedor.addItem("Todos os fornecedores", None)
+            for f in fornecedores:
+                self.combo_fornecedor.addItem(f.nome_fantasia or f.razao_social, f.id)
+
+        except Exception as e:
+            print(f"Erro ao carregar fornecedores: {e}")
+
+    def regra_alterada(self):
+        if self.combo_regra.currentData() == REGRA_ACRESCIMO:
+            self.input_valor.setPrefix("R$ ")
+            self.input_valor.setSuffix("")
+        else:
+            self.input_valor.setPrefix("")
+            self.input_valor.setSuffix(" %")
+
+    def invalidar_previa(self):
+        self.modelo_previa.substituir([])
+        self.btn_aplicar.setEnabled(False)
+        self.lbl_resumo.setText("Parâmetros alterados: clique em Pré-visualizar.")
+
+    def valor(self):
+        # value() é float; str() devolve as casas exibidas (10.1, não 10.0999...)
+        return Decimal(str(self.input_valor.value()))
+
+    def filtros(self):
+        return {
+            "fornecedor_id": self.combo_fornecedor.currentData(),
+            "nome": self.input_nome.text().strip() or None,
+        }
+
+    def descricao(self):
+        regra = self.combo_regra.currentData()
+        partes = [f"{REGRAS_REAJUSTE[regra]}: {self.input_valor.text()}"]
+        if self.combo_fornecedor.currentData():
+            partes.append(f"Fornecedor: {self.combo_fornecedor.currentText()}")
+        if self.input_nome.text().strip():
+            partes.append(f"Nome: {self.input_nome.text().strip()}")
+        return " | ".join(partes)
+
+    def pre_visualizar(self):
+        try:
+            linhas = previa_reajuste(
+                self.sessao, self.combo_regra.currentData(), self.valor(), **self.filtros()
+            )
+        except ValueError as e:
+            QMessageBox.warning(self, "Validação", str(e))
+            return
+        except Exception as e:
+            self.sessao.rollback()
+            QMessageBox.critical(self, "Erro", f"Erro ao calcular a prévia: {str(e)}")
+            return
+
+        self.modelo_previa.substituir(linhas)
+        self.btn_aplicar.setEnabled(bool(linhas))
+        if linhas:
+            self.lbl_resumo.setText(f"{len(linhas)} produtos terão o preço alterado.")
+        else:
+            self.lbl_resumo.setText("Nenhum produto teria o preço alterado com esses parâmetros.")
+
+    def aplicar(self):
+        quantidade = self.modelo_previa.rowCount()
+        resposta = QMessageBox.question(
+            self,
+            "Confirmar Reajuste",
+            f"Aplicar o reajuste a {quantidade} produtos?\n\n{self.descricao()}\n\n"
+            f"Os preços anteriores ficam no histórico e o reajuste pode ser desfeito.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if resposta != QMessageBox.StandardButton.Yes:
+            return
+
+        try:
+            self.reajuste = aplicar_reajuste(
+                self.sessao, self.combo_regra.currentData(), self.valor(),
+                self.descricao(), **self.filtros()
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao aplicar o reajuste: {str(e)}")
+            return
+        self.accept()
+
 class TabelaPrecoWidget(QWidget):
     def __init__(self, sessao=None):
         super().__init__()
@@ -188,7 +416,11 @@ class TabelaPrecoWidget(QWidget):
                 border: 1px solid #007bff;
             }
         """)
-        self.input_busca.textChanged.connect(self.filtrar_tabela)
+        # Filtra só quando o usuário para de digitar; termo que só acrescenta
+        # texto ao anterior filtra apenas as linhas que já estão visíveis
+        self.controlador_busca = ControladorBusca(self.input_busca, parent=self)
+        self.controlador_busca.buscar.connect(self.filtrar_tabela)
+        self.controlador_busca.refinar.connect(lambda termo: self.filtrar_tabela(termo, refinar=True))
         layout_busca.addWidget(self.input_busca)
 
         layout_principal.addLayout(layout_busca)
@@ -278,22 +510,64 @@ class TabelaPrecoWidget(QWidget):
         self.btn_atualizar.setCursor(Qt.CursorShape.PointingHandCursor)
         self.btn_atualizar.clicked.connect(self.sincronizar_e_carregar)
 
+        # BOTÕES DE REAJUSTE EM MASSA
+        self.btn_reajuste = QPushButton("📈 REAJUSTE EM MASSA")
+        self.btn_reajuste.setStyleSheet("""
+            QPushButton {
+                background-color: #17a2b8; 
+                color: white; 
+                font-weight: bold; 
+                border-radius: 4px; 
+                padding: 10px 20px;
+                border: none;
+                font-size: 14px;
+            }
+            QPushButton:hover { 
+                background-color: #138496; 
+            }
+        """)
+        self.btn_reajuste.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_reajuste.clicked.connect(self.abrir_reajuste)
+
+        self.btn_desfazer = QPushButton("↩️ DESFAZER REAJUSTE")
+        self.btn_desfazer.setStyleSheet("""
+            QPushButton {
+                background-color: #ffc107; 
+                color: #333; 
+                font-weight: bold; 
+                border-radius: 4px; 
+                padding: 10px 20px;
+                border: none;
+                font-size: 14px;
+            }
+            QPushButton:hover { 
+                background-color: #e0a800; 
+            }
+        """)
+        self.btn_desfazer.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_desfazer.clicked.connect(self.desfazer_reajuste)
+
         layout_acoes.addWidget(self.btn_adicionar)
         layout_acoes.addWidget(self.btn_editar)
         layout_acoes.addWidget(self.btn_excluir)
         layout_acoes.addWidget(self.btn_atualizar)
+        layout_acoes.addWidget(self.btn_reajuste)
+        layout_acoes.addWidget(self.btn_desfazer)
         layout_acoes.addStretch()
 
         layout_principal.addLayout(layout_acoes)
 
-        # Tabela
-        self.tabela = QTableWidget()
-        colunas = ["ID", "Produto", "Estoque", "Preço Compra (Custo)", "Preço Venda", "Margem (%)", "Vencimento"]
-        self.tabela.setColumnCount(len(colunas))
-        self.tabela.setHorizontalHeaderLabels(colunas)
+        # Tabela (model/view): todas as linhas ficam em memória e o filtro de
+        # texto troca as linhas do modelo de uma vez, sem esconder linha a linha
+        self.linhas_busca = []      # (nome em minúsculas, linha) de todos os produtos
+        self.linhas_visiveis = []   # subconjunto exibido pelo filtro atual
+        self.modelo = ModeloTabelaLista([], COLUNAS_PRECO, self)
+
+        self.tabela = QTableView()
+        self.tabela.setModel(self.modelo)
         
         self.tabela.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #ddd;
                 background-color: white;
                 selection-background-color: #e6f0ff;
@@ -316,7 +590,7 @@ class TabelaPrecoWidget(QWidget):
         self.tabela.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.tabela.setAlternatingRowColors(True)
         
-        self.tabela.itemSelectionChanged.connect(self.atualizar_botoes)
+        self.tabela.selectionModel().selectionChanged.connect(self.atualizar_botoes)
 
         layout_principal.addWidget(self.tabela)
 
@@ -332,10 +606,17 @@ class TabelaPrecoWidget(QWidget):
         self.atualizar_botoes()
 
     def atualizar_botoes(self):
-        tem_selecao = self.tabela.currentRow() >= 0
+        tem_selecao = self.tabela.selectionModel().hasSelection()
         self.btn_editar.setEnabled(tem_selecao)
         self.btn_excluir.setEnabled(tem_selecao)
 
+    def linha_selecionada(self):
+        """Linha do banco (id, nome, custo, preço...) selecionada na tabela, ou None"""
+        indices = self.tabela.selectionModel().selectedRows()
+        if not indices:
+            return None
+        return self.modelo.data(indices[0], LINHA_ROLE)
+
     # 🔥 AGORA FUNCIONA PORRA! - NOVO ITEM
     def adicionar_item(self):
         """Adiciona novo item à tabela de preços - AGORA FUNCIONAL!"""
@@ -351,19 +632,15 @@ class TabelaPrecoWidget(QWidget):
                     if produto:
                         # Atualiza preço do produto existente
                         produto.preco_venda = dados['preco']
-                        # Cria entrada na tabela de preços se não existir
+                        # Cria ou atualiza a entrada na tabela de preços
                         existe_tabela = self.sessao.execute(
-                            select(TabelaPreco).where(TabelaPreco.produto == produto.nome)
+                            select(TabelaPreco).where(TabelaPreco.item_id == produto.id)
                         ).scalar_one_or_none()
                         
-                        if not existe_tabela:
-                            novo_item = TabelaPreco(
-                                produto=produto.nome,
-                                estoque=produto.estoque or 0,
-                                preco_unitario=dados['preco'],
-                                vencimento=None
-                            )
-                            self.sessao.add(novo_item)
+                        if existe_tabela:
+                            existe_tabela.preco_unitario = dados['preco']
+                        else:
+                            self.sessao.add(TabelaPreco(item_id=produto.id, preco_unitario=dados['preco']))
                         
                         self.sessao.commit()
                         QMessageBox.information(self, "Sucesso", f"Preço de {produto.nome} atualizado para R$ {dados['preco']:.2f}!")
@@ -380,12 +657,13 @@ class TabelaPrecoWidget(QWidget):
                         ativo=True
                     )
                     self.sessao.add(novo_produto)
+                    self.sessao.flush()
+                    registrar_ajuste(self.sessao, novo_produto, novo_produto.estoque,
+                                     "Estoque inicial no cadastro do produto")
                     
                     novo_tabela_preco = TabelaPreco(
-                        produto=dados['novo_produto_nome'],
-                        estoque=dados['estoque'],
-                        preco_unitario=dados['preco'],
-                        vencimento=None
+                        item=novo_produto,
+                        preco_unitario=dados['preco']
                     )
                     self.sessao.add(novo_tabela_preco)
                     
@@ -401,15 +679,13 @@ class TabelaPrecoWidget(QWidget):
     # 🔥 AGORA FUNCIONA PORRA! - EDITAR PREÇO
     def editar_preco(self):
         """Edita o preço do item selecionado - AGORA FUNCIONAL!"""
-        linha = self.tabela.currentRow()
-        if linha < 0:
+        linha = self.linha_selecionada()
+        if linha is None:
             QMessageBox.warning(self, "Atenção", "Selecione um item para editar!")
             return
         
-        item_id = int(self.tabela.item(linha, 0).text())
-        produto_nome = self.tabela.item(linha, 1).text()
-        preco_atual_texto = self.tabela.item(linha, 4).text().replace('R$ ', '').replace(',', '')
-        preco_atual = float(preco_atual_texto)
+        produto_nome = linha.nome
+        preco_atual = float(linha.preco_unitario or 0)
         
         # Abre dialog de edição
         dialog = EditarPrecoDialog(produto_nome, preco_atual, self)
@@ -418,20 +694,11 @@ class TabelaPrecoWidget(QWidget):
             
             if novo_preco != preco_atual:
                 try:
-                    # Atualiza na tabela TabelaPreco
-                    item_tabela = self.sessao.get(TabelaPreco, item_id)
-                    if item_tabela:
-                        item_tabela.preco_unitario = novo_preco
-                    
-                    # Atualiza também na tabela Item se existir
-                    produto_item = self.sessao.execute(
-                        select(Item).where(Item.nome == produto_nome)
-                    ).scalar_one_or_none()
-                    
-                    if produto_item:
-                        produto_item.preco_venda = novo_preco
-                    
-                    self.sessao.commit()
+                    # Mesmo caminho do reajuste em massa (tabela de preços + item, com histórico)
+                    aplicar_reajuste(
+                        self.sessao, REGRA_PRECO, novo_preco,
+                        f"Edição manual: {produto_nome}", item_ids=[linha.item_id]
+                    )
                     
                     QMessageBox.information(self, "Sucesso", 
                                           f"Preço de {produto_nome} atualizado!\n"
@@ -447,13 +714,13 @@ class TabelaPrecoWidget(QWidget):
     # 🔥 JÁ FUNCIONAVA - EXCLUIR ITEM
     def excluir_item(self):
         """Exclui o item selecionado"""
-        linha = self.tabela.currentRow()
-        if linha < 0:
+        linha = self.linha_selecionada()
+        if linha is None:
             QMessageBox.warning(self, "Atenção", "Selecione um item para excluir!")
             return
         
-        item_id = int(self.tabela.item(linha, 0).text())
-        produto_nome = self.tabela.item(linha, 1).text()
+        item_id = linha.id
+        produto_nome = linha.nome
         
         resposta = QMessageBox.question(
             self, 
@@ -485,94 +752,83 @@ class TabelaPrecoWidget(QWidget):
             return
 
         try:
-            # Sincronização básica
-            produtos_cadastro = self.sessao.execute(
-                select(Item).where(Item.tipo_item == 'PRODUTO')
-            ).scalars().all()
-            
-            novos_itens = 0
-            for prod in produtos_cadastro:
-                existe = self.sessao.execute(
-                    select(TabelaPreco).where(TabelaPreco.produto == prod.nome)
-                ).scalar_one_or_none()
-                
-                if not existe:
-                    novo_preco = TabelaPreco(
-                        produto=prod.nome,
-                        estoque=prod.estoque or 0,
-                        preco_unitario=prod.preco_venda or 0, 
-                        vencimento=None
-                    )
-                    self.sessao.add(novo_preco)
-                    novos_itens += 1
-            
-            if novos_itens > 0:
+            # Sincronização: um INSERT ... SELECT para os produtos sem preço
+            if sincronizar_tabela_preco(self.sessao.connection()) > 0:
                 self.sessao.commit()
 
-            # Carregamento
-            self.tabela.setRowCount(0)
-            
+            # Carregamento: junção pelo id, só as colunas exibidas (sem montar objetos ORM)
             query = (
-                select(TabelaPreco, Item.custo_unitario)
-                .outerjoin(Item, TabelaPreco.produto == Item.nome)
+                select(
+                    TabelaPreco.id, TabelaPreco.item_id, Item.nome, Item.estoque, Item.custo_unitario,
+                    TabelaPreco.preco_unitario, TabelaPreco.vencimento
+                )
+                .join(Item, TabelaPreco.item_id == Item.id)
+                .order_by(TabelaPreco.id)
             )
             resultados = self.sessao.execute(query).all()
 
-            for row_idx, (tabela_preco, custo_item) in enumerate(resultados):
-                self.tabela.insertRow(row_idx)
-                
-                # Preenche a tabela (código existente)
-                self.tabela.setItem(row_idx, 0, QTableWidgetItem(str(tabela_preco.id)))
-                self.tabela.setItem(row_idx, 1, QTableWidgetItem(tabela_preco.produto))
-                self.tabela.setItem(row_idx, 2, QTableWidgetItem(str(tabela_preco.estoque or 0)))
-                
-                custo = float(custo_item or 0.00)
-                self.tabela.setItem(row_idx, 3, QTableWidgetItem(f"R$ {custo:.2f}"))
-                
-                venda = float(tabela_preco.preco_unitario or 0.00)
-                self.tabela.setItem(row_idx, 4, QTableWidgetItem(f"R$ {venda:.2f}"))
-                
-                # Margem
-                if custo > 0:
-                    margem = ((venda - custo) / custo) * 100
-                    margem_str = f"{margem:.1f}%"
-                    item_margem = QTableWidgetItem(margem_str)
-                    
-                    if margem < 0: 
-                        item_margem.setForeground(QColor("#dc3545"))
-                    elif margem < 20:
-                        item_margem.setForeground(QColor("#d39e00"))
-                    else: 
-                        item_margem.setForeground(QColor("#28a745"))
-                    
-                    self.tabela.setItem(row_idx, 5, item_margem)
-                else:
-                    self.tabela.setItem(row_idx, 5, QTableWidgetItem("N/A"))
-
-                self.tabela.setItem(row_idx, 6, QTableWidgetItem(
-                    tabela_preco.vencimento.strftime("%d/%m/%Y") if tabela_preco.vencimento else "-"
-                ))
-
-            self.lbl_status.setText(f"Mostrando {len(resultados)} produtos")
-            self.atualizar_botoes()
+            self.linhas_busca = [((linha.nome or "").lower(), linha) for linha in resultados]
+            self.filtrar_tabela(self.input_busca.text())
 
         except Exception as e:
+            self.sessao.rollback()
             print(f"Erro ao sincronizar/carregar: {e}")
             QMessageBox.critical(self, "Erro", f"Erro ao carregar dados: {str(e)}")
 
-    def filtrar_tabela(self, texto):
-        texto = texto.lower()
-        linhas_visiveis = 0
-        
-        for i in range(self.tabela.rowCount()):
-            item = self.tabela.item(i, 1)
-            if item and texto in item.text().lower():
-                self.tabela.setRowHidden(i, False)
-                linhas_visiveis += 1
-            else:
-                self.tabela.setRowHidden(i, True)
-        
-        self.lbl_status.setText(f"Mostrando {linhas_visiveis} de {self.tabela.rowCount()} produtos")
+    # REAJUSTE EM MASSA
+    def abrir_reajuste(self):
+        dialog = ReajustePrecoDialog(self.sessao, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted and dialog.reajuste:
+            QMessageBox.information(
+                self, "Sucesso",
+                f"Reajuste #{dialog.reajuste.id} aplicado a {dialog.reajuste.quantidade_itens} produtos."
+            )
+            self.sincronizar_e_carregar()
+
+    def desfazer_reajuste(self):
+        reajuste = ultimo_reajuste(self.sessao)
+        if reajuste is None:
+            QMessageBox.information(self, "Reajuste", "Nenhum reajuste para desfazer.")
+            return
+
+        resposta = QMessageBox.question(
+            self,
+            "Desfazer Reajuste",
+            f"Desfazer o reajuste #{reajuste.id} de {reajuste.data.strftime('%d/%m/%Y %H:%M')}?\n\n"
+            f"{reajuste.descricao}\n({reajuste.quantidade_itens} produtos)\n\n"
+            f"Produtos com preço alterado depois dele não são modificados.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if resposta != QMessageBox.StandardButton.Yes:
+            return
+
+        try:
+            restaurados = desfazer_reajuste(self.sessao, reajuste.id)
+            QMessageBox.information(self, "Sucesso", f"{restaurados} preços restaurados.")
+            self.sincronizar_e_carregar()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao desfazer reajuste: {str(e)}")
+
+    def filtrar_tabela(self, texto, refinar=False):
+        termo = texto.strip()
+        base = self.linhas_visiveis if refinar else self.linhas_busca
+        chave = termo.lower()
+        self.linhas_visiveis = [par for par in base if chave in par[0]] if chave else base
+
+        # Um único reset do modelo; células formatadas sob demanda em data()
+        # e margem colorida pelo ForegroundRole
+        self.modelo.substituir([linha for _, linha in self.linhas_visiveis])
+        self.controlador_busca.marcar_resultado(termo, True)
+        self.atualizar_status()
+        self.atualizar_botoes()
+
+    def atualizar_status(self):
+        total = len(self.linhas_busca)
+        visiveis = len(self.linhas_visiveis)
+        if visiveis == total:
+            self.lbl_status.setText(f"Mostrando {total} produtos")
+        else:
+            self.lbl_status.setText(f"Mostrando {visiveis} de {total} produtos")
 
     def load_data(self):
         self.sincronizar_e_carregar()
@@ -0,0 +1,105 @@
+# tests/conftest.py
+
+import os
+
+# Telas testadas sem servidor gráfico (antes de qualquer import do Qt)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.Models.perfil_sqlite import aplicar_perfil, PERFIS, PERFIL_PADRAO
+from src.Models.migracoes import executar_migracoes
+from src.Utils.contador_consultas import ContadorConsultas
+
+
+def criar_banco(caminho, perfil=PERFIL_PADRAO):
+    """Engine para um erp.db novo em `caminho`, já com todas as migrações"""
+    engine = create_engine(f"sqlite:///{caminho}")
+    aplicar_perfil(engine, PERFIS[perfil])
+    executar_migracoes(engine)
+    return engine
+
+
+@pytest.fixture
+def novo_banco(tmp_path):
+    """Fábrica de bancos independentes no diretório do teste: novo_banco("nome")"""
+    engines = []
+
+    def criar(nome="erp", perfil=PERFIL_PADRAO):
+        engines.append(criar_banco(tmp_path / f"{nome}.db", perfil))
+        return engines[-1]
+
+    yield criar
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def engine(novo_banco):
+    return novo_banco()
+
+
+@pytest.fixture
+def sessao(engine):
+    with Session(engine) as sessao:
+        yield sessao
+
+
+@pytest.fixture(scope="session")
+def app():
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def aguardar_consultas(app):
+    """Função que espera as consultas em segundo plano (ExecutorConsultas) e entrega os resultados às telas"""
+    from PyQt6.QtCore import QThreadPool
+
+    def aguardar():
+        pool = QThreadPool.globalInstance()
+        pool.waitForDone()
+        app.processEvents()
+        # Um resultado entregue pode ter pedido outra consulta
+        while pool.activeThreadCount():
+            pool.waitForDone()
+            app.processEvents()
+
+    return aguardar
+
+
+@pytest.fixture
+def consultas_da_tela(novo_banco, aguardar_consultas):
+    """
+    Comandos SQL de uma tela de listagem aberta em bancos de tamanhos diferentes:
+
+        passos = consultas_da_tela(popular, abrir, ler, tamanhos=(10, 500), maximos=(3,))
+
+    Para cada tamanho, `popular(sessao, tamanho)` preenche um banco novo,
+    `abrir(sessao)` monta a tela e cada função de `acoes` a navega; ao fim de
+    cada passo as consultas em segundo plano terminam e `ler(tela)` formata
+    as células exibidas. Falha se um passo passar do seu máximo ou se o número
+    de comandos mudar com o tamanho (uma consulta por linha, N+1). Devolve
+    {tamanho: [(comandos, lido) de cada passo]} para as conferências da tela.
+    """
+    def medir(popular, abrir, ler, tamanhos, maximos, acoes=()):
+        medidas = {}
+        for tamanho in tamanhos:
+            engine = novo_banco(f"erp_{tamanho}")
+            with Session(engine) as sessao:
+                popular(sessao, tamanho)
+                passos, tela = [], None
+                for passo, maximo in zip((abrir, *acoes), maximos, strict=True):
+                    with ContadorConsultas(engine, maximo=maximo) as contador:
+                        tela = passo(sessao) if tela is None else (passo(tela) or tela)
+                        aguardar_consultas()
+                        lido = ler(tela)
+                    passos.append((contador.total, lido))
+                medidas[tamanho] = passos
+        comandos = {tamanho: [total for total, _ in passos] for tamanho, passos in medidas.items()}
+        assert len(set(map(tuple, comandos.values()))) == 1, comandos
+        return medidas
+
+    return medir
@@ -0,0 +1,42 @@
+# tests/test_cadastro_produtos.py
+
+from sqlalchemy import insert
+
+from src.Models.models import Entidade, Item, TipoPessoaEnum
+
+PRODUTOS = 400
+PAGINA = 20  # CadastroProdutosWidget.PAGE_SIZE
+
+
+def criar_produtos(sessao, fornecedores):
+    """PRODUTOS itens distribuídos entre `fornecedores` fornecedores distintos"""
+    sessao.execute(insert(Entidade), [
+        {"tipo_pessoa": TipoPessoaEnum.JURIDICA, "razao_social": f"Fornecedor {i} Ltda",
+         "cpf_cnpj": f"{i:014d}", "tipo_entidade": "FORNECEDOR"}
+        for i in range(1, fornecedores + 1)
+    ])
+    sessao.execute(insert(Item), [
+        {"codigo_item": f"P{i:05d}", "tipo_item": "PRODUTO", "nome": f"Produto {i}",
+         "estoque": 10, "preco_venda": 10, "fornecedor_id": i % fornecedores + 1}
+        for i in range(1, PRODUTOS + 1)
+    ])
+    sessao.commit()
+
+
+def fornecedores_exibidos(tela):
+    modelo = tela.table_view.model()
+    return [modelo.item(linha, 6).text() for linha in range(modelo.rowCount())]
+
+
+def test_fornecedor_da_lista_sem_consulta_por_linha(consultas_da_tela):
+    from src.Views.cadastro_produto_view import CadastroProdutosWidget
+
+    # Página + contagem na abertura; só a página ao avançar
+    medidas = consultas_da_tela(criar_produtos, CadastroProdutosWidget, fornecedores_exibidos,
+                                tamanhos=(10, 200), maximos=(2, 1),
+                                acoes=[CadastroProdutosWidget.go_to_next_page])
+    for fornecedores, ((_, abertura), _) in medidas.items():
+        assert len(abertura) == PAGINA
+        assert "-" not in abertura
+        # Com 200 fornecedores, cada linha da página tem um fornecedor diferente
+        assert len(set(abertura)) == min(fornecedores, PAGINA)
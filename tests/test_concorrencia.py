@@ -0,0 +1,128 @@
+# tests/test_concorrencia.py
+#
+# Vários terminais lançando vendas e compras dos mesmos itens no mesmo
+# erp.db, cada um no seu processo: nenhuma baixa ou entrada pode se perder,
+# e nenhuma venda pode levar o estoque abaixo de zero.
+
+import multiprocessing
+import random
+from collections import Counter
+
+from sqlalchemy import create_engine, insert, select, func
+from sqlalchemy.orm import Session
+
+from src.Components.Comercial.comercial import PedidosCompra, PedidosVenda
+from src.Models.concorrencia import EstoqueInsuficiente
+from src.Models.models import Item, MovimentoEstoque
+from src.Models.perfil_sqlite import aplicar_perfil, PERFIS, PERFIL_PADRAO
+
+TERMINAIS = 8
+OPERACOES = 40
+ITENS = 5
+ESTOQUE_INICIAL = 1000
+ESTOQUE_ESCASSO = 50  # menos que as tentativas de venda dos terminais juntos
+
+
+def terminal(caminho, semente):
+    """Um terminal: engine própria, vendas e compras aleatórias; devolve {item_id: variação}"""
+    engine = create_engine(f"sqlite:///{caminho}")
+    aplicar_perfil(engine, PERFIS[PERFIL_PADRAO])
+    aleatorio = random.Random(semente)
+    variacao = Counter()
+    with Session(engine) as sessao:
+        vendas, compras = PedidosVenda(sessao), PedidosCompra(sessao)
+        for numero in range(OPERACOES):
+            item_id, quantidade = aleatorio.randint(1, ITENS), aleatorio.randint(1, 5)
+            if aleatorio.random() < 0.6:
+                vendas.registrar_venda(None, [
+                    {"id": item_id, "nome": f"Produto {item_id}", "quantidade": quantidade,
+                     "preco": 10, "subtotal": 10 * quantidade}
+                ])
+                variacao[item_id] -= quantidade
+            else:
+                compras.registrar_compra(None, [
+                    {"id": item_id, "nome": f"Produto {item_id}", "quantidade": quantidade,
+                     "preco_unitario": 5, "subtotal": 5 * quantidade}
+                ], numero_nf=f"{semente}-{numero}")
+                variacao[item_id] += quantidade
+    engine.dispose()
+    return variacao
+
+
+def terminal_disputando(caminho):
+    """Um terminal vendendo 1 unidade do item escasso (1) junto com 1 do item 2; devolve as vendas feitas"""
+    engine = create_engine(f"sqlite:///{caminho}")
+    aplicar_perfil(engine, PERFIS[PERFIL_PADRAO])
+    vendidas = 0
+    with Session(engine) as sessao:
+        vendas = PedidosVenda(sessao)
+        for _ in range(OPERACOES // 2):
+            try:
+                vendas.registrar_venda(None, [
+                    {"id": item_id, "nome": f"Produto {item_id}", "quantidade": 1, "preco": 10, "subtotal": 10}
+                    for item_id in (1, 2)
+                ])
+                vendidas += 1
+            except EstoqueInsuficiente:
+                pass
+    engine.dispose()
+    return vendidas
+
+
+def preparar_itens(engine, estoques):
+    """Itens 1..N com o estoque inicial lançado por uma compra, para o razão partir do mesmo saldo"""
+    with Session(engine) as sessao:
+        sessao.execute(insert(Item), [
+            {"id": i, "codigo_item": f"P{i}", "tipo_item": "PRODUTO", "nome": f"Produto {i}",
+             "estoque": 0, "custo_unitario": 0, "preco_venda": 10}
+            for i in range(1, len(estoques) + 1)
+        ])
+        sessao.commit()
+        PedidosCompra(sessao).registrar_compra(None, [
+            {"id": i, "nome": f"Produto {i}", "quantidade": estoque,
+             "preco_unitario": 5, "subtotal": 5 * estoque}
+            for i, estoque in enumerate(estoques, 1)
+        ], numero_nf="inicial")
+    engine.dispose()
+
+
+def test_lancamentos_simultaneos_nao_perdem_estoque(engine):
+    caminho = engine.url.database
+    preparar_itens(engine, [ESTOQUE_INICIAL] * ITENS)
+
+    with multiprocessing.get_context("spawn").Pool(TERMINAIS) as pool:
+        variacoes = pool.starmap(terminal, [(caminho, semente) for semente in range(TERMINAIS)])
+    liquido = Counter()
+    for variacao in variacoes:
+        liquido.update(variacao)  # soma também as variações negativas (o "+" do Counter as descarta)
+
+    with Session(engine) as sessao:
+        estoques = dict(sessao.execute(select(Item.id, Item.estoque)).all())
+        for item_id in range(1, ITENS + 1):
+            esperado = ESTOQUE_INICIAL + liquido[item_id]
+            assert estoques[item_id] == esperado, item_id
+            ultimo_saldo = sessao.execute(
+                select(MovimentoEstoque.saldo)
+                .where(MovimentoEstoque.item_id == item_id)
+                .order_by(MovimentoEstoque.data_ultima_mov.desc(), MovimentoEstoque.id.desc())
+                .limit(1)
+            ).scalar_one()
+            assert ultimo_saldo == esperado, item_id
+        movimentos = sessao.scalar(select(func.count(MovimentoEstoque.id)))
+    assert movimentos == ITENS + TERMINAIS * OPERACOES
+
+
+def test_vendas_simultaneas_nao_vendem_alem_do_estoque(engine):
+    caminho = engine.url.database
+    preparar_itens(engine, [ESTOQUE_ESCASSO, ESTOQUE_INICIAL])
+
+    with multiprocessing.get_context("spawn").Pool(TERMINAIS) as pool:
+        vendidas = sum(pool.map(terminal_disputando, [caminho] * TERMINAIS))
+    assert vendidas == ESTOQUE_ESCASSO
+
+    with Session(engine) as sessao:
+        estoques = dict(sessao.execute(select(Item.id, Item.estoque)).all())
+        # A venda recusada não baixou nem o item que tinha saldo
+        assert estoques == {1: 0, 2: ESTOQUE_INICIAL - vendidas}
+        saidas = sessao.scalar(select(func.count(MovimentoEstoque.id)).where(MovimentoEstoque.tipo_movimento == "saida"))
+    assert saidas == 2 * vendidas
@@ -0,0 +1,71 @@
+# tests/test_custo_medio.py
+
+import random
+from decimal import Decimal
+
+from sqlalchemy import insert, select, update
+
+from src.Components.Comercial.comercial import PedidosCompra, PedidosVenda
+from src.Models.custo_medio import registrar_entradas, recalcular_custos_medios, recalcular_custos_movimentos
+from src.Models.models import Item, MovimentoEstoque
+
+
+def test_entradas_somam_estoque_e_ponderam_o_custo(sessao):
+    sessao.execute(insert(Item), [
+        {"id": 1, "codigo_item": "P1", "tipo_item": "PRODUTO", "nome": "Com estoque",
+         "estoque": 10, "custo_unitario": Decimal("4.00"), "preco_venda": 10},
+        {"id": 2, "codigo_item": "P2", "tipo_item": "PRODUTO", "nome": "Sem estoque",
+         "estoque": 0, "custo_unitario": Decimal("9.99"), "preco_venda": 10},
+    ])
+    registrar_entradas(sessao.connection(), {
+        1: (30, Decimal("30") * Decimal("8.01")),
+        # 3 x 0,10 em float seria 0,30000000000000004
+        2: (3, Decimal("0.1") * 3),
+    })
+    sessao.commit()
+
+    itens = dict(sessao.execute(select(Item.id, Item.custo_unitario)).all())
+    assert itens == {1: Decimal("7.01"), 2: Decimal("0.10")}
+    assert sessao.execute(select(Item.estoque).order_by(Item.id)).scalars().all() == [40, 3]
+
+
+def test_recalculo_reproduz_os_custos_gravados_nos_lancamentos(sessao):
+    sessao.execute(insert(Item), [
+        {"id": i, "codigo_item": f"P{i}", "tipo_item": "PRODUTO", "nome": f"Produto {i}",
+         "estoque": 0, "custo_unitario": 0, "preco_venda": 30}
+        for i in range(1, 4)
+    ])
+    sessao.commit()
+    # Médias ponderadas de preços em centavos caem muitas vezes em meio centavo
+    aleatorio = random.Random(23)
+    saldos = {1: 0, 2: 0, 3: 0}
+    for _ in range(300):
+        item_id, quantidade = aleatorio.randint(1, 3), aleatorio.randint(1, 12)
+        if aleatorio.random() < 0.6:
+            preco = aleatorio.randint(100, 999) / 100
+            PedidosCompra(sessao).registrar_compra(None, [
+                {"id": item_id, "nome": f"Produto {item_id}", "quantidade": quantidade,
+                 "preco_unitario": preco, "subtotal": quantidade * preco}
+            ])
+            saldos[item_id] += quantidade
+        elif saldos[item_id]:
+            # Só o que há em estoque: às vezes zera o saldo
+            quantidade = min(quantidade, saldos[item_id])
+            saldos[item_id] -= quantidade
+            PedidosVenda(sessao).registrar_venda(None, [
+                {"id": item_id, "nome": f"Produto {item_id}", "quantidade": quantidade,
+                 "preco": 30, "subtotal": 30 * quantidade}
+            ])
+
+    custos_movimentos = select(MovimentoEstoque.id, MovimentoEstoque.custo_medio).order_by(MovimentoEstoque.id)
+    custos_itens = select(Item.id, Item.custo_unitario).order_by(Item.id)
+    do_trigger, das_entradas = sessao.execute(custos_movimentos).all(), sessao.execute(custos_itens).all()
+    sessao.execute(update(MovimentoEstoque).values(custo_medio=None))
+    sessao.execute(update(Item).values(custo_unitario=0))
+
+    # Páginas pequenas: a sequência de um item atravessa várias leituras
+    conexao = sessao.connection()
+    assert recalcular_custos_movimentos(conexao, tamanho_lote=7) == len(do_trigger)
+    assert recalcular_custos_medios(conexao, tamanho_lote=7) == (3, len(do_trigger))
+    assert sessao.execute(custos_movimentos).all() == do_trigger
+    assert sessao.execute(custos_itens).all() == das_entradas
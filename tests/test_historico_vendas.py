@@ -0,0 +1,39 @@
+# tests/test_historico_vendas.py
+
+from datetime import date
+
+from sqlalchemy import insert
+
+from src.Models.models import PedidoVenda, PedidoVendaItem
+
+
+def criar_vendas(sessao, quantidade, itens_por_venda=3):
+    sessao.execute(insert(PedidoVenda), [
+        {"id": i, "cliente_id": None, "preco_total": 30, "data_emissao": date(2024, 1, 1 + i % 28),
+         "status": "FINALIZADA"}
+        for i in range(1, quantidade + 1)
+    ])
+    sessao.execute(insert(PedidoVendaItem), [
+        {"pedido_id": i, "produto": f"Produto {j}", "quantidade": 1, "preco_unitario": 10, "preco_total": 10}
+        for i in range(1, quantidade + 1) for j in range(itens_por_venda)
+    ])
+    sessao.commit()
+
+
+def ler_celulas(tela):
+    """Formata todas as células carregadas; devolve o número de linhas"""
+    modelo = tela.tabela_vendas.model()
+    for linha in range(modelo.rowCount()):
+        for coluna in range(modelo.columnCount()):
+            modelo.data(modelo.index(linha, coluna))
+    return modelo.rowCount()
+
+
+def test_produtos_da_venda_sem_consulta_por_linha(consultas_da_tela):
+    from src.Views.historico_vendas_view import HistoricoVendasWidget
+
+    # Lote da tabela + estatísticas, qualquer que seja o tamanho do histórico
+    medidas = consultas_da_tela(criar_vendas, HistoricoVendasWidget, ler_celulas,
+                                tamanhos=(10, 500), maximos=(3,))
+    for (_, linhas), in medidas.values():
+        assert linhas > 0
@@ -0,0 +1,93 @@
+# tests/test_importacao.py
+
+from sqlalchemy import select, func
+
+from src.Models.importacao import importar_produtos, importar_pessoas
+from src.Models.models import Item, Entidade, MovimentoEstoque
+
+
+def arquivo(tmp_path, *linhas):
+    caminho = tmp_path / "importacao.csv"
+    caminho.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+    return caminho
+
+
+def produto(sessao, codigo):
+    return sessao.execute(
+        select(Item.nome, Item.preco_venda, Item.custo_unitario, Item.estoque).where(Item.codigo_item == codigo)
+    ).one()
+
+
+def test_repetida_no_lote_fica_com_a_ultima_linha(sessao, tmp_path):
+    resultado = importar_produtos(sessao, arquivo(
+        tmp_path,
+        "codigo;nome;preco;custo",
+        "P1;Primeiro nome;10,00;4,00",
+        "P1;Nome final;;5,00",
+    ))
+    assert (resultado.inseridas, resultado.atualizadas, resultado.duplicadas) == (1, 0, 1)
+    # Coluna vazia na última fica com o valor da anterior
+    assert produto(sessao, "P1")[:3] == ("Nome final", 10, 5)
+
+
+def test_repetida_em_outro_lote_atualiza_o_cadastro(sessao, tmp_path):
+    resultado = importar_produtos(sessao, arquivo(
+        tmp_path,
+        "codigo;nome;preco",
+        "P1;Primeiro nome;10,00",
+        "P2;Outro;3,00",
+        "P1;Nome final;12,00",
+    ), tamanho_lote=1)
+    assert (resultado.inseridas, resultado.atualizadas, resultado.duplicadas) == (2, 1, 0)
+    assert produto(sessao, "P1")[:2] == ("Nome final", 12)
+    assert sessao.scalar(select(func.count(Item.id))) == 2
+
+
+def test_coluna_vazia_ou_ausente_mantem_o_valor_atual(sessao, tmp_path):
+    importar_produtos(sessao, arquivo(tmp_path, "codigo;nome;preco;custo", "P1;Produto;10,00;4,00"))
+    importar_produtos(sessao, arquivo(tmp_path, "codigo;nome;preco", "P1;;11,00"))
+    assert produto(sessao, "P1")[:3] == ("Produto", 11, 4)
+
+
+def test_estoque_importado_entra_no_razao_como_ajuste(sessao, tmp_path):
+    importar_produtos(sessao, arquivo(tmp_path, "codigo;nome;estoque", "P1;Produto;5"))
+    importar_produtos(sessao, arquivo(tmp_path, "codigo;estoque", "P1;8"))
+
+    assert produto(sessao, "P1").estoque == 8
+    movimentos = sessao.execute(
+        select(MovimentoEstoque.tipo_movimento, MovimentoEstoque.quantidade, MovimentoEstoque.saldo)
+        .order_by(MovimentoEstoque.id)
+    ).all()
+    assert [tuple(m) for m in movimentos] == [("ajuste", 5, 5), ("ajuste", 3, 8)]
+
+
+def test_documento_com_e_sem_mascara_e_a_mesma_pessoa(sessao, tmp_path):
+    importar_pessoas(sessao, arquivo(
+        tmp_path, "cpf_cnpj;razao_social", "12.345.678/0001-95;Empresa Ltda", "123.456.789-09;Fulano"
+    ))
+    resultado = importar_pessoas(sessao, arquivo(
+        tmp_path, "cpf_cnpj;razao_social", "12345678000195;Empresa S.A.", "12345678909;Fulano de Tal"
+    ))
+    assert (resultado.inseridas, resultado.atualizadas) == (0, 2)
+    assert sessao.execute(select(Entidade.razao_social).order_by(Entidade.id)).scalars().all() == [
+        "Empresa S.A.", "Fulano de Tal"
+    ]
+
+
+def test_rejeicoes_trazem_a_linha_e_o_motivo(sessao, tmp_path):
+    resultado = importar_pessoas(sessao, arquivo(
+        tmp_path,
+        "cpf;nome;uf",
+        "123.456.789-09;Fulano;SP",
+        "123;Documento curto;SP",
+        "",
+        "98765432100;;RJ",
+        "11.222.333/0001-81;Empresa;ESTADO",
+    ))
+    assert (resultado.lidas, resultado.inseridas, resultado.rejeitadas) == (4, 1, 3)
+    # Linha 4 vazia é pulada; a numeração é a do arquivo, com o cabeçalho na linha 1
+    motivos = dict(resultado.erros)
+    assert sorted(motivos) == [3, 5, 6]
+    assert "cpf_cnpj inválido" in motivos[3]
+    assert "razao_social obrigatória" in motivos[5]
+    assert "uf com mais de 2 caracteres" in motivos[6]
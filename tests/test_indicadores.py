@@ -0,0 +1,36 @@
+# tests/test_indicadores.py
+
+from datetime import date
+from decimal import Decimal
+
+from src.Models.resumos import somar_venda
+from src.Utils.indicadores import indicadores_vendas
+
+DIA = date(2024, 1, 10)
+
+
+def test_vendas_sem_cliente_nao_contam_como_cliente_ativo(sessao):
+    somar_venda(sessao, DIA, 1, 1, Decimal("10.00"))
+    somar_venda(sessao, DIA, 2, 1, Decimal("20.00"))
+    somar_venda(sessao, DIA, None, 1, Decimal("5.00"))
+    sessao.commit()
+
+    indicadores = indicadores_vendas(sessao, DIA, DIA)
+    assert indicadores.clientes_ativos == 2
+    assert indicadores.total_pedidos == 3
+    assert indicadores.total_vendas == Decimal("35.00")
+
+
+def test_dashboard_de_vendas_carrega(sessao, aguardar_consultas):
+    from src.Views.dashboard_vendas_view import DashboardVendasWidget
+
+    somar_venda(sessao, date.today(), None, 1, Decimal("5.00"))
+    sessao.commit()
+
+    tela = DashboardVendasWidget(sessao)
+    assert tela.rotulos_kpi["total_pedidos"].text() == "..."
+    aguardar_consultas()
+    assert tela.combo_vendedor.count() >= 1
+    assert tela.combo_cliente.count() == 1
+    assert tela.rotulos_kpi["total_pedidos"].text() == "1"
+    assert tela.rotulos_kpi["clientes_ativos"].text() == "0"
@@ -0,0 +1,113 @@
+# tests/test_planos_consulta.py
+#
+# As consultas quentes (dashboards, filtros, junções) precisam usar índice.
+# Cada caso executa o código real e roda EXPLAIN QUERY PLAN sobre os SELECTs
+# que ele emitiu: "SCAN <tabela>" sem índice faz o teste falhar.
+
+import re
+from datetime import date
+
+import pytest
+from sqlalchemy import select, event
+from sqlalchemy.orm import contains_eager
+
+from src.Models.models import Base, Item, MovimentoEstoque, Financeiro, EnumStatus
+from src.Models.razao_estoque import consulta_kardex, ancora_kardex, saldo_item_em, variacoes_estoque
+from src.Models.tabela_preco import previa_reajuste, REGRA_ACRESCIMO
+from src.Utils.indicadores import (
+    indicadores_produtos, indicadores_vendas, indicadores_financeiro, movimentos_desde
+)
+from src.Utils.validacoes_comercial import ValidadorComercial
+
+INICIO, FIM = date(2024, 1, 1), date(2024, 1, 31)
+
+# Varreduras aceitas por caso, com o motivo
+VARREDURAS_ESPERADAS = {
+    # Contagem de fornecedores: LIKE na lista de categorias de tipo_entidade
+    "indicadores_produtos": {"entidade"},
+}
+
+
+CASOS = {
+    "indicadores_produtos": lambda s: indicadores_produtos(s),
+    "indicadores_vendas": lambda s: indicadores_vendas(s, INICIO, FIM),
+    "indicadores_vendas_cliente": lambda s: indicadores_vendas(s, INICIO, FIM, vendedor_id=1, cliente_id=1),
+    "indicadores_financeiro": lambda s: indicadores_financeiro(s, FIM),
+    "movimentos_desde": lambda s: movimentos_desde(s, INICIO),
+    # Dashboard financeiro: lançamentos em aberto por vencimento
+    "financeiro_em_aberto": lambda s: s.execute(
+        select(Financeiro).where(Financeiro.status == EnumStatus.ABERTA)
+        .order_by(Financeiro.vencimento.asc()).limit(500)
+    ).all(),
+    # Validação da venda: produtos, cliente com total em aberto, vendedor
+    "contexto_validacao": lambda s: ValidadorComercial(s).carregar_contexto(
+        {"cliente_id": 1, "vendedor_id": 1, "itens": [{"produto_id": 1}, {"produto_id": 2}]}
+    ),
+    # Dashboard de estoque: movimentos do período, mais recentes primeiro
+    "movimentos_periodo": lambda s: s.execute(
+        select(MovimentoEstoque).outerjoin(MovimentoEstoque.item)
+        .options(contains_eager(MovimentoEstoque.item))
+        .where(MovimentoEstoque.data_ultima_mov.between(INICIO, FIM))
+        .order_by(MovimentoEstoque.data_ultima_mov.desc(), MovimentoEstoque.id.desc()).limit(200)
+    ).all(),
+    "kardex": lambda s: s.execute(consulta_kardex(1, 200, apos=(INICIO, 10), desde=date(2023, 1, 1))).all(),
+    "ancora_kardex": lambda s: ancora_kardex(s, 1, INICIO),
+    "saldo_item_em": lambda s: saldo_item_em(s, 1, FIM),
+    "variacoes_estoque": lambda s: variacoes_estoque(s, INICIO, FIM),
+    # Produtos ativos (movimentação de estoque) e prévia de reajuste por nome
+    "itens_ativos": lambda s: s.execute(select(Item).where(Item.ativo == True)).all(),
+    "previa_reajuste": lambda s: previa_reajuste(s, REGRA_ACRESCIMO, 10),
+}
+
+
+def selects_emitidos(engine, funcao):
+    comandos = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            comandos.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        funcao()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return comandos
+
+
+def varreduras(engine, comandos):
+    """{tabela: SQL} das tabelas lidas por inteiro (SCAN sem índice) nos planos"""
+    tabelas = set(Base.metadata.tables)
+    encontradas = {}
+    with engine.connect() as conexao:
+        for statement, parametros in comandos:
+            for linha in conexao.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parametros):
+                detalhe = linha[-1]
+                achado = re.match(r"SCAN (\w+)(?: AS \w+)?$", detalhe)
+                if achado and achado.group(1) in tabelas:
+                    encontradas[achado.group(1)] = statement
+    return encontradas
+
+
+def afirmar_sem_varredura(engine, funcao, aceitas=()):
+    comandos = selects_emitidos(engine, funcao)
+    assert comandos, "o caso não executou nenhuma consulta"
+    inesperadas = {
+        tabela: sql for tabela, sql in varreduras(engine, comandos).items() if tabela not in aceitas
+    }
+    assert not inesperadas, "\n\n".join(f"SCAN {tabela}:\n{sql}" for tabela, sql in inesperadas.items())
+
+
+@pytest.mark.parametrize("caso", list(CASOS))
+def test_consulta_quente_usa_indice(engine, sessao, caso):
+    afirmar_sem_varredura(engine, lambda: CASOS[caso](sessao), VARREDURAS_ESPERADAS.get(caso, ()))
+
+
+def test_historico_de_vendas_filtrado_usa_indice(engine, sessao, aguardar_consultas):
+    """Resumo dos itens por pedido_id (junção) e estatísticas do período filtrado"""
+    from src.Views.historico_vendas_view import HistoricoVendasWidget
+
+    tela = HistoricoVendasWidget(sessao)
+    aguardar_consultas()
+    tela.filtros_atuais = {"data_inicio": INICIO, "data_fim": FIM, "status": "FINALIZADA"}
+    afirmar_sem_varredura(engine, lambda: (tela.carregar_dados(), aguardar_consultas()))
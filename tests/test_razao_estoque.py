@@ -0,0 +1,110 @@
+# tests/test_razao_estoque.py
+
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert, select, update
+
+from src.Components.Comercial.comercial import PedidosCompra, PedidosVenda
+from src.Models.custo_medio import recalcular_custos_movimentos
+from src.Models.migracoes import fechar_periodos_pendentes, transacao_exclusiva
+from src.Models.models import Item, MovimentoEstoque
+from src.Models.razao_estoque import consulta_kardex, ancora_kardex, periodo_pendente
+
+
+def criar_item(sessao):
+    item_id = sessao.execute(
+        insert(Item).values(codigo_item="P1", tipo_item="PRODUTO", nome="Produto 1",
+                            estoque=0, custo_unitario=0, preco_venda=30).returning(Item.id)
+    ).scalar_one()
+    sessao.commit()
+    return item_id
+
+
+def comprar(sessao, item_id, quantidade, preco):
+    PedidosCompra(sessao).registrar_compra(None, [
+        {"id": item_id, "nome": "Produto 1", "quantidade": quantidade,
+         "preco_unitario": preco, "subtotal": quantidade * preco}
+    ])
+
+
+def vender(sessao, item_id, quantidade):
+    PedidosVenda(sessao).registrar_venda(None, [
+        {"id": item_id, "nome": "Produto 1", "quantidade": quantidade, "preco": 30, "subtotal": 30 * quantidade}
+    ])
+
+
+def kardex(sessao, item_id, **kwargs):
+    return sessao.execute(consulta_kardex(item_id, 100, **kwargs)).all()
+
+
+def test_custo_do_kardex_e_o_custo_medio_do_item(sessao):
+    item_id = criar_item(sessao)
+    comprar(sessao, item_id, 10, 10)
+    vender(sessao, item_id, 10)
+    comprar(sessao, item_id, 10, 20)
+    comprar(sessao, item_id, 30, 40)
+    vender(sessao, item_id, 5)
+
+    linhas = kardex(sessao, item_id)
+    assert [float(l.custo_medio) for l in linhas] == [10, 10, 20, 35, 35]
+    assert [float(l.saldo) for l in linhas] == [10, 0, 10, 40, 35]
+    sessao.expire_all()
+    assert float(sessao.get(Item, item_id).custo_unitario) == float(linhas[-1].custo_medio)
+
+
+def test_kardex_a_partir_de_uma_data(sessao):
+    item_id = criar_item(sessao)
+    comprar(sessao, item_id, 10, 10)
+    comprar(sessao, item_id, 10, 20)
+    hoje = date.today()
+    sessao.execute(update(MovimentoEstoque).where(MovimentoEstoque.id == 1).values(data_ultima_mov=hoje - timedelta(days=3)))
+    sessao.commit()
+
+    linhas = kardex(sessao, item_id, desde=hoje, ancora=ancora_kardex(sessao, item_id, hoje))
+    assert [(float(l.saldo), float(l.custo_medio)) for l in linhas] == [(20, 15)]
+
+
+def test_recalculo_confere_com_o_trigger(sessao):
+    item_id = criar_item(sessao)
+    aleatorio = random.Random(7)
+    saldo = 0
+    for _ in range(40):
+        if aleatorio.random() < 0.6:
+            quantidade = aleatorio.randint(1, 9)
+            comprar(sessao, item_id, quantidade, aleatorio.randint(100, 900) / 100)
+            saldo += quantidade
+        else:
+            # Só o que há em estoque: às vezes zera o saldo
+            quantidade = min(aleatorio.randint(1, 9), saldo)
+            if quantidade:
+                vender(sessao, item_id, quantidade)
+                saldo -= quantidade
+
+    custos = select(MovimentoEstoque.id, MovimentoEstoque.custo_medio).order_by(MovimentoEstoque.id)
+    do_trigger = sessao.execute(custos).all()
+    sessao.execute(update(MovimentoEstoque).values(custo_medio=None))
+    assert recalcular_custos_movimentos(sessao.connection()) == len(do_trigger)
+    assert sessao.execute(custos).all() == do_trigger
+
+
+def test_fechamento_na_abertura_nao_trava_nem_falha_com_banco_ocupado(engine, sessao):
+    assert fechar_periodos_pendentes(engine) == []
+    item_id = criar_item(sessao)
+    comprar(sessao, item_id, 10, 10)
+    inicio_do_mes = date.today().replace(day=1)
+    sessao.execute(update(MovimentoEstoque).values(data_ultima_mov=inicio_do_mes - timedelta(days=1)))
+    sessao.commit()
+    assert periodo_pendente(sessao.connection())
+    sessao.rollback()
+
+    # Outro terminal com a escrita: a abertura segue e o fechamento fica para depois
+    sem_espera = create_engine(engine.url, connect_args={"timeout": 0})
+    with transacao_exclusiva(engine):
+        assert fechar_periodos_pendentes(sem_espera) == []
+    assert fechar_periodos_pendentes(engine) == [inicio_do_mes - timedelta(days=1)]
+
+    # Sem período pendente, a checagem só lê e não disputa a escrita
+    with transacao_exclusiva(engine):
+        assert fechar_periodos_pendentes(sem_espera) == []
+    sem_espera.dispose()
@@ -0,0 +1,41 @@
+# tests/test_tabela_preco.py
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, select
+
+from src.Models.models import Item, TabelaPreco
+from src.Models.tabela_preco import (
+    sincronizar_tabela_preco, aplicar_reajuste,
+    REGRA_MARKUP, REGRA_ACRESCIMO, REGRA_MARGEM
+)
+
+
+def criar_item(sessao, custo, preco):
+    sessao.execute(insert(Item).values(codigo_item="P1", tipo_item="PRODUTO", nome="Produto 1",
+                                       estoque=1, custo_unitario=custo, preco_venda=preco))
+    sincronizar_tabela_preco(sessao.connection())
+    sessao.commit()
+
+
+@pytest.mark.parametrize("regra, valor, esperado", [
+    (REGRA_MARKUP, 10, "10.99"),        # 9,99 * 1,10 = 10,989
+    (REGRA_MARKUP, 10.1, "11.00"),      # 9,99 * 1,101 = 10,99899
+    (REGRA_ACRESCIMO, 1.0, "10.99"),
+    (REGRA_MARGEM, 50, "19.98"),
+])
+def test_reajuste_aplica_o_preco_da_previa(sessao, app, regra, valor, esperado):
+    from src.Views.tabela_preco_view import ReajustePrecoDialog
+
+    criar_item(sessao, custo=9.99, preco=9.99)
+    dialogo = ReajustePrecoDialog(sessao)
+    dialogo.combo_regra.setCurrentIndex(dialogo.combo_regra.findData(regra))
+    dialogo.input_valor.setValue(valor)
+    dialogo.pre_visualizar()
+    previa = dialogo.modelo_previa.linha(0).preco_novo
+    assert previa == Decimal(esperado)
+
+    aplicar_reajuste(sessao, regra, dialogo.valor(), "teste")
+    assert sessao.execute(select(Item.preco_venda)).scalar_one() == previa
+    assert sessao.execute(select(TabelaPreco.preco_unitario)).scalar_one() == previa